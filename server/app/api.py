@@ -1,10 +1,16 @@
+import asyncio
 import os
 import re
+import time
 from contextlib import asynccontextmanager
 from pydantic import ValidationError
+from pydantic_core import to_json
 import app.config   # loads the load_env lib to access .env file
 from app.helpers import get_logger
 from app.authentication import Authentication
+from app.cache import LRUCache
+from app.invalidation import invalidation_bus
+from app import metrics as prom
 from fastapi import FastAPI, HTTPException, Body, Depends, Security, status, Path, Query
 from typing import Optional
 import motor.motor_asyncio
@@ -19,9 +25,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from starlette.requests import Request
-from starlette.responses import JSONResponse
-import redis.asyncio as aioredis
-from passlib.context import CryptContext
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import (
     OAuth2PasswordBearer,
     OAuth2PasswordRequestForm,
@@ -37,7 +41,16 @@ from .database import (
     DemoStorage,
     setup_collections,
     is_valid_parent_child,
+    add_user_change_listener,
+    InvalidBulkNodes,
+    NODE_OUTLINE_FIELDS,
+    NODE_NEIGHBOURS,
+    MAX_TREE_DEPTH,
+    EXPORT_BATCH_SIZE,
+    TreeDepthLimitExceeded,
+    InvalidWorkImport,
 )
+from .export import export_ndjson, read_ndjson
 from .models import (
     UserDetails,
     UserDetailsSafe,
@@ -52,6 +65,8 @@ from .models import (
     UpdateWorkRequest,
     WorkResponse,
     CreateNodeRequest,
+    BulkCreateNodesRequest,
+    BulkCreateNodesResponse,
     UpdateNodeRequest,
     ReorderRequest,
     NodeResponse,
@@ -67,9 +82,16 @@ from .models import (
     PaginatedNodeResponse,
     PaginatedWorkResponse,
     HealthResponse,
+    LivenessResponse,
     MetricsResponse,
     DemoSeedResponse,
     OrderedNodesResponse,
+    NodeOutline,
+    NodeNeighbourhoodResponse,
+    NodeOutlineTree,
+    NodeResult,
+    NodeTreeResult,
+    WorkImportResponse,
 )
 
 
@@ -77,6 +99,8 @@ from .models import (
 DEBUG = bool(os.getenv("DEBUG", "False") == "True")
 LOGIN_RATE_LIMIT = os.getenv("LOGIN_RATE_LIMIT", "5/minute")
 MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("HEALTH_TIMEOUT_SECONDS", "2"))
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
@@ -154,8 +178,14 @@ limiter = Limiter(
     in_memory_fallback_enabled=True,
 )
 
+# Last dependency check result, shared by /health and /health/ready
+_health_cache = LRUCache(maxsize=1, ttl=HEALTH_CACHE_SECONDS)
+
 # Authentication singleton — user_storage is wired up in the lifespan
 oauth = Authentication()
+add_user_change_listener(oauth.invalidate_account)
+invalidation_bus.subscribe("token", oauth.invalidate_token)
+invalidation_bus.on_reset(oauth.token_cache.clear)
 
 
 @asynccontextmanager
@@ -165,13 +195,19 @@ async def lifespan(app: FastAPI):
     motor_client = motor.motor_asyncio.AsyncIOMotorClient(
         MONGO_DETAILS,
         maxPoolSize=MONGO_MAX_POOL_SIZE,
+        event_listeners=[prom.MongoCommandMetrics(), prom.MongoPoolMetrics()],
     )
     app.state.motor_client = motor_client
     app.state.start_time = datetime.now(timezone.utc)
     app.state.request_count = 0
     oauth.set_client(motor_client)
+    redis_client = Authentication.create_redis_client(REDISHOST)
+    oauth.set_redis(redis_client)
+    await invalidation_bus.start(redis_client)
     await setup_collections(motor_client.fabulator)
     yield
+    await invalidation_bus.stop()
+    await oauth.close_redis()
     motor_client.close()
 
 
@@ -192,18 +228,32 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["Authorization", "Content-Type"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
 
 @app.middleware("http")
 async def count_requests(request: Request, call_next):
+    """Count every request and record per-route Prometheus metrics. Routes are
+    labelled by their path template so label cardinality stays bounded."""
     app.state.request_count += 1
-    response = await call_next(request)
-    return response
+    prom.HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        prom.HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        prom.HTTP_REQUESTS.inc(method=request.method, route=route_path, status=str(status_code))
+        prom.HTTP_LATENCY.observe(elapsed, method=request.method, route=route_path)
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/get_token",
     scopes={
@@ -251,6 +301,112 @@ def get_demo_storage(
     )
 
 
+# ------------------------
+#   Node field projection
+# ------------------------
+
+# Fields a caller may add to the always-returned NodeOutline core.
+_PROJECTABLE_NODE_FIELDS = set(NodeOutline.model_fields) - set(NODE_OUTLINE_FIELDS)
+
+
+def get_node_fields(
+    fields: Optional[str] = Query(
+        None,
+        max_length=200,
+        description=(
+            "Comma-separated extra fields to return alongside the outline fields "
+            "(`node_id`, `work_id`, `node_type`, `parent_id`, `position`, `tag`), "
+            "e.g. `description,tags`. Pass `outline` for the outline fields only. "
+            "Omit for full documents."
+        ),
+    ),
+) -> list[str] | None:
+    """Parse the `fields` query parameter into a projection list (None = full documents)."""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip() and name.strip() != "outline"]
+    unknown = sorted(set(names) - _PROJECTABLE_NODE_FIELDS - set(NODE_OUTLINE_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown node field(s): {', '.join(unknown)}",
+        )
+    return [name for name in names if name in _PROJECTABLE_NODE_FIELDS]
+
+
+# ------------------------
+#   Fast node responses
+# ------------------------
+
+# NodeResponse fields with their defaults (None for required fields).
+_NODE_RESPONSE_DEFAULTS = {
+    name: None if field.is_required() else field.get_default(call_default_factory=True)
+    for name, field in NodeResponse.model_fields.items()
+}
+_NODE_OUTLINE_KEYS = frozenset(NodeOutline.model_fields)
+
+
+def _node_docs(docs: list[dict], fields: list[str] | None = None) -> list[dict]:
+    """Shape storage documents for a node response without validating them.
+    Full documents get exactly NodeResponse's fields (defaults filled in,
+    storage-only keys such as account_id dropped); projected documents
+    (fields given) keep the NodeOutline fields that were fetched."""
+    if fields is None:
+        return [
+            {name: doc.get(name, default) for name, default in _NODE_RESPONSE_DEFAULTS.items()}
+            for doc in docs
+        ]
+    return [{k: v for k, v in doc.items() if k in _NODE_OUTLINE_KEYS} for doc in docs]
+
+
+def _fast_json(content, headers: dict | None = None) -> Response:
+    """Encode content with pydantic-core's JSON serializer, bypassing the
+    route's response_model validation. Storage documents written through
+    the models already satisfy the schema, so re-validating every node of a
+    page only costs CPU; content must be shaped with _node_docs first."""
+    return Response(content=to_json(content), media_type="application/json", headers=headers)
+
+
+async def _ranked_nodes(nodes, node_storage: NodeStorage, work_id: str, account_id: str):
+    """Re-yield nodes with rank_positions applied EXPORT_BATCH_SIZE at a time,
+    so an export carries zero-based positions rather than ORDER_KEYS keys.
+    Every batch is ranked from the one skeleton read at the start."""
+    skeleton = await node_storage.rank_skeleton(work_id, account_id)
+    if skeleton is None:
+        async for node in nodes:
+            yield node
+        return
+    batch: list[dict] = []
+    async for node in nodes:
+        batch.append(node)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            for doc in await node_storage.rank_positions(batch, account_id, skeleton):
+                yield doc
+            batch = []
+    for doc in await node_storage.rank_positions(batch, account_id, skeleton):
+        yield doc
+
+
+def _work_etag(work_id: str, version: int) -> str:
+    """Weak ETag for any representation derived from one Work. The Work's
+    version is bumped after every write to it or its nodes, so the tag
+    changes whenever the data behind the response may have."""
+    return f'W/"{work_id}.{version}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match lists etag (weak comparison) or *."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
 # ----------------------------
 #     Authentication routines
 # ----------------------------
@@ -282,17 +438,21 @@ async def get_current_user(
         )
     except (JWTError, ValidationError):
         raise credentials_exception
-    user = await oauth.get_user_by_account_id(account_id=token_data.username)
-    if user is None:
-        raise credentials_exception
     # check token expiration
     if expires is None:
         raise credentials_exception
     if datetime.now(ZoneInfo("GMT")) > token_data.expires:
         raise credentials_exception
-    # check if the token is blacklisted
-    if await oauth.is_token_blacklisted(token):
-        raise credentials_exception
+    # a recently verified token skips the user lookup and blacklist check
+    user = oauth.get_cached_user(token)
+    if user is None:
+        user = await oauth.get_user_by_account_id(account_id=token_data.username)
+        if user is None:
+            raise credentials_exception
+        # check if the token is blacklisted
+        if await oauth.is_token_blacklisted(token):
+            raise credentials_exception
+        oauth.cache_user(token, user, token_data.expires)
     # if we have a valid user and the token is not expired get the scopes
     token_data.scopes = list(set(token_data.scopes) & set(re.split(r"[, ]+", user.user_role)))
     logger.debug(f"requested scopes in token:{token_scopes}")
@@ -390,12 +550,16 @@ async def list_works(
     response_model=WorkResponse,
     summary="Get a work",
     description=(
-        "Return a single work by its UUID. Returns 404 if the work does not exist "
-        "or belongs to a different account."
+        "Return a single work by its UUID. "
+        "Responses carry a weak `ETag` that changes with every write to the Work; "
+        "send it back in `If-None-Match` to get `304 Not Modified` while nothing changed. "
+        "Returns 404 if the work does not exist or belongs to a different account."
     ),
     tags=["Works"],
 )
 async def get_work(
+    request: Request,
+    response: Response,
     work_id: str = Path(..., pattern=UUID_PATTERN),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     work_storage: WorkStorage = Depends(get_work_storage),
@@ -408,6 +572,10 @@ async def get_work(
         raise HTTPException(status_code=503, detail="Database error")
     if work is None:
         raise HTTPException(status_code=404, detail="Work not found")
+    etag = _work_etag(work_id, work.get("version", 0))
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
     return work
 
 
@@ -482,11 +650,15 @@ async def delete_work(
         "Return aggregate statistics for the specified Work: total node count, "
         "counts by node type (part/chapter/scene), and the maximum hierarchy depth. "
         "Depth is 0-indexed at root Part nodes. "
+        "Responses carry a weak `ETag` that changes with every write to the Work; "
+        "send it back in `If-None-Match` to get `304 Not Modified` while nothing changed. "
         "Returns 404 if the Work does not exist or belongs to a different account."
     ),
     tags=["Works"],
 )
 async def get_work_stats(
+    request: Request,
+    response: Response,
     work_id: str = Path(..., pattern=UUID_PATTERN),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     work_storage: WorkStorage = Depends(get_work_storage),
@@ -494,20 +666,104 @@ async def get_work_stats(
 ) -> dict:
     logger.debug(f"get_work_stats({work_id}) called")
     try:
-        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+        version = await work_storage.get_work_version(work_id=work_id, account_id=account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching work in get_work_stats for {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    if work is None:
+    if version is None:
         raise HTTPException(status_code=404, detail="Work not found")
+    etag = _work_etag(work_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     try:
-        stats = await node_storage.get_stats(work_id=work_id, account_id=account_id)
+        stats = await node_storage.get_stats(
+            work_id=work_id, account_id=account_id, version=version
+        )
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching stats for work {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
+    response.headers["ETag"] = etag
     return stats
 
 
+@app.get(
+    "/works/{work_id}/export",
+    response_class=StreamingResponse,
+    summary="Export a work",
+    description=(
+        "Stream the specified Work and all of its nodes as NDJSON: a `work` record "
+        "followed by one `node` record per node, in no particular order. "
+        "Pass `gzip=true` for a gzip-compressed download. Nodes are read from a single "
+        "database cursor and streamed as they arrive, so any size of Work can be exported. "
+        "Restore with `POST /works/import`. "
+        "Returns 404 if the Work does not exist or belongs to a different account."
+    ),
+    tags=["Works"],
+)
+async def export_work(
+    work_id: str = Path(..., pattern=UUID_PATTERN),
+    gzip: bool = False,
+    account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
+    work_storage: WorkStorage = Depends(get_work_storage),
+    node_storage: NodeStorage = Depends(get_node_storage),
+) -> StreamingResponse:
+    logger.debug(f"export_work({work_id}, gzip={gzip}) called")
+    try:
+        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
+        logger.error(f"Database error fetching work in export_work for {work_id}", exc_info=True)
+        raise HTTPException(status_code=503, detail="Database error")
+    if work is None:
+        raise HTTPException(status_code=404, detail="Work not found")
+    filename = f"work-{work_id}.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_ndjson(
+            work,
+            _ranked_nodes(
+                work_storage.iter_work_nodes(work_id, account_id), node_storage, work_id, account_id
+            ),
+            compress=gzip,
+        ),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.post(
+    "/works/import",
+    response_model=WorkImportResponse,
+    status_code=201,
+    summary="Restore an exported work",
+    description=(
+        "Restore a Work from the NDJSON body produced by `GET /works/{work_id}/export` "
+        "(plain or gzip-compressed, detected automatically) as a new Work of the caller. "
+        "Work and node ids are replaced with fresh UUIDs, so an export can be restored "
+        "alongside the original or into another account. The body is parsed and written "
+        "incrementally. Parents and hierarchy rules are checked once all nodes are "
+        "written; a malformed export returns 422 naming the offending line and nothing "
+        "is kept."
+    ),
+    tags=["Works"],
+)
+async def import_work(
+    request: Request,
+    account_id: str = Security(get_current_active_user_account, scopes=["tree:writer"]),
+    work_storage: WorkStorage = Depends(get_work_storage),
+) -> dict:
+    logger.debug(f"import_work({account_id}) called")
+    try:
+        work = await work_storage.restore_work(account_id, read_ndjson(request.stream()))
+    except InvalidWorkImport as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except pymongo.errors.BulkWriteError:
+        logger.warning("Restored node rejected by the database", exc_info=True)
+        raise HTTPException(status_code=422, detail="The export contains a node the database rejected")
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
+        logger.error("Database error in import_work", exc_info=True)
+        raise HTTPException(status_code=503, detail="Database error")
+    return work
+
+
 # ── Node endpoints — core CRUD ──────────────────────────────────
 
 
@@ -542,6 +798,7 @@ async def create_normalised_node(
         raise HTTPException(status_code=404, detail="Work not found")
 
     # Validate parent exists (when supplied) and hierarchy rules.
+    parent = None
     if request.parent_id is not None:
         try:
             parent = await node_storage.get_node(
@@ -570,13 +827,70 @@ async def create_normalised_node(
             account_id=account_id,
             work_doc=work,
             data=request.model_dump(),
+            parent_doc=parent,
         )
+        await node_storage.rank_positions([node], account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error("Database error in create_normalised_node", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
     return node
 
 
+@app.post(
+    "/works/{work_id}/nodes/bulk",
+    response_model=BulkCreateNodesResponse,
+    status_code=201,
+    summary="Create many nodes at once",
+    description=(
+        "Create a batch of nodes in one work with a handful of database round trips. "
+        "Items may be nested via `children`, reference another item's `ref` via "
+        "`parent_ref`, attach to an existing node of the work via `parent_id`, or be "
+        "root-level `part` nodes. Hierarchy rules are enforced and positions are "
+        "appended after existing siblings in batch order. The whole batch is "
+        "validated before anything is written; an invalid batch returns 422 naming "
+        "the offending item by its index in the flattened (pre-order) batch. "
+        "Returns the created node ids in that order and a `ref` → `node_id` map."
+    ),
+    tags=["Nodes"],
+)
+async def bulk_create_normalised_nodes(
+    work_id: str = Path(..., pattern=UUID_PATTERN),
+    request: BulkCreateNodesRequest = Body(...),
+    account_id: str = Security(get_current_active_user_account, scopes=["tree:writer"]),
+    work_storage: WorkStorage = Depends(get_work_storage),
+    node_storage: NodeStorage = Depends(get_node_storage),
+) -> dict:
+    logger.debug(f"bulk_create_normalised_nodes({work_id}, {len(request.nodes)} items) called")
+
+    try:
+        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
+        logger.error("Database error fetching work in bulk_create_normalised_nodes", exc_info=True)
+        raise HTTPException(status_code=503, detail="Database error")
+    if work is None:
+        raise HTTPException(status_code=404, detail="Work not found")
+
+    items = request.model_dump(mode="json")["nodes"]
+    try:
+        nodes, refs = await node_storage.create_nodes_bulk(
+            account_id=account_id, work_doc=work, items=items
+        )
+    except InvalidBulkNodes as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except pymongo.errors.DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A node with a supplied node_id already exists")
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
+        logger.error("Database error in bulk_create_normalised_nodes", exc_info=True)
+        raise HTTPException(status_code=503, detail="Database error")
+
+    return {
+        "work_id": work_id,
+        "count": len(nodes),
+        "node_ids": [node["node_id"] for node in nodes],
+        "refs": refs,
+    }
+
+
 @app.get(
     "/works/{work_id}/nodes/root",
     response_model=PaginatedNodeResponse,
@@ -586,34 +900,47 @@ async def create_normalised_node(
         "ordered by position ascending. "
         "A Work may have multiple root Part nodes. "
         "Use `limit` (default 50, max 200) and `cursor` to page through results. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
+        "Responses carry a weak `ETag` that changes with every write to the Work; "
+        "send it back in `If-None-Match` to get `304 Not Modified` while nothing changed. "
         "Returns 404 if the Work does not exist or belongs to a different account."
     ),
     tags=["Nodes"],
 )
 async def get_work_root_nodes(
+    request: Request,
     work_id: str = Path(..., pattern=UUID_PATTERN),
     limit: int = Query(50, ge=1, le=200),
     cursor: Optional[str] = Query(None),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     work_storage: WorkStorage = Depends(get_work_storage),
     node_storage: NodeStorage = Depends(get_node_storage),
 ) -> dict:
     logger.debug(f"get_work_root_nodes({work_id}) called")
     try:
-        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+        version = await work_storage.get_work_version(work_id=work_id, account_id=account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching work in get_work_root_nodes for {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    if work is None:
+    if version is None:
         raise HTTPException(status_code=404, detail="Work not found")
+    etag = _work_etag(work_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     try:
         roots, next_cursor = await node_storage.get_roots(
-            work_id=work_id, account_id=account_id, limit=limit, cursor=cursor,
+            work_id=work_id, account_id=account_id, limit=limit, cursor=cursor, fields=fields,
         )
+        await node_storage.rank_positions(roots, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching roots for work {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    return {"results": roots, "count": len(roots), "next_cursor": next_cursor}
+    return _fast_json(
+        {"results": _node_docs(roots, fields), "count": len(roots), "next_cursor": next_cursor},
+        headers={"ETag": etag},
+    )
 
 
 @app.get(
@@ -625,34 +952,47 @@ async def get_work_root_nodes(
         "ordered by position ascending. "
         "Scenes are the terminal narrative units and have no children. "
         "Use `limit` (default 50, max 200) and `cursor` to page through results. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
+        "Responses carry a weak `ETag` that changes with every write to the Work; "
+        "send it back in `If-None-Match` to get `304 Not Modified` while nothing changed. "
         "Returns 404 if the Work does not exist or belongs to a different account."
     ),
     tags=["Nodes"],
 )
 async def get_work_leaf_nodes(
+    request: Request,
     work_id: str = Path(..., pattern=UUID_PATTERN),
     limit: int = Query(50, ge=1, le=200),
     cursor: Optional[str] = Query(None),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     work_storage: WorkStorage = Depends(get_work_storage),
     node_storage: NodeStorage = Depends(get_node_storage),
 ) -> dict:
     logger.debug(f"get_work_leaf_nodes({work_id}) called")
     try:
-        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+        version = await work_storage.get_work_version(work_id=work_id, account_id=account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching work in get_work_leaf_nodes for {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    if work is None:
+    if version is None:
         raise HTTPException(status_code=404, detail="Work not found")
+    etag = _work_etag(work_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     try:
         leaves, next_cursor = await node_storage.get_leaves(
-            work_id=work_id, account_id=account_id, limit=limit, cursor=cursor,
+            work_id=work_id, account_id=account_id, limit=limit, cursor=cursor, fields=fields,
         )
+        await node_storage.rank_positions(leaves, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching leaves for work {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    return {"results": leaves, "count": len(leaves), "next_cursor": next_cursor}
+    return _fast_json(
+        {"results": _node_docs(leaves, fields), "count": len(leaves), "next_cursor": next_cursor},
+        headers={"ETag": etag},
+    )
 
 
 @app.get(
@@ -663,49 +1003,66 @@ async def get_work_leaf_nodes(
         "Return all nodes of the specified work flattened into narrative reading order "
         "(depth-first pre-order, siblings by position). "
         "Use `limit` (default 50, max 200) and an opaque `cursor` (node_id) to page. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
+        "Responses carry a weak `ETag` that changes with every write to the Work; "
+        "send it back in `If-None-Match` to get `304 Not Modified` while nothing changed. "
         "Returns 404 if the work does not exist or belongs to a different account."
     ),
     tags=["Search"],
 )
 async def get_work_reading_order(
+    request: Request,
     work_id: str = Path(..., pattern=UUID_PATTERN),
     limit: int = Query(50, ge=1, le=200),
     cursor: Optional[str] = Query(None, pattern=UUID_PATTERN),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     work_storage: WorkStorage = Depends(get_work_storage),
     node_storage: NodeStorage = Depends(get_node_storage),
 ) -> dict:
     logger.debug(f"get_work_reading_order({work_id}) called")
     try:
-        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+        version = await work_storage.get_work_version(work_id=work_id, account_id=account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching work in get_work_reading_order for {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    if work is None:
+    if version is None:
         raise HTTPException(status_code=404, detail="Work not found")
+    etag = _work_etag(work_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     try:
-        ordered = await node_storage.get_reading_order(work_id=work_id, account_id=account_id)
+        order, index = await node_storage.get_reading_order_ids(
+            work_id=work_id, account_id=account_id, version=version
+        )
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error in get_reading_order for {work_id}", exc_info=True)
+        logger.error(f"Database error in get_reading_order_ids for {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
 
     if cursor is not None:
-        idx = next((i for i, n in enumerate(ordered) if n["node_id"] == cursor), None)
+        idx = index.get(cursor)
         if idx is None:
             raise HTTPException(status_code=422, detail="Invalid cursor")
         start = idx + 1
     else:
         start = 0
 
-    page = ordered[start:start + limit]
-    next_cursor: str | None = page[-1]["node_id"] if len(page) == limit and (start + limit) < len(ordered) else None
+    page_ids = order[start:start + limit]
+    try:
+        page = await node_storage.get_nodes_by_ids(page_ids, account_id=account_id, fields=fields)
+        await node_storage.rank_positions(page, account_id)
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
+        logger.error(f"Database error hydrating reading order page for {work_id}", exc_info=True)
+        raise HTTPException(status_code=503, detail="Database error")
+    next_cursor: str | None = page_ids[-1] if len(page_ids) == limit and (start + limit) < len(order) else None
 
-    return {
+    return _fast_json({
         "work_id": work_id,
-        "nodes": page,
+        "nodes": _node_docs(page, fields),
         "count": len(page),
         "next_cursor": next_cursor,
-    }
+    }, headers={"ETag": etag})
 
 
 @app.get(
@@ -717,15 +1074,21 @@ async def get_work_reading_order(
         "Pass `node_type` as a query parameter to filter by type "
         "(one of: `part`, `chapter`, `scene`). "
         "Use `limit` (default 50, max 200) and `cursor` to page through results. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
+        "Responses carry a weak `ETag` that changes with every write to the Work; "
+        "send it back in `If-None-Match` to get `304 Not Modified` while nothing changed. "
         "Returns 404 if the work does not exist or belongs to a different account."
     ),
     tags=["Nodes"],
 )
 async def list_normalised_nodes(
+    request: Request,
     work_id: str = Path(..., pattern=UUID_PATTERN),
     node_type: Optional[NodeType] = None,
     limit: int = Query(50, ge=1, le=200),
     cursor: Optional[str] = Query(None),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     work_storage: WorkStorage = Depends(get_work_storage),
     node_storage: NodeStorage = Depends(get_node_storage),
@@ -734,12 +1097,15 @@ async def list_normalised_nodes(
 
     # Confirm the work exists and belongs to this account before listing its nodes.
     try:
-        work = await work_storage.get_work(work_id=work_id, account_id=account_id)
+        version = await work_storage.get_work_version(work_id=work_id, account_id=account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error fetching work {work_id} in list_normalised_nodes", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    if work is None:
+    if version is None:
         raise HTTPException(status_code=404, detail="Work not found")
+    etag = _work_etag(work_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
 
     try:
         nodes, next_cursor = await node_storage.list_nodes(
@@ -748,43 +1114,49 @@ async def list_normalised_nodes(
             node_type=node_type.value if node_type is not None else None,
             limit=limit,
             cursor=cursor,
+            fields=fields,
         )
+        await node_storage.rank_positions(nodes, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error listing nodes for work {work_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    return {"results": nodes, "count": len(nodes), "next_cursor": next_cursor}
+    return _fast_json(
+        {"results": _node_docs(nodes, fields), "count": len(nodes), "next_cursor": next_cursor},
+        headers={"ETag": etag},
+    )
 
 
 @app.get(
     "/nodes/{node_id}/children",
-    response_model=list[NodeResponse],
+    response_model=list[NodeResult],
     summary="Get children of a node",
     description=(
         "Return the direct children of the specified node, ordered by position ascending. "
         "Returns an empty list if the node has no children. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
         "Returns 404 if the node does not exist or belongs to a different account."
     ),
     tags=["Nodes"],
 )
 async def get_node_children(
     node_id: str = Path(..., pattern=UUID_PATTERN),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     node_storage: NodeStorage = Depends(get_node_storage),
 ) -> list[dict]:
     logger.debug(f"get_node_children({node_id}) called")
     try:
-        node = await node_storage.get_node(node_id=node_id, account_id=account_id)
+        node, children = await node_storage.get_node_with_children(
+            node_id=node_id, account_id=account_id, fields=fields
+        )
+        await node_storage.rank_positions(children, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error in get_node_children for {node_id}", exc_info=True)
+        logger.error(f"Database error fetching children of {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
     if node is None:
         raise HTTPException(status_code=404, detail="Node not found")
-    try:
-        children = await node_storage.get_children(node_id=node_id, account_id=account_id)
-    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error fetching children of {node_id}", exc_info=True)
-        raise HTTPException(status_code=503, detail="Database error")
-    return children
+    return _fast_json(_node_docs(children, fields))
 
 
 @app.get(
@@ -805,18 +1177,16 @@ async def get_node_parent(
 ) -> dict | None:
     logger.debug(f"get_node_parent({node_id}) called")
     try:
-        node = await node_storage.get_node(node_id=node_id, account_id=account_id)
+        node, ancestors = await node_storage.get_node_lineage(
+            node_id=node_id, account_id=account_id, max_depth=0
+        )
+        await node_storage.rank_positions(ancestors, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error checking node existence in get_node_parent for {node_id}", exc_info=True)
+        logger.error(f"Database error fetching parent of {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
     if node is None:
         raise HTTPException(status_code=404, detail="Node not found")
-    try:
-        parent = await node_storage.get_parent(node_id=node_id, account_id=account_id)
-    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error fetching parent of {node_id}", exc_info=True)
-        raise HTTPException(status_code=503, detail="Database error")
-    return parent
+    return ancestors[-1] if ancestors else None
 
 
 @app.get(
@@ -838,51 +1208,148 @@ async def get_node_ancestors(
 ) -> dict:
     logger.debug(f"get_node_ancestors({node_id}) called")
     try:
-        node = await node_storage.get_node(node_id=node_id, account_id=account_id)
+        node, ancestors = await node_storage.get_node_lineage(
+            node_id=node_id, account_id=account_id
+        )
+        await node_storage.rank_positions(ancestors, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error checking node in get_node_ancestors for {node_id}", exc_info=True)
+        logger.error(f"Database error fetching ancestors of {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
     if node is None:
         raise HTTPException(status_code=404, detail="Node not found")
-    try:
-        ancestors = await node_storage.get_ancestors(node_id=node_id, account_id=account_id)
-    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error fetching ancestors of {node_id}", exc_info=True)
-        raise HTTPException(status_code=503, detail="Database error")
     return {"ancestors": ancestors}
 
 
 @app.get(
     "/nodes/{node_id}/siblings",
-    response_model=list[NodeResponse],
+    response_model=list[NodeResult],
     summary="Get siblings of a node",
     description=(
         "Return nodes that share the same parent as the specified node, excluding the node itself. "
         "Results are ordered by position ascending. "
         "Returns an empty list if the node has no siblings. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
         "Returns 404 if the node does not exist or belongs to a different account."
     ),
     tags=["Nodes"],
 )
 async def get_node_siblings(
     node_id: str = Path(..., pattern=UUID_PATTERN),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     node_storage: NodeStorage = Depends(get_node_storage),
 ) -> list[dict]:
     logger.debug(f"get_node_siblings({node_id}) called")
     try:
-        node = await node_storage.get_node(node_id=node_id, account_id=account_id)
+        node, siblings = await node_storage.get_node_with_siblings(
+            node_id=node_id, account_id=account_id, fields=fields
+        )
+        await node_storage.rank_positions(siblings, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error checking node in get_node_siblings for {node_id}", exc_info=True)
+        logger.error(f"Database error fetching siblings of {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
     if node is None:
         raise HTTPException(status_code=404, detail="Node not found")
+    return _fast_json(_node_docs(siblings, fields))
+
+
+@app.get(
+    "/nodes/{node_id}/neighbourhood",
+    response_model=NodeNeighbourhoodResponse,
+    summary="Get a node with its neighbours",
+    description=(
+        "Return the specified node together with the neighbours named in `include` "
+        "(comma-separated; any of `parent`, `children`, `siblings`, `ancestors`; "
+        "default all) in one request. `parent` is null for a root Part; `ancestors` "
+        "is ordered root-first. Neighbours not requested are omitted from the response. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
+        "Returns 422 for an unknown `include` name. "
+        "Returns 404 if the node does not exist or belongs to a different account."
+    ),
+    tags=["Nodes"],
+)
+async def get_node_neighbourhood(
+    node_id: str = Path(..., pattern=UUID_PATTERN),
+    include: Optional[str] = Query(None, max_length=100),
+    fields: Optional[list[str]] = Depends(get_node_fields),
+    account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
+    node_storage: NodeStorage = Depends(get_node_storage),
+) -> dict:
+    logger.debug(f"get_node_neighbourhood({node_id}, include={include!r}) called")
+    if include is None:
+        wanted = NODE_NEIGHBOURS
+    else:
+        wanted = tuple(name.strip() for name in include.split(",") if name.strip())
+        unknown = sorted(set(wanted) - set(NODE_NEIGHBOURS))
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown neighbour(s): {', '.join(unknown)}")
+    try:
+        result = await node_storage.get_node_neighbourhood(
+            node_id=node_id, account_id=account_id, include=wanted, fields=fields
+        )
+        if result is not None:
+            docs = [
+                result["node"], result.get("parent"), *result.get("children", []),
+                *result.get("siblings", []), *result.get("ancestors", []),
+            ]
+            await node_storage.rank_positions([d for d in docs if d is not None], account_id)
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
+        logger.error(f"Database error fetching neighbourhood of {node_id}", exc_info=True)
+        raise HTTPException(status_code=503, detail="Database error")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    content = {}
+    for name, value in result.items():
+        if isinstance(value, list):
+            content[name] = _node_docs(value, fields)
+        else:
+            content[name] = _node_docs([value], fields)[0] if value is not None else None
+    return _fast_json(content)
+
+
+@app.get(
+    "/nodes/{node_id}/subtree",
+    response_model=NodeTreeResult,
+    summary="Get a node's subtree",
+    description=(
+        "Return the specified node with all of its descendants nested under "
+        "`children` (each list ordered by position), resolved in one database round trip. "
+        f"Use `depth` to limit the levels returned below the node (0 = the node alone, "
+        f"max {MAX_TREE_DEPTH}); without it the whole subtree is returned, or 422 if it "
+        f"is deeper than {MAX_TREE_DEPTH} levels. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
+        "Returns 404 if the node does not exist or belongs to a different account."
+    ),
+    tags=["Nodes"],
+)
+async def get_node_subtree(
+    node_id: str = Path(..., pattern=UUID_PATTERN),
+    depth: Optional[int] = Query(None, ge=0, le=MAX_TREE_DEPTH),
+    fields: Optional[list[str]] = Depends(get_node_fields),
+    account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
+    node_storage: NodeStorage = Depends(get_node_storage),
+) -> dict:
+    logger.debug(f"get_node_subtree({node_id}, depth={depth}) called")
     try:
-        siblings = await node_storage.get_siblings(node_id=node_id, account_id=account_id)
+        tree, nodes = await node_storage.get_nested_subtree(
+            node_id=node_id, account_id=account_id, depth=depth, fields=fields
+        )
+        await node_storage.rank_positions(nodes, account_id)
+    except TreeDepthLimitExceeded as e:
+        raise HTTPException(status_code=422, detail=f"{e}; pass a smaller depth")
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error(f"Database error fetching siblings of {node_id}", exc_info=True)
+        logger.error(f"Database error fetching subtree of {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    return siblings
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    if fields is not None:
+        return JSONResponse(
+            NodeOutlineTree.model_validate(tree).model_dump(mode="json", exclude_unset=True)
+        )
+    return tree
 
 
 # ── Node endpoints — search (Tier 3) ────────────────────────────
@@ -896,6 +1363,8 @@ async def get_node_siblings(
         "Search node `description` and `text` fields for the given query term. "
         "Results are ordered by descending relevance score. "
         "Optionally narrow results by `work_id` and/or `node_type`. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
         "Returns 404 if the node does not exist or belongs to a different account."
     ),
     tags=["Search"],
@@ -905,8 +1374,10 @@ async def search_nodes(
     work_id: Optional[str] = Query(None, pattern=UUID_PATTERN),
     node_type: Optional[NodeType] = None,
     limit: int = Query(50, ge=1, le=200),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     search_storage: SearchStorage = Depends(get_search_storage),
+    node_storage: NodeStorage = Depends(get_node_storage),
 ) -> dict:
     logger.debug(f"search_nodes({query!r}) called")
     try:
@@ -916,7 +1387,9 @@ async def search_nodes(
             work_id=work_id,
             node_type=node_type.value if node_type else None,
             limit=limit,
+            fields=fields,
         )
+        await node_storage.rank_positions(results, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error in search_nodes for query {query!r}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
@@ -926,7 +1399,7 @@ async def search_nodes(
     for r in results:
         r.pop("score", None)
         clean_results.append(r)
-    return {"results": clean_results, "count": len(clean_results)}
+    return _fast_json({"results": _node_docs(clean_results, fields), "count": len(clean_results)})
 
 
 @app.get(
@@ -939,6 +1412,8 @@ async def search_nodes(
         "or `match=all` to require all tags. "
         "Optionally narrow results by `work_id` and/or `node_type`. "
         "Use `limit` (default 50, max 200) to cap results. "
+        "Pass `fields` (e.g. `fields=outline`) to receive slim outline documents "
+        "without the full `text`. "
         "Returns 404 if the node does not exist or belongs to a different account."
     ),
     tags=["Search"],
@@ -949,8 +1424,10 @@ async def nodes_by_tag(
     work_id: Optional[str] = Query(None, pattern=UUID_PATTERN),
     node_type: Optional[NodeType] = None,
     limit: int = Query(50, ge=1, le=200),
+    fields: Optional[list[str]] = Depends(get_node_fields),
     account_id: str = Security(get_current_active_user_account, scopes=["tree:reader"]),
     search_storage: SearchStorage = Depends(get_search_storage),
+    node_storage: NodeStorage = Depends(get_node_storage),
 ) -> dict:
     logger.debug(f"nodes_by_tag(tags={tags!r}, match={match}) called")
     try:
@@ -961,11 +1438,13 @@ async def nodes_by_tag(
             work_id=work_id,
             node_type=node_type.value if node_type else None,
             limit=limit,
+            fields=fields,
         )
+        await node_storage.rank_positions(results, account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error in nodes_by_tag for tags {tags!r}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
-    return {"results": results, "count": len(results)}
+    return _fast_json({"results": _node_docs(results, fields), "count": len(results)})
 
 
 @app.get(
@@ -986,6 +1465,8 @@ async def get_normalised_node(
     logger.debug(f"get_normalised_node({node_id}) called")
     try:
         node = await node_storage.get_node(node_id=node_id, account_id=account_id)
+        if node is not None:
+            await node_storage.rank_positions([node], account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error in get_normalised_node for {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
@@ -1016,34 +1497,27 @@ async def update_normalised_node(
     logger.debug(f"update_normalised_node({node_id}) called")
 
     updates = request.model_dump(exclude_unset=True)
+    parent = node = None
 
     # When reparenting, validate the new parent exists, hierarchy is valid, and no cycle forms.
     if "parent_id" in updates:
         new_parent_id = updates["parent_id"]
         if new_parent_id is not None:
+            # Independent reads: fetch the new parent and the node concurrently.
             try:
-                parent = await node_storage.get_node(
-                    node_id=new_parent_id, account_id=account_id
+                parent, node = await asyncio.gather(
+                    node_storage.get_node(node_id=new_parent_id, account_id=account_id),
+                    node_storage.get_node(node_id=node_id, account_id=account_id),
                 )
             except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
                 logger.error(
-                    f"Database error fetching new parent {new_parent_id} in update_normalised_node",
+                    f"Database error fetching node {node_id} or new parent {new_parent_id} "
+                    f"in update_normalised_node",
                     exc_info=True,
                 )
                 raise HTTPException(status_code=503, detail="Database error")
             if parent is None:
                 raise HTTPException(status_code=404, detail="Parent node not found")
-
-            try:
-                node = await node_storage.get_node(
-                    node_id=node_id, account_id=account_id
-                )
-            except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-                logger.error(
-                    f"Database error fetching node {node_id} in update_normalised_node",
-                    exc_info=True,
-                )
-                raise HTTPException(status_code=503, detail="Database error")
             if node is None:
                 raise HTTPException(status_code=404, detail="Node not found")
 
@@ -1061,6 +1535,7 @@ async def update_normalised_node(
                     node_id=node_id,
                     new_parent_id=new_parent_id,
                     account_id=account_id,
+                    parent_doc=parent,
                 )
             except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
                 logger.error(
@@ -1076,8 +1551,11 @@ async def update_normalised_node(
 
     try:
         result = await node_storage.update_node(
-            node_id=node_id, account_id=account_id, updates=updates
+            node_id=node_id, account_id=account_id, updates=updates,
+            parent_doc=parent, node_doc=node,
         )
+        if result is not None:
+            await node_storage.rank_positions([result], account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error in update_normalised_node for {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
@@ -1124,7 +1602,8 @@ async def delete_normalised_node(
     summary="Reorder a node among its siblings",
     description=(
         "Move the specified node to a new zero-based position among its siblings. "
-        "All siblings are renumbered to maintain a contiguous sequence. "
+        "All siblings are renumbered to maintain a contiguous sequence "
+        "(with `ORDER_KEYS` enabled only the moved node is written). "
         "Positions exceeding the maximum sibling index are clamped to the last valid index. "
         "Returns 404 if the node does not exist or belongs to a different account."
     ),
@@ -1191,6 +1670,8 @@ async def duplicate_node(
             result = await node_storage.duplicate_shallow(
                 node_id=node_id, account_id=account_id
             )
+        if result is not None:
+            await node_storage.rank_positions([result], account_id)
     except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
         logger.error(f"Database error in duplicate_node for {node_id}", exc_info=True)
         raise HTTPException(status_code=503, detail="Database error")
@@ -1284,6 +1765,36 @@ async def get(
     )
 
 
+async def _check_dependencies(request: Request) -> tuple[dict, int]:
+    """Ping MongoDB and Redis through the app's pooled clients.
+
+    The result is cached for HEALTH_CACHE_SECONDS so frequent probes from many
+    orchestrator replicas cost at most one round trip per window.
+    """
+    cached = _health_cache.get("deps")
+    if cached is not None:
+        return cached
+    db_status = "disconnected"
+    try:
+        await asyncio.wait_for(
+            request.app.state.motor_client.admin.command("ping"), HEALTH_TIMEOUT_SECONDS
+        )
+        db_status = "connected"
+    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure, asyncio.TimeoutError):
+        logger.error("Health check: MongoDB ping failed", exc_info=True)
+
+    cache_status = "connected" if await oauth.ping_redis(HEALTH_TIMEOUT_SECONDS) else "disconnected"
+
+    is_healthy = db_status == "connected" and cache_status == "connected"
+    result = (
+        {"status": "ok" if is_healthy else "degraded",
+         "database": db_status, "cache": cache_status},
+        200 if is_healthy else 503,
+    )
+    _health_cache.set("deps", result)
+    return result
+
+
 @app.get(
     "/health",
     response_model=HealthResponse,
@@ -1291,47 +1802,46 @@ async def get(
     description=(
         "Return server health status. Pings MongoDB and Redis to verify connectivity. "
         "Returns HTTP 200 when both are reachable, HTTP 503 if either is down. "
+        "Results are cached for a few seconds (HEALTH_CACHE_SECONDS). "
         "No authentication required — used by Docker HEALTHCHECK."
     ),
     tags=["Meta"],
 )
 async def health_check(request: Request) -> dict:
     logger.debug("health_check() called")
-    db_status = "disconnected"
-    cache_status = "disconnected"
+    content, status_code = await _check_dependencies(request)
+    return JSONResponse(content=content, status_code=status_code)
 
-    temp_client = None
-    try:
-        temp_client = motor.motor_asyncio.AsyncIOMotorClient(
-            MONGO_DETAILS,
-            serverSelectionTimeoutMS=5000,
-            maxPoolSize=1,
-        )
-        await temp_client.admin.command("ping")
-        db_status = "connected"
-    except (pymongo.errors.ConnectionFailure, pymongo.errors.OperationFailure):
-        logger.error("Health check: MongoDB ping failed", exc_info=True)
-    finally:
-        if temp_client is not None:
-            temp_client.close()
 
-    try:
-        conn = aioredis.from_url(
-            REDISHOST, encoding="utf-8", decode_responses=True
-        )
-        await conn.ping()
-        await conn.aclose()
-        cache_status = "connected"
-    except Exception:
-        logger.error("Health check: Redis ping failed", exc_info=True)
+@app.get(
+    "/health/ready",
+    response_model=HealthResponse,
+    summary="Readiness probe",
+    description=(
+        "Same checks as `/health`: HTTP 200 when MongoDB and Redis are reachable, "
+        "HTTP 503 otherwise, cached for HEALTH_CACHE_SECONDS. Use as the "
+        "orchestrator readiness probe. No authentication required."
+    ),
+    tags=["Meta"],
+)
+async def readiness_check(request: Request) -> dict:
+    logger.debug("readiness_check() called")
+    content, status_code = await _check_dependencies(request)
+    return JSONResponse(content=content, status_code=status_code)
 
-    is_healthy = db_status == "connected" and cache_status == "connected"
-    status_code = 200 if is_healthy else 503
-    return JSONResponse(
-        content={"status": "ok" if is_healthy else "degraded",
-                 "database": db_status, "cache": cache_status},
-        status_code=status_code,
-    )
+
+@app.get(
+    "/health/live",
+    response_model=LivenessResponse,
+    summary="Liveness probe",
+    description=(
+        "Return HTTP 200 while the process is serving requests. Touches no "
+        "backing services. No authentication required."
+    ),
+    tags=["Meta"],
+)
+async def liveness_check() -> dict:
+    return {"status": "ok"}
 
 
 @app.get(
@@ -1340,7 +1850,9 @@ async def health_check(request: Request) -> dict:
     summary="Application metrics",
     description=(
         "Return application runtime metrics: uptime, MongoDB connection pool "
-        "size, and total requests handled since server start."
+        "size, total requests handled since server start, Redis connection "
+        "pool usage (null when the pooled client is not running), and bcrypt "
+        "executor load (in-flight and queued hashes)."
     ),
     tags=["Meta"],
 )
@@ -1351,9 +1863,35 @@ async def metrics(request: Request) -> dict:
         "uptime_seconds": uptime,
         "max_pool_size": MONGO_MAX_POOL_SIZE,
         "total_requests": request.app.state.request_count,
+        "redis_pool": oauth.redis_pool_stats(),
+        "password_hash": oauth.password_executor_stats(),
     }
 
 
+@app.get(
+    "/metrics/prometheus",
+    summary="Prometheus metrics",
+    description=(
+        "Return metrics in the Prometheus text exposition format: per-route request "
+        "counts by status, latency histograms, in-flight requests, MongoDB command "
+        "timings, MongoDB pool checkout wait times, and the gauges reported by `/metrics`."
+    ),
+    response_class=Response,
+    tags=["Meta"],
+)
+async def metrics_prometheus(request: Request) -> Response:
+    uptime = (datetime.now(timezone.utc) - request.app.state.start_time).total_seconds()
+    prom.UPTIME.set(uptime)
+    redis_pool = oauth.redis_pool_stats()
+    if redis_pool is not None:
+        prom.REDIS_POOL.set(redis_pool["in_use_connections"], state="in_use")
+        prom.REDIS_POOL.set(redis_pool["available_connections"], state="available")
+    password_hash = oauth.password_executor_stats()
+    prom.PASSWORD_HASH_JOBS.set(password_hash["in_flight"], state="in_flight")
+    prom.PASSWORD_HASH_JOBS.set(password_hash["queued"], state="queued")
+    return Response(content=prom.REGISTRY.render(), media_type=prom.CONTENT_TYPE)
+
+
 # ------------------------
 #          Users
 # ------------------------
@@ -1375,8 +1913,10 @@ async def save_user(
 ) -> dict:
     """save a user to users collection"""
     # hash the password & username before storage
-    request.account_id = pwd_context.hash(request.username)
-    request.password = pwd_context.hash(request.password)
+    request.account_id, request.password = await asyncio.gather(
+        oauth.get_password_hash_async(request.username),
+        oauth.get_password_hash_async(request.password),
+    )
     logger.debug(f"save_user({request.username}) called")
     try:
         save_result = await user_storage.save_user_details(user=request)
@@ -1501,7 +2041,7 @@ async def update_password(
     """update a user document"""
     logger.debug(f"update_password({request}) called")
     # make sure that payload account_id is the same as the one that we're logged in under
-    request.new_password = pwd_context.hash(request.new_password)
+    request.new_password = await oauth.get_password_hash_async(request.new_password)
     if account_id is not None:
         try:
             update_result = await user_storage.update_user_password(
@@ -1,6 +1,9 @@
 
 # from fastapi.security import OAuth2PasswordBearer
+import asyncio
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from time import tzname
 from zoneinfo import ZoneInfo
 from datetime import timedelta, datetime, timezone
@@ -10,12 +13,35 @@ from .models import TokenData
 from typing import Optional
 import logging
 import app.database as database
+from app.cache import LRUCache
+from app.invalidation import invalidation_bus
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 
 logger = logging.getLogger(__name__)
 
 REDISHOST = os.getenv(key="REDISHOST")
+# bcrypt releases the GIL, so a thread pool runs hashes in parallel without
+# blocking the event loop.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+# Verified token -> user cache. Entries live at most AUTH_CACHE_TTL seconds (and
+# never past token expiry); 0 disables the cache.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "60"))
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+def _token_key(token: str) -> str:
+    """Cache key for a token; the digest, so revocations can be broadcast
+    without putting bearer tokens on the invalidation channel."""
+    return hashlib.sha256(token.encode()).hexdigest()
 
 
 class Authentication():
@@ -27,6 +53,11 @@ class Authentication():
         self.ACCESS_TOKEN_EXPIRE_MINUTES = int(
             os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES'))
         self.user_storage = None
+        self._redis = None
+        self._redis_loop = None
+        self._password_jobs = 0
+        self.token_cache = LRUCache(maxsize=AUTH_CACHE_SIZE if AUTH_CACHE_TTL > 0 else 0)
+        self.bus = invalidation_bus
         if client is not None:
             self.user_storage = database.UserStorage(
                 collection_name="user_collection", client=client)
@@ -36,13 +67,105 @@ class Authentication():
         self.user_storage = database.UserStorage(
             collection_name="user_collection", client=client)
 
+    @staticmethod
+    def create_redis_client(url: str | None = None):
+        """Build a long-lived Redis client backed by a bounded connection pool.
+
+        Idle connections are PINGed every REDIS_HEALTH_CHECK_INTERVAL seconds
+        before reuse, and commands are retried with exponential backoff on
+        connection errors/timeouts so a dropped connection is replaced
+        transparently.
+        """
+        pool = redis.BlockingConnectionPool.from_url(
+            url or REDISHOST,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            socket_keepalive=True,
+            retry=Retry(ExponentialBackoff(), 3),
+            retry_on_error=[redis.ConnectionError, redis.TimeoutError],
+            encoding="utf-8",
+            decode_responses=True,
+        )
+        return redis.Redis(connection_pool=pool)
+
+    def set_redis(self, client):
+        """Set the pooled Redis client; called from the FastAPI lifespan on startup.
+        The client is bound to the running event loop."""
+        self._redis = client
+        self._redis_loop = asyncio.get_running_loop()
+
+    async def close_redis(self):
+        """Close the pooled Redis client; called from the FastAPI lifespan on shutdown."""
+        if self._redis is not None:
+            await self._redis.aclose()
+        self._redis = None
+        self._redis_loop = None
+
+    def redis_pool_stats(self) -> dict | None:
+        """Return connection counts for the pooled Redis client, or None if unset."""
+        if self._redis is None:
+            return None
+        pool = self._redis.connection_pool
+        in_use = len(pool._in_use_connections)
+        available = len(pool._available_connections)
+        return {
+            "max_connections": pool.max_connections,
+            "created_connections": in_use + available,
+            "in_use_connections": in_use,
+            "available_connections": available,
+        }
+
     def _get_redis_connection(self):
-        """Get or create Redis connection for the current event loop."""
-        # Create a fresh connection each time to avoid event loop issues
-        # This ensures the connection is always attached to the current event loop
+        """Return (client, pooled) for the current event loop.
+
+        Uses the lifespan's pooled client when running on the loop it was
+        created on. Otherwise (no lifespan, e.g. some tests, or a different
+        loop) falls back to a fresh client, which the caller must close.
+        """
+        if self._redis is not None:
+            try:
+                if asyncio.get_running_loop() is self._redis_loop:
+                    return self._redis, True
+            except RuntimeError:
+                pass
         return redis.from_url(
             REDISHOST, encoding="utf-8", decode_responses=True
-        )
+        ), False
+
+    def get_cached_user(self, token: str):
+        """Return the user cached for an already-verified token, or None."""
+        entry = self.token_cache.get(_token_key(token))
+        return entry[1] if entry is not None else None
+
+    def cache_user(self, token: str, user, expires: datetime) -> None:
+        """Cache a verified (signature, user, blacklist) token for at most
+        AUTH_CACHE_TTL seconds, capped by the token's own expiry."""
+        ttl = min(AUTH_CACHE_TTL, (expires - datetime.now(ZoneInfo("GMT"))).total_seconds())
+        if ttl > 0:
+            self.token_cache.set(_token_key(token), (user.account_id, user), ttl=ttl)
+
+    def invalidate_account(self, account_id: str) -> None:
+        """Drop every cached token of account_id; registered as a UserStorage
+        change listener so updates, disables and deletes take effect at once."""
+        self.token_cache.discard_where(lambda entry: entry[0] == account_id)
+
+    def invalidate_token(self, payload: dict) -> None:
+        """Drop a logged-out token from the cache; subscribed to "token"
+        messages on the invalidation bus, so it runs in every worker."""
+        self.token_cache.pop(payload["token_key"])
+
+    async def ping_redis(self, timeout: float) -> bool:
+        """PING Redis (pooled client when available); False on any failure."""
+        conn, pooled = self._get_redis_connection()
+        try:
+            return bool(await asyncio.wait_for(conn.ping(), timeout))
+        except Exception:
+            logger.error("Redis ping failed", exc_info=True)
+            return False
+        finally:
+            if not pooled:
+                await conn.aclose()
 
     def verify_password(self, plain_password, hashed_password):
         return pwd_context.verify(plain_password, hashed_password)
@@ -50,6 +173,32 @@ class Authentication():
     def get_password_hash(self, password):
         return pwd_context.hash(password)
 
+    async def _run_password_job(self, fn, *args):
+        """Run a bcrypt call on the password executor, tracking in-flight jobs."""
+        self._password_jobs += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                _password_executor, fn, *args
+            )
+        finally:
+            self._password_jobs -= 1
+
+    async def verify_password_async(self, plain_password, hashed_password):
+        """verify_password off the event loop"""
+        return await self._run_password_job(self.verify_password, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password):
+        """get_password_hash off the event loop"""
+        return await self._run_password_job(self.get_password_hash, password)
+
+    def password_executor_stats(self) -> dict:
+        """Return worker count, in-flight bcrypt jobs and how many are queued."""
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "in_flight": self._password_jobs,
+            "queued": max(0, self._password_jobs - PASSWORD_HASH_WORKERS),
+        }
+
     async def get_user_by_username(self, username: str):
         """ returns the details for a given userid """
         return(await self.user_storage.get_user_details_by_username(username=username))
@@ -63,7 +212,7 @@ class Authentication():
         user = await self.get_user_by_username(username)
         if not user:
             return False
-        if not self.verify_password(password, user.password):
+        if not await self.verify_password_async(password, user.password):
             return False
         return user
 
@@ -90,25 +239,29 @@ class Authentication():
         token_data = TokenData(scopes=token_scopes,
                                username=account_id, expires=expires)
 
-        conn = self._get_redis_connection()
+        conn, pooled = self._get_redis_connection()
         try:
             result = await conn.setex(
                 token, int((token_data.expires - datetime.now(ZoneInfo("GMT"))).total_seconds()), 1)
-        except redis.ConnectionError:
+        except (redis.ConnectionError, redis.TimeoutError):
             logger.warning("Redis unavailable; token blacklist write skipped", exc_info=True)
             result = False
         finally:
-            await conn.aclose()
+            if not pooled:
+                await conn.aclose()
+            # Once blacklisted, so a worker re-verifying the token sees it.
+            self.bus.publish("token", token_key=_token_key(token))
         return result
 
     async def is_token_blacklisted(self, token):
         """ return true if supplied token is in the blacklist; fails open when Redis is unavailable"""
-        conn = self._get_redis_connection()
+        conn, pooled = self._get_redis_connection()
         try:
             result = await conn.get(token)
-        except redis.ConnectionError:
+        except (redis.ConnectionError, redis.TimeoutError):
             logger.warning("Redis unavailable; assuming token is not blacklisted", exc_info=True)
             result = None
         finally:
-            await conn.aclose()
+            if not pooled:
+                await conn.aclose()
         return bool(result)
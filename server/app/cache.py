@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Process-local least-recently-used cache with an optional per-entry TTL.
+
+    Not shared between workers: callers must validate entries (e.g. against a
+    version stored in MongoDB) or accept bounded staleness via ttl.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key (marking it recently used) or default."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store value under key, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop key if present."""
+        self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop every entry whose value satisfies predicate. O(n); intended for
+        rare invalidations. Returns the number of entries dropped."""
+        doomed = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in doomed:
+            del self._data[key]
+        return len(doomed)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class WorkSkeleton:
+    """Structural snapshot of one Work: node_id → (parent_id, position, node_type)
+    plus a parent → ordered children map. Holds no node content.
+
+    Derived values (reading order, stats, ...) are memoized per snapshot via
+    memo(), so they are computed at most once per Work version.
+    """
+
+    # Rough per-node footprint (projected doc, tuple, index slots, id strings)
+    # used for the cache's memory budget; deliberately conservative.
+    NODE_BYTES = 800
+
+    def __init__(self, work_id: str, version: int, docs: list[dict]):
+        self.work_id = work_id
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._docs = docs
+        self.nodes: dict[str, tuple[str | None, float, str | None]] = {}
+        self.children: dict[str | None, list[str]] = {}
+        for doc in sorted(docs, key=lambda d: d.get("position", 0)):
+            parent_id = doc.get("parent_id")
+            self.nodes[doc["node_id"]] = (parent_id, doc.get("position", 0), doc.get("node_type"))
+            self.children.setdefault(parent_id, []).append(doc["node_id"])
+        self._memo: dict[str, Any] = {}
+
+    @property
+    def size(self) -> int:
+        return self.NODE_BYTES * max(1, len(self._docs))
+
+    def docs(self) -> list[dict]:
+        """Return the projected {node_id, parent_id, position, node_type} docs
+        the skeleton was built from. Callers must not mutate them."""
+        return self._docs
+
+    def parent_of(self, node_id: str) -> str | None:
+        return self.nodes[node_id][0]
+
+    def children_of(self, node_id: str | None) -> list[str]:
+        return list(self.children.get(node_id, []))
+
+    def siblings_of(self, node_id: str) -> list[str]:
+        parent_id = self.parent_of(node_id)
+        return [n for n in self.children.get(parent_id, []) if n != node_id]
+
+    def ancestors_of(self, node_id: str) -> list[str]:
+        """Ancestor ids root-first, ending with the immediate parent."""
+        chain: list[str] = []
+        seen = {node_id}
+        current = self.parent_of(node_id)
+        while current is not None and current in self.nodes and current not in seen:
+            chain.append(current)
+            seen.add(current)
+            current = self.parent_of(current)
+        chain.reverse()
+        return chain
+
+    def rank_of(self, node_id: str) -> int | None:
+        """Zero-based index of node_id among its siblings, or None if unknown."""
+        ranks = self.memo("ranks", lambda: {
+            child: i for kids in self.children.values() for i, child in enumerate(kids)
+        })
+        return ranks.get(node_id)
+
+    def memo(self, key: str, compute: Callable[[], Any]) -> Any:
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+
+class SkeletonLoad:
+    """Token for one in-flight skeleton load (see WorkTreeCache.begin_load)."""
+
+    __slots__ = ("key", "stale")
+
+    def __init__(self, key: tuple[str, str]):
+        self.key = key
+        self.stale = False
+
+
+class WorkTreeCache:
+    """Process-local LRU of WorkSkeletons bounded by an estimated memory budget.
+
+    Work-scoped reads pass the Work's current version, so a stale snapshot is
+    never served for them. Node-scoped reads locate the snapshot through a
+    node_id index and rely on invalidate() being called by every write path
+    once its writes have landed (locally, and from other workers via the
+    invalidation bus). A load that was already reading when an invalidation
+    arrived may hold pre-write data, so put() refuses it (see begin_load);
+    max_age bounds staleness should an invalidation be missed.
+    """
+
+    def __init__(self, max_bytes: int, max_age: float | None = None):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._works: OrderedDict[tuple[str, str], WorkSkeleton] = OrderedDict()
+        self._node_index: dict[tuple[str, str], str] = {}
+        self._loads: dict[tuple[str, str], set[SkeletonLoad]] = {}
+        # Works last seen above max_bytes; callers read their structure
+        # piecemeal instead of reloading the whole Work on every request.
+        self._oversized = LRUCache(maxsize=1024)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, skeleton: WorkSkeleton) -> bool:
+        return self.max_age is None or time.monotonic() - skeleton.loaded_at < self.max_age
+
+    def get(self, account_id: str, work_id: str, version: int | None = None) -> WorkSkeleton | None:
+        """Return the cached skeleton, or None when absent, expired or (if
+        version is given) built from a different version."""
+        key = (account_id, work_id)
+        skeleton = self._works.get(key)
+        if skeleton is None or not self._fresh(skeleton) or (
+            version is not None and skeleton.version != version
+        ):
+            if skeleton is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._works.move_to_end(key)
+        self.hits += 1
+        return skeleton
+
+    def find_by_node(self, account_id: str, node_id: str) -> WorkSkeleton | None:
+        """Return the cached skeleton containing node_id, if any."""
+        work_id = self._node_index.get((account_id, node_id))
+        if work_id is None:
+            self.misses += 1
+            return None
+        return self.get(account_id, work_id)
+
+    def begin_load(self, account_id: str, work_id: str) -> SkeletonLoad:
+        """Register a load of the Work's skeleton before it reads MongoDB.
+        Pass the token to put(), and to end_load() once done."""
+        load = SkeletonLoad((account_id, work_id))
+        self._loads.setdefault(load.key, set()).add(load)
+        return load
+
+    def end_load(self, load: SkeletonLoad) -> None:
+        loads = self._loads.get(load.key)
+        if loads is not None:
+            loads.discard(load)
+            if not loads:
+                del self._loads[load.key]
+
+    def put(
+        self, account_id: str, work_id: str, version: int, docs: list[dict],
+        load: SkeletonLoad | None = None,
+    ) -> WorkSkeleton:
+        """Build and cache a skeleton from projected node docs; returns it even
+        when it is too large to keep or load was invalidated while reading."""
+        key = (account_id, work_id)
+        skeleton = WorkSkeleton(work_id, version, docs)
+        if load is not None and load.stale:
+            return skeleton
+        self._drop(key)
+        if skeleton.size > self.max_bytes:
+            self._oversized.set(key, True)
+            return skeleton
+        self._oversized.pop(key)
+        self._works[key] = skeleton
+        self.bytes += skeleton.size
+        for node_id in skeleton.nodes:
+            self._node_index[(account_id, node_id)] = work_id
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._works)))
+        return skeleton
+
+    def oversized(self, account_id: str, work_id: str) -> bool:
+        """True when the Work's last load was too large to cache."""
+        return self._oversized.get((account_id, work_id), False)
+
+    def invalidate(self, account_id: str, work_id: str) -> None:
+        """Drop the Work's skeleton and keep loads already reading it out of
+        the cache; called after any write to its nodes has landed."""
+        key = (account_id, work_id)
+        self._drop(key)
+        for load in self._loads.get(key, ()):
+            load.stale = True
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        skeleton = self._works.pop(key, None)
+        if skeleton is None:
+            return
+        account_id, work_id = key
+        self.bytes -= skeleton.size
+        for node_id in skeleton.nodes:
+            if self._node_index.get((account_id, node_id)) == work_id:
+                del self._node_index[(account_id, node_id)]
+
+    def clear(self) -> None:
+        self._works.clear()
+        self._node_index.clear()
+        self._oversized.clear()
+        self.bytes = 0
+        for loads in self._loads.values():
+            for load in loads:
+                load.stale = True
+
+    def __len__(self) -> int:
+        return len(self._works)
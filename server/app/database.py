@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from bisect import bisect_left
 import uuid
+import weakref
 import motor.motor_asyncio
+from collections import deque
+from typing import AsyncIterator, Callable
 from datetime import datetime, timezone
 
 from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
 from app.helpers import get_logger
 from bson.objectid import ObjectId
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.errors import (
+    BulkWriteError,
     ConnectionFailure,
     InvalidOperation,
     OperationFailure,
@@ -18,6 +25,8 @@ from pymongo.errors import (
 from bson.errors import InvalidId
 
 from .models import (
+    CreateWorkRequest,
+    ImportedNode,
     UserDetails,
     UpdateUserDetails,
     UpdateUserPassword,
@@ -25,13 +34,54 @@ from .models import (
     users_saves_helper,
 )
 from app.demo import build_demo_tree
+from app.cache import LRUCache, WorkSkeleton, WorkTreeCache
+from app.invalidation import invalidation_bus
 
 
 MONGO_DETAILS = os.getenv(key="MONGO_DETAILS")
 MAX_TREE_DEPTH = int(os.getenv("MAX_TREE_DEPTH", "100"))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+# Maximum number of nodes accepted by one bulk create request.
+BULK_MAX_NODES = int(os.getenv("BULK_MAX_NODES", "10000"))
+# Cursor batch size when streaming a Work's nodes out for export.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Serve subtree reads from the materialized `ancestors` array. Works that
+# backfill_ancestors() has not yet flagged complete are walked level by level.
+MATERIALIZED_ANCESTORS = bool(os.getenv("MATERIALIZED_ANCESTORS", "False") == "True")
+# Store sibling order as sparse sort keys so a move or copy writes only the moved
+# node; responses still expose zero-based positions. Keys are respaced to
+# multiples of ORDER_KEY_GAP when neighbours end up closer than ORDER_KEY_MIN_GAP.
+ORDER_KEYS = bool(os.getenv("ORDER_KEYS", "False") == "True")
+ORDER_KEY_GAP = int(os.getenv("ORDER_KEY_GAP", "1024"))
+ORDER_KEY_MIN_GAP = float(os.getenv("ORDER_KEY_MIN_GAP", "1e-6"))
+# Memory budget (MB) for cached work skeletons, and the maximum age (seconds)
+# of a skeleton served without checking the Work's version.
+WORK_TREE_CACHE_MB = int(os.getenv("WORK_TREE_CACHE_MB", "64"))
+WORK_TREE_CACHE_MAX_AGE = float(os.getenv("WORK_TREE_CACHE_MAX_AGE", "30"))
 
 logger = get_logger(__name__)
 
+# Structural skeletons of recently read works, shared by all NodeStorage instances
+_work_tree_cache = WorkTreeCache(
+    max_bytes=WORK_TREE_CACHE_MB * 1024 * 1024, max_age=WORK_TREE_CACHE_MAX_AGE
+)
+
+
+# Works whose nodes are all known to carry materialized `ancestors`. The
+# ancestors_backfilled flag only ever goes from false to true, so a hit needs
+# no revalidation.
+_backfilled_works = LRUCache(maxsize=10_000)
+
+# Parents with a background rebalance in flight, and strong refs to the tasks.
+_pending_rebalances: set[str] = set()
+# Background respaces retried this many times while concurrent moves keep
+# invalidating them.
+_REBALANCE_ATTEMPTS = 3
+# rank_positions loads skeletons for at most this many Works per call (search
+# results can span many); beyond it only already-cached skeletons are used.
+_RANK_SKELETON_WORKS = 4
+_background_tasks: set[asyncio.Task] = set()
+
 
 class TreeDepthLimitExceeded(Exception):
     """Raised when tree reconstruction exceeds MAX_TREE_DEPTH."""
@@ -42,6 +92,77 @@ class TreeDepthLimitExceeded(Exception):
         super().__init__(f"Tree depth {depth} exceeds maximum allowed depth of {limit}")
 
 
+class InvalidBulkNodes(Exception):
+    """Raised when a bulk node batch fails in-memory validation; nothing is written.
+    index is the offending item's position in the flattened (pre-order) batch."""
+
+    def __init__(self, index: int | None, message: str):
+        self.index = index
+        self.message = message
+        super().__init__(message if index is None else f"nodes[{index}]: {message}")
+
+
+class InvalidWorkImport(Exception):
+    """Raised when a Work export being restored is malformed; the partially
+    restored Work is removed. line is the 1-based NDJSON line, when known."""
+
+    def __init__(self, line: int | None, message: str):
+        self.line = line
+        self.message = message
+        super().__init__(message if line is None else f"line {line}: {message}")
+
+
+_user_change_listeners: list[Callable[[str], None]] = []
+
+
+def add_user_change_listener(listener: Callable[[str], None]) -> None:
+    """Register listener(account_id), called after any UserStorage write that
+    changes or removes that account (used to drop cached auth results), in
+    this worker and, via the invalidation bus, in every other worker."""
+    _user_change_listeners.append(listener)
+
+
+def _notify_user_changed(account_id: str | None) -> None:
+    if account_id is None:
+        return
+    invalidation_bus.publish("account", account_id=account_id)
+
+
+def _run_user_change_listeners(payload: dict) -> None:
+    for listener in _user_change_listeners:
+        try:
+            listener(payload["account_id"])
+        except Exception:
+            logger.error(f"User change listener failed for {payload['account_id']}", exc_info=True)
+
+
+# Works invalidated inside a transaction, held until _flush_invalidations()
+# runs after it ends: a worker reloading before the commit would otherwise
+# cache the pre-commit state as current.
+_deferred_invalidations: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _invalidate_work(account_id: str, work_id: str, session=None) -> None:
+    """Drop the Work's cached skeleton here and in every other worker; call
+    once the write has landed. Deferred while session is in a transaction."""
+    if session is not None and session.in_transaction:
+        _deferred_invalidations.setdefault(session, set()).add((account_id, work_id))
+        return
+    invalidation_bus.publish("work", account_id=account_id, work_id=work_id)
+
+
+def _flush_invalidations(session) -> None:
+    """Publish the invalidations deferred by session's transaction."""
+    for account_id, work_id in _deferred_invalidations.pop(session, ()):
+        invalidation_bus.publish("work", account_id=account_id, work_id=work_id)
+
+
+invalidation_bus.subscribe("account", _run_user_change_listeners)
+invalidation_bus.subscribe(
+    "work", lambda payload: _work_tree_cache.invalidate(payload["account_id"], payload["work_id"])
+)
+invalidation_bus.on_reset(lambda: _work_tree_cache.clear())
+
 
 class UserStorage:
     def __init__(
@@ -182,6 +303,7 @@ class UserStorage:
                     exc_info=True,
                 )
                 raise
+            _notify_user_changed(account_id)
             try:
                 updated_user = await self.user_collection.find_one(
                     {"account_id": account_id}
@@ -212,6 +334,7 @@ class UserStorage:
                     exc_info=True,
                 )
                 raise
+            _notify_user_changed(account_id)
             try:
                 updated_user = await self.user_collection.find_one(
                     {"account_id": account_id}
@@ -241,6 +364,7 @@ class UserStorage:
                     exc_info=True,
                 )
                 raise
+            _notify_user_changed(account_id)
             try:
                 updated_user = await self.user_collection.find_one(
                     {"account_id": account_id}
@@ -260,8 +384,8 @@ class UserStorage:
         """delete a user's details from the user collection by document id"""
         logger.debug(f"delete_user_details({id}) called")
         try:
-            delete_response = await self.user_collection.delete_one(
-                {"_id": ObjectId(id)}
+            deleted = await self.user_collection.find_one_and_delete(
+                {"_id": ObjectId(id)}, projection={"account_id": 1}
             )
         except (InvalidId, ConnectionFailure, OperationFailure) as e:
             logger.error(
@@ -269,8 +393,10 @@ class UserStorage:
                 exc_info=True,
             )
             raise
-
-        return delete_response.deleted_count
+        if deleted is None:
+            return 0
+        _notify_user_changed(deleted.get("account_id"))
+        return 1
 
     async def delete_user_details_by_account_id(self, account_id: str) -> dict:
         """delete a user's details from the user collection"""
@@ -285,6 +411,7 @@ class UserStorage:
                 exc_info=True,
             )
             raise
+        _notify_user_changed(account_id)
         # now remove any documents belonging to the users
         logger.debug(f"Removing documents for {account_id}")
         try:
@@ -334,12 +461,354 @@ def is_valid_parent_child(parent_type: str | None, child_type: str) -> bool:
     return child_type in _VALID_CHILDREN.get(parent_type, set())
 
 
+_NODE_TYPES = set().union(*_VALID_CHILDREN.values())
+# Optional node fields carried over from a restored record when present.
+_RESTORED_NODE_FIELDS = {"author", "description", "text", "previous", "next"}
+
+
+def _import_record(model: type[BaseModel], line: int, data: dict) -> BaseModel:
+    """Validate one record of a Work export against model, reporting the
+    first failure as an InvalidWorkImport for line."""
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise InvalidWorkImport(line, f"invalid {field}: {error['msg']}")
+
+
+def _parse_timestamp(line: int, value, default: datetime) -> datetime:
+    if value is None:
+        return default
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidWorkImport(line, f"invalid timestamp {value!r}")
+
+
+def _restored_node_doc(
+    line: int, record: dict, new_id: Callable[[str], str],
+    work_id: str, account_id: str, now: datetime,
+) -> dict:
+    """Build a node document for work_id from an export "node" record,
+    validated as an ImportedNode and with node_id, parent_id and ancestors
+    mapped through new_id. depth is recomputed from the ancestors."""
+    raw = record.get("node") if record.get("type") == "node" else None
+    if not isinstance(raw, dict):
+        raise InvalidWorkImport(line, "expected a node record")
+    # NodeType still lists retired types that no parent accepts.
+    if raw.get("node_type") not in _NODE_TYPES:
+        raise InvalidWorkImport(line, f"invalid node_type {raw.get('node_type')!r}")
+    node = _import_record(ImportedNode, line, raw)
+    doc = {
+        "node_id":    new_id(node.node_id),
+        "work_id":    work_id,
+        "account_id": account_id,
+        "node_type":  node.node_type.value,
+        "parent_id":  new_id(node.parent_id) if node.parent_id is not None else None,
+        "position":   node.position,
+        "tag":        node.tag,
+        **node.model_dump(include=_RESTORED_NODE_FIELDS, exclude_unset=True),
+        "tags":       node.tags or [],
+        "created_at": _parse_timestamp(line, raw.get("created_at"), now),
+        "updated_at": _parse_timestamp(line, raw.get("updated_at"), now),
+    }
+    if node.ancestors is not None:
+        doc["ancestors"] = [new_id(a) for a in node.ancestors]
+        doc["depth"] = len(doc["ancestors"])
+    return doc
+
+
+def _position_counter_id(account_id: str, work_id: str | None, parent_id: str | None) -> str:
+    """_id of the position counter for parent_id's children (the Work's roots when None)."""
+    if parent_id is not None:
+        return f"{account_id}:{parent_id}"
+    return f"{account_id}:root:{work_id}"
+
+
+def _key_between(before: float | None, after: float) -> float | None:
+    """Return an order key strictly between two sibling keys (before=None
+    means the first slot), or None when none exists without rebalancing."""
+    if before is None:
+        key = after / 2
+        return key if 0 < key < after else None
+    key = (before + after) / 2
+    return key if before < key < after else None
+
+
+# Fields every projected node read returns: enough to place a node in an outline.
+NODE_OUTLINE_FIELDS = ("node_id", "work_id", "node_type", "parent_id", "position", "tag")
+
+
+# Related nodes get_node_neighbourhood can return alongside a node.
+NODE_NEIGHBOURS = ("parent", "children", "siblings", "ancestors")
+
+
+def _node_projection(fields: list[str] | None) -> dict | None:
+    """Return a find() projection for the outline fields plus fields, or None
+    (the whole document) when fields is None."""
+    if fields is None:
+        return None
+    return {name: 1 for name in (*NODE_OUTLINE_FIELDS, *fields)}
+
+
 def _strip_id(doc: dict) -> dict:
     """Remove the MongoDB _id field from a document dict in-place and return it."""
     doc.pop("_id", None)
     return doc
 
 
+def _group_by_parent(docs: list[dict]) -> dict[str | None, list[dict]]:
+    """Build an in-memory parent_id → children map, each child list sorted by position."""
+    parent_to_children: dict[str | None, list[dict]] = {}
+    for doc in docs:
+        parent_to_children.setdefault(doc.get("parent_id"), []).append(doc)
+    for children in parent_to_children.values():
+        children.sort(key=lambda doc: doc["position"])
+    return parent_to_children
+
+
+def _nest_subtree(root: dict, descendants: list[dict]) -> dict:
+    """Attach descendants to root as nested, position-ordered `children`
+    lists in O(n); the internal `_depth` key is dropped."""
+    by_parent = _group_by_parent(descendants)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        node.pop("_depth", None)
+        node["children"] = by_parent.get(node["node_id"], [])
+        stack.extend(node["children"])
+    return root
+
+
+def _preorder(docs: list[dict]) -> list[dict]:
+    """Return docs in depth-first pre-order from the roots, siblings by position.
+    A visited set guards against cycles; orphans are omitted."""
+    parent_to_children = _group_by_parent(docs)
+    ordered: list[dict] = []
+    visited: set[str] = set()
+    stack: list[dict] = list(reversed(parent_to_children.get(None, [])))
+    while stack:
+        doc = stack.pop()
+        node_id = doc["node_id"]
+        if node_id in visited:
+            logger.error(f"Cycle detected: node {node_id} already visited")
+            continue
+        visited.add(node_id)
+        ordered.append(doc)
+        stack.extend(reversed(parent_to_children.get(node_id, [])))
+    return ordered
+
+
+def _summarise_structure(work_id: str, docs: list[dict]) -> dict:
+    """Return WorkStatsResponse-shaped counts by type and max depth for a Work's nodes.
+
+    Depth is 0-indexed at root (parent_id=None) nodes and found with a single
+    breadth-first pass over an in-memory parent→children map; a visited set
+    guards against corrupt parent_id cycles.
+    """
+    by_type: dict[str, int] = {"part": 0, "chapter": 0, "scene": 0}
+    parent_to_children: dict[str | None, list[str]] = {}
+    for doc in docs:
+        if doc.get("node_type") in by_type:
+            by_type[doc["node_type"]] += 1
+        parent_to_children.setdefault(doc.get("parent_id"), []).append(doc["node_id"])
+
+    max_depth = 0
+    visited: set[str] = set()
+    queue: deque[tuple[str, int]] = deque(
+        (node_id, 0) for node_id in parent_to_children.get(None, [])
+    )
+    while queue:
+        node_id, depth = queue.popleft()
+        if node_id in visited:
+            continue
+        visited.add(node_id)
+        max_depth = max(max_depth, depth)
+        for child_id in parent_to_children.get(node_id, []):
+            queue.append((child_id, depth + 1))
+
+    return {
+        "work_id":     work_id,
+        "total_nodes": sum(by_type.values()),
+        "by_type":     by_type,
+        "max_depth":   max_depth,
+    }
+
+
+def _child_lineage(parent: dict | None) -> dict | None:
+    """Return the materialized {ancestors, depth} fields for a child of parent.
+
+    parent=None means a root node. Returns None when the parent itself has no
+    materialized ancestors yet (pre-backfill data), in which case the child is
+    left without them too so a present `ancestors` array is always complete.
+    """
+    if parent is None:
+        return {"ancestors": [], "depth": 0}
+    if "ancestors" not in parent:
+        return None
+    ancestors = [*parent["ancestors"], parent["node_id"]]
+    return {"ancestors": ancestors, "depth": len(ancestors)}
+
+
+def _own_lineage(node: dict) -> dict | None:
+    """Return a copy of node's own materialized {ancestors, depth}, if present."""
+    if "ancestors" not in node:
+        return None
+    return {"ancestors": list(node["ancestors"]), "depth": len(node["ancestors"])}
+
+
+def _copy_node_doc(
+    node: dict, parent_id: str | None, position: int, tag: str, now: datetime,
+    lineage: dict | None = None,
+) -> dict:
+    """Return a fresh node document copied from node with a new node_id.
+    lineage supplies the copy's materialized {ancestors, depth}, when known."""
+    doc = {
+        "node_id":     str(uuid.uuid4()),
+        "work_id":     node["work_id"],
+        "account_id":  node["account_id"],
+        "author":      node.get("author"),
+        "node_type":   node["node_type"],
+        "parent_id":   parent_id,
+        "position":    position,
+        "tag":         tag,
+        "description": node.get("description"),
+        "text":        node.get("text"),
+        "previous":    node.get("previous"),
+        "next":        node.get("next"),
+        "tags":        list(node.get("tags") or []),
+        "created_at":  now,
+        "updated_at":  now,
+    }
+    if lineage is not None:
+        doc.update(lineage)
+    return doc
+
+
+def _new_node_doc(
+    data: dict, work_id: str, account_id: str, author: str | None,
+    parent_id: str | None, position: int, now: datetime, lineage: dict | None = None,
+) -> dict:
+    """Return a new node document built from request data."""
+    doc = {
+        "node_id":     data.get("node_id") or str(uuid.uuid4()),
+        "work_id":     work_id,
+        "account_id":  account_id,
+        "author":      author,
+        "node_type":   data["node_type"],
+        "parent_id":   parent_id,
+        "position":    position,
+        "tag":         data["tag"],
+        "description": data.get("description"),
+        "text":        data.get("text"),
+        "previous":    data.get("previous"),
+        "next":        data.get("next"),
+        "tags":        data.get("tags") or [],
+        "created_at":  now,
+        "updated_at":  now,
+    }
+    if lineage is not None:
+        doc.update(lineage)
+    return doc
+
+
+def _flatten_bulk_items(items: list[dict]) -> list[dict]:
+    """Flatten nested bulk items (via "children") into pre-order. Each entry
+    gets parent_index: the index of its enclosing item, or None at top level."""
+    flat: list[dict] = []
+    stack: list[tuple[dict, int | None]] = [(item, None) for item in reversed(items)]
+    while stack:
+        item, parent_index = stack.pop()
+        entry = dict(item)
+        children = entry.pop("children", None) or []
+        entry["parent_index"] = parent_index
+        flat.append(entry)
+        stack.extend((child, len(flat) - 1) for child in reversed(children))
+    return flat
+
+
+def _plan_bulk_nodes(
+    flat: list[dict],
+    work_doc: dict,
+    account_id: str,
+    existing_parents: dict[str, dict],
+    now: datetime,
+) -> list[dict]:
+    """Validate a flattened bulk batch in memory and build its node documents.
+
+    Items attach to a batch item (nesting or parent_ref), an existing node of
+    the Work (parent_id, looked up in existing_parents) or the root. Hierarchy
+    rules, ref/node_id uniqueness, reference cycles and MAX_TREE_DEPTH are
+    checked. Positions are numbered from 0 per parent in batch order; the
+    caller offsets those under existing parents and the root.
+    Returns documents in batch order. Raises InvalidBulkNodes.
+    """
+    refs: dict[str, int] = {}
+    for i, entry in enumerate(flat):
+        ref = entry.get("ref")
+        if ref is not None:
+            if ref in refs:
+                raise InvalidBulkNodes(i, f"duplicate ref '{ref}'")
+            refs[ref] = i
+
+    children: dict[int | None, list[int]] = {}
+    for i, entry in enumerate(flat):
+        parent_ref, parent_id = entry.get("parent_ref"), entry.get("parent_id")
+        if entry["parent_index"] is not None and (parent_ref or parent_id):
+            raise InvalidBulkNodes(i, "nested items must not set parent_ref or parent_id")
+        if parent_ref and parent_id:
+            raise InvalidBulkNodes(i, "set at most one of parent_ref and parent_id")
+        if parent_ref:
+            if parent_ref not in refs:
+                raise InvalidBulkNodes(i, f"unknown parent_ref '{parent_ref}'")
+            entry["parent_index"] = refs[parent_ref]
+        elif parent_id and parent_id not in existing_parents:
+            raise InvalidBulkNodes(i, f"parent {parent_id} not found in this work")
+        children.setdefault(entry["parent_index"], []).append(i)
+
+    docs: list[dict | None] = [None] * len(flat)
+    positions: dict[str | None, int] = {}
+    node_ids: set[str] = set()
+    # Breadth-first from items attached outside the batch, so every parent
+    # document (and its lineage) exists before its children are built.
+    queue: deque[int] = deque(children.get(None, []))
+    while queue:
+        i = queue.popleft()
+        entry = flat[i]
+        if entry["parent_index"] is not None:
+            parent = docs[entry["parent_index"]]
+        else:
+            parent = existing_parents.get(entry.get("parent_id"))
+        parent_id = parent["node_id"] if parent is not None else None
+        parent_type = parent["node_type"] if parent is not None else None
+        if not is_valid_parent_child(parent_type, entry["node_type"]):
+            if parent_type is None:
+                raise InvalidBulkNodes(i, "only 'part' nodes may have no parent")
+            raise InvalidBulkNodes(
+                i, f"a {entry['node_type']} cannot be a child of a {parent_type}"
+            )
+        lineage = _child_lineage(parent)
+        if lineage is not None and lineage["depth"] > MAX_TREE_DEPTH:
+            raise InvalidBulkNodes(i, f"depth exceeds maximum allowed depth of {MAX_TREE_DEPTH}")
+        position = positions.get(parent_id, 0)
+        positions[parent_id] = position + 1
+        doc = _new_node_doc(
+            entry, work_doc["work_id"], account_id, work_doc.get("author"),
+            parent_id, position, now, lineage,
+        )
+        if doc["node_id"] in node_ids:
+            raise InvalidBulkNodes(i, f"duplicate node_id {doc['node_id']}")
+        node_ids.add(doc["node_id"])
+        docs[i] = doc
+        queue.extend(children.get(i, []))
+
+    for i, doc in enumerate(docs):
+        if doc is None:
+            raise InvalidBulkNodes(i, "parent_ref cycle")
+    return docs
+
+
 # ----------------------------------------------------------------
 # MongoDB collection validators and indexes  (T-09)
 # ----------------------------------------------------------------
@@ -353,6 +822,8 @@ _WORK_VALIDATOR = {
             "account_id": {"bsonType": "string", "minLength": 1},
             "title":      {"bsonType": "string", "minLength": 1},
             "tags":       {"bsonType": "array", "items": {"bsonType": "string"}},
+            "version":    {"bsonType": ["int", "long"], "minimum": 0},
+            "ancestors_backfilled": {"bsonType": "bool"},
         },
     }
 }
@@ -367,8 +838,10 @@ _NODE_VALIDATOR = {
             "work_id":    {"bsonType": "string", "pattern": _UUID4_RE},
             "account_id": {"bsonType": "string", "minLength": 1},
             "tag":        {"bsonType": "string", "minLength": 1},
-            "position":   {"bsonType": ["int", "long"], "minimum": 0},
+            "position":   {"bsonType": ["int", "long", "double"], "minimum": 0},
             "tags":       {"bsonType": "array", "items": {"bsonType": "string"}},
+            "ancestors":  {"bsonType": "array", "items": {"bsonType": "string"}},
+            "depth":      {"bsonType": ["int", "long"], "minimum": 0},
         },
     }
 }
@@ -422,6 +895,7 @@ async def setup_collections(db) -> None:
     work_col = db.get_collection("work_collection")
     await work_col.create_index([("work_id", 1)], unique=True)
     await work_col.create_index([("account_id", 1)])
+    await work_col.create_index([("account_id", 1), ("tags", 1)])
 
     node_col = db.get_collection("node_collection")
     await node_col.create_index([("node_id", 1)], unique=True)
@@ -429,6 +903,10 @@ async def setup_collections(db) -> None:
     await node_col.create_index([("account_id", 1), ("parent_id", 1)])
     await node_col.create_index([("account_id", 1), ("node_type", 1)])
     await node_col.create_index([("account_id", 1), ("node_id", 1)])
+    await node_col.create_index([("account_id", 1), ("ancestors", 1)])
+
+    # Per-parent sibling position counters (NodeStorage._allocate_positions)
+    await db.get_collection("position_counters").create_index([("work_id", 1)])
 
     # Tier 3 — Search indexes
     await node_col.create_index(
@@ -443,6 +921,81 @@ async def setup_collections(db) -> None:
     logger.debug("setup_collections() complete")
 
 
+def _materialize_ancestors(docs: list[dict]) -> dict[str, list[str]]:
+    """Return {node_id: ancestors root-first} for every node reachable from a
+    root of docs. Orphaned or cyclic nodes are omitted."""
+    parent_to_children = _group_by_parent(docs)
+    lineage: dict[str, list[str]] = {}
+    queue: deque[tuple[dict, list[str]]] = deque(
+        (root, []) for root in parent_to_children.get(None, [])
+    )
+    while queue:
+        node, ancestors = queue.popleft()
+        if node["node_id"] in lineage:
+            logger.error(f"Cycle detected: node {node['node_id']} already visited")
+            continue
+        lineage[node["node_id"]] = ancestors
+        child_ancestors = [*ancestors, node["node_id"]]
+        for child in parent_to_children.get(node["node_id"], []):
+            queue.append((child, child_ancestors))
+    return lineage
+
+
+async def backfill_ancestors(db, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """One-off migration: materialize `ancestors` and `depth` on every node.
+
+    Works are processed one at a time from a single projected fetch each, and
+    updates are sent as unordered bulk_writes of batch_size. A Work is flagged
+    ancestors_backfilled once no node of it is left without `ancestors`;
+    only flagged Works are served from the materialized path. Idempotent.
+    Returns the number of nodes written.
+    """
+    logger.debug("backfill_ancestors() called")
+    work_col = db.get_collection("work_collection")
+    node_col = db.get_collection("node_collection")
+    written = 0
+    async for work in work_col.find({}, {"_id": 0, "work_id": 1, "account_id": 1}):
+        try:
+            docs = await node_col.find(
+                {"account_id": work["account_id"], "work_id": work["work_id"]},
+                {"_id": 0, "node_id": 1, "parent_id": 1, "position": 1},
+            ).to_list(None)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred loading nodes of work {work['work_id']}", exc_info=True)
+            raise
+        ops = [
+            UpdateOne(
+                {"node_id": node_id},
+                {"$set": {"ancestors": ancestors, "depth": len(ancestors)}},
+            )
+            for node_id, ancestors in _materialize_ancestors(docs).items()
+        ]
+        for start in range(0, len(ops), batch_size):
+            try:
+                await node_col.bulk_write(ops[start:start + batch_size], ordered=False)
+            except (ConnectionFailure, OperationFailure):
+                logger.error(f"Exception occurred backfilling work {work['work_id']}", exc_info=True)
+                raise
+        written += len(ops)
+        try:
+            # Nodes created under a not yet backfilled parent while this ran
+            # have no ancestors; leave such a Work for the next run.
+            missing = await node_col.count_documents(
+                {"account_id": work["account_id"], "work_id": work["work_id"],
+                 "ancestors": {"$exists": False}},
+                limit=1,
+            )
+            if not missing:
+                await work_col.update_one(
+                    {"work_id": work["work_id"]}, {"$set": {"ancestors_backfilled": True}}
+                )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred flagging work {work['work_id']}", exc_info=True)
+            raise
+    logger.debug(f"backfill_ancestors() wrote {written} nodes")
+    return written
+
+
 # ================================================================
 #  WorkStorage  (T-05)
 # ================================================================
@@ -453,9 +1006,14 @@ class WorkStorage:
         self.database = self.client.fabulator
         self.work_collection = self.database.get_collection("work_collection")
         self.node_collection = self.database.get_collection("node_collection")
+        self.counter_collection = self.database.get_collection("position_counters")
 
-    async def create_work(self, account_id: str, data: dict, session=None) -> dict:
-        """Insert a new Work document and return it."""
+    async def create_work(
+        self, account_id: str, data: dict, session=None, ancestors_backfilled: bool = True,
+    ) -> dict:
+        """Insert a new Work document and return it. Nodes of a new Work get
+        materialized ancestors as they are created, so it starts flagged
+        ancestors_backfilled unless the caller writes nodes some other way."""
         logger.debug(f"create_work({account_id}) called")
         now = datetime.now(timezone.utc)
         doc = {
@@ -465,6 +1023,8 @@ class WorkStorage:
             "description": data.get("description"),
             "author":      data.get("author"),
             "tags":        data.get("tags") or [],
+            "version":     0,
+            "ancestors_backfilled": ancestors_backfilled,
             "created_at":  now,
             "updated_at":  now,
         }
@@ -487,6 +1047,23 @@ class WorkStorage:
             raise
         return _strip_id(doc) if doc else None
 
+    async def get_work_version(self, work_id: str, account_id: str) -> int | None:
+        """Return the Work's version, or None if not found / wrong account.
+
+        Every write to the Work or its nodes bumps the version after the write
+        lands, so it is a cheap validator for anything derived from the Work.
+        Reads only the version field."""
+        logger.debug(f"get_work_version({work_id}) called")
+        try:
+            doc = await self.work_collection.find_one(
+                {"work_id": work_id, "account_id": account_id},
+                {"_id": 0, "version": 1},
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred reading version of work {work_id}", exc_info=True)
+            raise
+        return doc.get("version", 0) if doc else None
+
     async def list_works(
         self, account_id: str, limit: int = 50, cursor: str | None = None
     ) -> tuple[list[dict], str | None]:
@@ -521,14 +1098,24 @@ class WorkStorage:
     async def update_work(
         self, work_id: str, account_id: str, updates: dict, session=None
     ) -> dict | None:
-        """Apply field updates to a Work; cascade author to all child nodes if changed.
-        Returns the updated document or None if not found."""
+        """Apply field updates to a Work and bump its version; cascade author to
+        all child nodes if changed. Returns the updated document or None if not found.
+
+        The author cascade runs first so the version bump lands after every
+        write it covers: a reader never sees the new version with old nodes."""
         logger.debug(f"update_work({work_id}) called")
         updates["updated_at"] = datetime.now(timezone.utc)
+        if "author" in updates:
+            await self.cascade_author_to_nodes(
+                work_id=work_id,
+                account_id=account_id,
+                author=updates["author"],
+                session=session,
+            )
         try:
             result = await self.work_collection.find_one_and_update(
                 {"work_id": work_id, "account_id": account_id},
-                {"$set": updates},
+                {"$set": updates, "$inc": {"version": 1}},
                 return_document=ReturnDocument.AFTER,
                 session=session,
             )
@@ -537,13 +1124,7 @@ class WorkStorage:
             raise
         if result is None:
             return None
-        if "author" in updates:
-            await self.cascade_author_to_nodes(
-                work_id=work_id,
-                account_id=account_id,
-                author=updates["author"],
-                session=session,
-            )
+        _invalidate_work(account_id, work_id, session)
         return _strip_id(result)
 
     async def cascade_author_to_nodes(
@@ -584,13 +1165,158 @@ class WorkStorage:
                 {"work_id": work_id, "account_id": account_id},
                 session=session,
             )
+            await self.counter_collection.delete_many({"work_id": work_id}, session=session)
         except (ConnectionFailure, OperationFailure):
             logger.error(
                 f"Exception occurred deleting nodes for work {work_id}", exc_info=True
             )
             raise
+        finally:
+            _invalidate_work(account_id, work_id, session)
         return True, node_result.deleted_count
 
+    async def iter_work_nodes(self, work_id: str, account_id: str) -> AsyncIterator[dict]:
+        """Yield every node of the Work (without _id/account_id) from a single
+        cursor read in EXPORT_BATCH_SIZE batches, so memory stays constant in
+        the Work's size. Unordered; parent_id carries the structure."""
+        logger.debug(f"iter_work_nodes({work_id}) called")
+        try:
+            async for doc in self.node_collection.find(
+                {"account_id": account_id, "work_id": work_id},
+                {"_id": 0, "account_id": 0},
+            ).batch_size(EXPORT_BATCH_SIZE):
+                yield doc
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred streaming nodes of work {work_id}", exc_info=True)
+            raise
+
+    async def restore_work(
+        self, account_id: str, records: AsyncIterator[tuple[int, dict]]
+    ) -> dict:
+        """Restore an exported Work (see app.export) as a new Work of account_id.
+
+        records yields (line, record): a "work" record, then "node" records in
+        any order, validated with the same limits as the create endpoints
+        (CreateWorkRequest, ImportedNode). Work and node ids are replaced with fresh UUIDs (parent_id
+        and ancestors remapped to match) and nodes are written with insert_many
+        in BULK_BATCH_SIZE chunks as they arrive, so memory holds one chunk plus
+        the id map. Parents and hierarchy rules are checked once every node is
+        in; on any failure the partially restored Work is deleted. The Work is
+        flagged ancestors_backfilled only if every record's ancestors match
+        the restored parent chain.
+        Returns the new Work document plus `total_nodes`."""
+        logger.debug(f"restore_work({account_id}) called")
+        line, record = await anext(records, (1, None))
+        header = record.get("work") if isinstance(record, dict) and record.get("type") == "work" else None
+        if not isinstance(header, dict) or not isinstance(header.get("title"), str):
+            raise InvalidWorkImport(line, "expected a work record with a title first")
+        work = await self.create_work(
+            account_id, _import_record(CreateWorkRequest, line, header).model_dump(),
+            ancestors_backfilled=False,
+        )
+        work_id = work["work_id"]
+
+        ids: dict[str, str] = {}
+        node_types: dict[str, str] = {}
+        parents: dict[str, str | None] = {}
+        ancestors: dict[str, list[str] | None] = {}
+        batch: list[dict] = []
+        total = 0
+        now = datetime.now(timezone.utc)
+
+        def new_id(old_id: str) -> str:
+            return ids.setdefault(old_id, str(uuid.uuid4()))
+
+        def original(node_id: str) -> str:
+            return next(old for old, new in ids.items() if new == node_id)
+
+        try:
+            async for line, record in records:
+                doc = _restored_node_doc(line, record, new_id, work_id, account_id, now)
+                if doc["node_id"] in node_types:
+                    raise InvalidWorkImport(line, f"duplicate node_id {original(doc['node_id'])}")
+                node_types[doc["node_id"]] = doc["node_type"]
+                parents[doc["node_id"]] = doc["parent_id"]
+                ancestors[doc["node_id"]] = doc.get("ancestors")
+                batch.append(doc)
+                if len(batch) >= BULK_BATCH_SIZE:
+                    await self._insert_restored(batch, work_id)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                await self._insert_restored(batch, work_id)
+                total += len(batch)
+            for node_id, parent_id in parents.items():
+                if parent_id is not None and parent_id not in node_types:
+                    raise InvalidWorkImport(
+                        None, f"node {original(node_id)} references missing parent {original(parent_id)}"
+                    )
+                parent_type = node_types[parent_id] if parent_id is not None else None
+                if not is_valid_parent_child(parent_type, node_types[node_id]):
+                    raise InvalidWorkImport(
+                        None,
+                        f"node {original(node_id)}: a {node_types[node_id]} cannot be "
+                        f"{'a child of a ' + parent_type if parent_type else 'a root node'}",
+                    )
+            lineage = _materialize_ancestors([
+                {"node_id": node_id, "parent_id": parent_id, "position": 0}
+                for node_id, parent_id in parents.items()
+            ])
+            complete = all(ancestors[node_id] == lineage.get(node_id) for node_id in parents)
+            # Nodes went in behind create_work's version 0; move past it so
+            # nothing read mid-restore validates against the finished Work.
+            await self.work_collection.update_one(
+                {"work_id": work_id, "account_id": account_id},
+                {"$inc": {"version": 1}, "$set": {"ancestors_backfilled": complete}},
+            )
+            _invalidate_work(account_id, work_id)
+        except BaseException:
+            # Includes cancellation when the client disconnects mid-upload.
+            try:
+                await self.delete_work(work_id, account_id)
+            except (ConnectionFailure, OperationFailure):
+                logger.error(f"Exception occurred removing partially restored work {work_id}", exc_info=True)
+            raise
+        return {
+            **work, "version": work["version"] + 1,
+            "ancestors_backfilled": complete, "total_nodes": total,
+        }
+
+    async def _insert_restored(self, docs: list[dict], work_id: str) -> None:
+        try:
+            await self.node_collection.insert_many(docs, ordered=False)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred inserting restored nodes into work {work_id}", exc_info=True)
+            raise
+
+    async def delete_works_by_tag(self, account_id: str, tag: str, session=None) -> int:
+        """Delete every Work of account_id carrying tag, and their nodes, with
+        one indexed find and two delete_many calls. Returns works deleted."""
+        logger.debug(f"delete_works_by_tag({account_id}, {tag}) called")
+        try:
+            works = await self.work_collection.find(
+                {"account_id": account_id, "tags": tag}, {"_id": 0, "work_id": 1},
+                session=session,
+            ).to_list(None)
+            if not works:
+                return 0
+            work_ids = [w["work_id"] for w in works]
+            result = await self.work_collection.delete_many(
+                {"account_id": account_id, "work_id": {"$in": work_ids}}, session=session
+            )
+            await self.node_collection.delete_many(
+                {"account_id": account_id, "work_id": {"$in": work_ids}}, session=session
+            )
+            await self.counter_collection.delete_many(
+                {"work_id": {"$in": work_ids}}, session=session
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred deleting {tag} works for account {account_id}", exc_info=True)
+            raise
+        for work_id in work_ids:
+            _invalidate_work(account_id, work_id, session)
+        return result.deleted_count
+
 
 # ================================================================
 #  NodeStorage  (T-06, T-07, T-08)
@@ -602,56 +1328,225 @@ class NodeStorage:
         self.database = self.client.fabulator
         self.node_collection = self.database.get_collection("node_collection")
         self.work_collection = self.database.get_collection("work_collection")
+        self.counter_collection = self.database.get_collection("position_counters")
 
     # ----------------------------------------------------------
     # Core CRUD  (T-06)
     # ----------------------------------------------------------
 
-    async def create_node(self, account_id: str, work_doc: dict, data: dict, session=None) -> dict:
-        """Insert a new node; copies author from Work; auto-assigns position.
+    async def create_node(
+        self, account_id: str, work_doc: dict, data: dict, session=None,
+        parent_doc: dict | None = None,
+    ) -> dict:
+        """Insert a new node; copies author from Work; appends it after its
+        siblings with an atomically allocated position.
+        Materializes ancestors/depth from parent_doc (fetched when not supplied).
         Returns the inserted document."""
         logger.debug(f"create_node({account_id}) called")
         parent_id = data.get("parent_id")
+        lineage = await self._lineage(parent_id, account_id, parent_doc, session=session)
+
+        position = await self._allocate_positions(
+            account_id, data["work_id"], parent_id, session=session
+        )
+
+        doc = _new_node_doc(
+            data, data["work_id"], account_id, work_doc.get("author"),
+            parent_id, position, datetime.now(timezone.utc), lineage,
+        )
+        try:
+            await self.node_collection.insert_one(doc, session=session)
+        except (DuplicateKeyError, ConnectionFailure, OperationFailure):
+            logger.error("Exception occurred inserting node document", exc_info=True)
+            raise
+        await self._touch_work(doc["work_id"], account_id, session=session)
+        return _strip_id(doc)
+
+    async def _touch_work(self, work_id: str, account_id: str, session=None) -> None:
+        """Bump the Work's version after any change to its nodes, then drop its
+        cached skeleton in every worker. Readers validate cached skeletons
+        against this counter; invalidating only once the bump has landed
+        means no reload can cache post-write nodes under the old version."""
+        try:
+            await self.work_collection.update_one(
+                {"work_id": work_id, "account_id": account_id},
+                {"$inc": {"version": 1}},
+                session=session,
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred bumping version of work {work_id}", exc_info=True)
+            raise
+        finally:
+            _invalidate_work(account_id, work_id, session)
 
-        # Position = max(sibling positions) + 1, or 0 if no siblings exist.
+    async def _allocate_positions(
+        self, account_id: str, work_id: str | None, parent_id: str | None,
+        count: int = 1, session=None,
+    ) -> int:
+        """Reserve count consecutive sibling positions at the end of parent_id's
+        children (the Work's roots when None) and return the first.
+
+        Positions come from a per-parent counter document bumped with $inc, so
+        allocation is one atomic round trip and concurrent writers never get
+        the same position. A missing counter is seeded once from the current
+        maximum sibling position (work_id is needed for root counters).
+        """
+        counter_id = _position_counter_id(account_id, work_id, parent_id)
+        counter = await self._bump_position_counter(counter_id, count, session)
+        if counter is None:
+            await self._seed_position_counter(counter_id, account_id, work_id, parent_id, session)
+            counter = await self._bump_position_counter(counter_id, count, session)
+        return counter["next"] - count
+
+    async def _bump_position_counter(self, counter_id: str, count: int, session=None) -> dict | None:
+        try:
+            return await self.counter_collection.find_one_and_update(
+                {"_id": counter_id},
+                {"$inc": {"next": count}},
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred allocating positions from {counter_id}", exc_info=True)
+            raise
+
+    async def _seed_position_counter(
+        self, counter_id: str, account_id: str, work_id: str | None,
+        parent_id: str | None, session=None,
+    ) -> None:
+        """Create the counter at max(sibling position) + 1. $max keeps a seed
+        from ever moving a concurrently created counter backwards."""
         sibling_filter = (
             {"account_id": account_id, "parent_id": parent_id}
             if parent_id
-            else {"account_id": account_id, "work_id": data["work_id"], "parent_id": None}
+            else {"account_id": account_id, "work_id": work_id, "parent_id": None}
         )
         try:
             latest = await self.node_collection.find_one(
-                sibling_filter, sort=[("position", -1)], session=session
+                sibling_filter, {"_id": 0, "position": 1},
+                sort=[("position", -1)], session=session,
             )
+            await self.counter_collection.update_one(
+                {"_id": counter_id},
+                {
+                    "$max": {"next": (latest["position"] + 1) if latest else 0},
+                    "$setOnInsert": {"work_id": work_id},
+                },
+                upsert=True,
+                session=session,
+            )
+        except DuplicateKeyError:
+            # A concurrent writer seeded it first; its seed is just as valid.
+            pass
         except (ConnectionFailure, OperationFailure):
-            logger.error("Exception occurred querying sibling positions", exc_info=True)
+            logger.error(f"Exception occurred seeding position counter {counter_id}", exc_info=True)
             raise
-        position = (latest["position"] + 1) if latest else 0
 
-        now = datetime.now(timezone.utc)
-        doc = {
-            "node_id":     data.get("node_id") or str(uuid.uuid4()),
-            "work_id":     data["work_id"],
-            "account_id":  account_id,
-            "author":      work_doc.get("author"),
-            "node_type":   data["node_type"],
-            "parent_id":   parent_id,
-            "position":    position,
-            "tag":         data["tag"],
-            "description": data.get("description"),
-            "text":        data.get("text"),
-            "previous":    data.get("previous"),
-            "next":        data.get("next"),
-            "tags":        data.get("tags") or [],
-            "created_at":  now,
-            "updated_at":  now,
-        }
+    async def _shift_position_counter(
+        self, account_id: str, work_id: str, parent_id: str | None, session=None
+    ) -> None:
+        """Account for a node inserted mid-sequence (siblings shifted up by
+        one) so later allocations still land after the last sibling."""
         try:
-            await self.node_collection.insert_one(doc, session=session)
-        except (DuplicateKeyError, ConnectionFailure, OperationFailure):
-            logger.error("Exception occurred inserting node document", exc_info=True)
+            await self.counter_collection.update_one(
+                {"_id": _position_counter_id(account_id, work_id, parent_id)},
+                {"$inc": {"next": 1}},
+                session=session,
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error("Exception occurred shifting position counter", exc_info=True)
             raise
-        return _strip_id(doc)
+
+    async def create_nodes_bulk(
+        self, account_id: str, work_doc: dict, items: list[dict], session=None,
+        new_work: bool = False,
+    ) -> tuple[list[dict], dict[str, str]]:
+        """Create a batch (flat and/or nested) of nodes in one Work.
+
+        Existing parents are read with one query and positions under them (and
+        the root) are reserved with one counter allocation per parent; all else
+        (ids, hierarchy, positions, lineage) is planned in memory, then written
+        with insert_many in BULK_BATCH_SIZE chunks. Outside a transaction, if a
+        chunk fails the nodes already inserted are deleted again before raising.
+        new_work=True skips the lookups for a Work created in the same session,
+        which has no nodes or counters yet, so the batch is a single
+        insert_many round trip when it fits in one chunk.
+        Returns (created documents in flattened pre-order batch order,
+        {ref: node_id} for items that carried a ref). Raises InvalidBulkNodes
+        before writing anything if validation fails.
+        """
+        logger.debug(f"create_nodes_bulk({account_id}, {len(items)} items) called")
+        work_id = work_doc["work_id"]
+        flat = _flatten_bulk_items(items)
+        if len(flat) > BULK_MAX_NODES:
+            raise InvalidBulkNodes(None, f"batch exceeds {BULK_MAX_NODES} nodes")
+
+        parent_ids = list({e["parent_id"] for e in flat if e.get("parent_id")})
+        parents: list[dict] = []
+        if parent_ids and not new_work:
+            try:
+                parents = await self.node_collection.find(
+                    {"account_id": account_id, "work_id": work_id, "node_id": {"$in": parent_ids}},
+                    {"_id": 0, "node_id": 1, "node_type": 1, "ancestors": 1},
+                    session=session,
+                ).to_list(None)
+            except (ConnectionFailure, OperationFailure):
+                logger.error(f"Exception occurred loading parents for bulk create in work {work_id}", exc_info=True)
+                raise
+        existing_parents = {p["node_id"]: p for p in parents}
+
+        docs = _plan_bulk_nodes(
+            flat, work_doc, account_id, existing_parents, now=datetime.now(timezone.utc),
+        )
+        if not new_work:
+            # Append after the current children of each existing parent (and
+            # the root): one counter allocation per parent for its whole run.
+            appended: dict[str | None, list[dict]] = {}
+            for doc in docs:
+                if doc["parent_id"] is None or doc["parent_id"] in existing_parents:
+                    appended.setdefault(doc["parent_id"], []).append(doc)
+            for parent_id, group in appended.items():
+                first = await self._allocate_positions(
+                    account_id, work_id, parent_id, count=len(group), session=session
+                )
+                for doc in group:
+                    doc["position"] += first
+        if not docs:
+            return [], {}
+
+        try:
+            for start in range(0, len(docs), BULK_BATCH_SIZE):
+                await self.node_collection.insert_many(
+                    docs[start:start + BULK_BATCH_SIZE], ordered=True, session=session
+                )
+        except (ConnectionFailure, OperationFailure) as e:
+            logger.error(f"Exception occurred bulk inserting nodes into work {work_id}", exc_info=True)
+            if session is None:
+                # Inside a transaction the caller aborts instead.
+                await self._discard_bulk_insert(docs, account_id, work_id)
+            # insert_many reports a duplicate client-supplied node_id as a
+            # BulkWriteError; surface it as the DuplicateKeyError it is.
+            if isinstance(e, BulkWriteError) and any(
+                error.get("code") == 11000 for error in e.details.get("writeErrors", [])
+            ):
+                raise DuplicateKeyError("duplicate node_id in bulk insert", 11000, e.details) from e
+            raise
+        await self._touch_work(work_id, account_id, session=session)
+        refs = {e["ref"]: doc["node_id"] for e, doc in zip(flat, docs) if e.get("ref") is not None}
+        return [_strip_id(doc) for doc in docs], refs
+
+    async def _discard_bulk_insert(self, docs: list[dict], account_id: str, work_id: str) -> None:
+        """Best-effort removal of a partially inserted bulk batch. Matching on
+        created_at spares pre-existing nodes whose node_id collided."""
+        try:
+            await self.node_collection.delete_many({
+                "account_id": account_id,
+                "node_id":    {"$in": [doc["node_id"] for doc in docs]},
+                "created_at": docs[0]["created_at"],
+            })
+            await self._touch_work(work_id, account_id)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred removing partial bulk insert in work {work_id}", exc_info=True)
 
     async def get_node(self, node_id: str, account_id: str) -> dict | None:
         """Return a node document or None if not found / wrong account."""
@@ -667,9 +1562,10 @@ class NodeStorage:
 
     async def list_nodes(
         self, work_id: str, account_id: str, node_type: str | None = None,
-        limit: int = 50, cursor: str | None = None,
+        limit: int = 50, cursor: str | None = None, fields: list[str] | None = None,
     ) -> tuple[list[dict], str | None]:
         """Return nodes for a Work with cursor pagination, optionally filtered by node_type.
+        fields limits each doc to the outline fields plus those named (see _node_projection).
 
         Returns (stripped_docs, next_cursor). next_cursor is None when no more pages.
         """
@@ -686,7 +1582,7 @@ class NodeStorage:
         next_cursor: str | None = None
         try:
             async for doc in self.node_collection.find(
-                query, sort=[("_id", 1)]
+                query, _node_projection(fields), sort=[("_id", 1)]
             ).limit(limit + 1):
                 nodes.append(doc)
         except (ConnectionFailure, OperationFailure):
@@ -700,75 +1596,328 @@ class NodeStorage:
         return nodes, next_cursor
 
     async def update_node(
-        self, node_id: str, account_id: str, updates: dict
+        self, node_id: str, account_id: str, updates: dict,
+        parent_doc: dict | None = None, node_doc: dict | None = None,
     ) -> dict | None:
-        """Apply updates to a node. Auto-assigns end position when parent_id changes.
+        """Apply updates to a node. Auto-assigns end position when parent_id changes
+        and re-materializes ancestors/depth for the node and its whole subtree
+        (parent_doc is the new parent and node_doc the node as already read;
+        each is fetched when not supplied).
         Returns updated document or None if not found."""
         logger.debug(f"update_node({node_id}) called")
         updates["updated_at"] = datetime.now(timezone.utc)
+        update_doc: dict = {"$set": updates}
+        reparenting = "parent_id" in updates
+        lineage: dict | None = None
 
-        if "parent_id" in updates:
+        if reparenting:
             new_parent_id = updates["parent_id"]
-            sibling_filter = (
-                {"account_id": account_id, "parent_id": new_parent_id,
-                 "node_id": {"$ne": node_id}}
-                if new_parent_id
-                else {"account_id": account_id, "parent_id": None,
-                      "node_id": {"$ne": node_id}}
+            # Counters are stamped with the node's Work (root counters are
+            # keyed by it), so take it from the node rather than the parent.
+            if node_doc is None:
+                try:
+                    node_doc = await self.node_collection.find_one(
+                        {"node_id": node_id, "account_id": account_id}, {"_id": 0, "work_id": 1}
+                    )
+                except (ConnectionFailure, OperationFailure):
+                    logger.error(f"Exception occurred fetching work of {node_id} for reparent", exc_info=True)
+                    raise
+                if node_doc is None:
+                    return None
+            updates["position"] = await self._allocate_positions(
+                account_id, node_doc["work_id"], new_parent_id
             )
-            try:
-                latest = await self.node_collection.find_one(
-                    sibling_filter, sort=[("position", -1)]
-                )
-            except (ConnectionFailure, OperationFailure):
-                logger.error("Exception occurred querying sibling positions for reparent", exc_info=True)
-                raise
-            updates["position"] = (latest["position"] + 1) if latest else 0
+            lineage = await self._lineage(new_parent_id, account_id, parent_doc)
+            if lineage is not None:
+                updates.update(lineage)
+            else:
+                update_doc["$unset"] = {"ancestors": "", "depth": ""}
 
         try:
             result = await self.node_collection.find_one_and_update(
                 {"node_id": node_id, "account_id": account_id},
-                {"$set": updates},
+                update_doc,
                 return_document=ReturnDocument.AFTER,
             )
         except (ConnectionFailure, OperationFailure):
             logger.error(f"Exception occurred updating node {node_id}", exc_info=True)
             raise
-        return _strip_id(result) if result else None
+        if result is None:
+            return None
+        if reparenting and result["node_type"] != "scene":
+            await self._relink_descendants(node_id, account_id, lineage)
+        await self._touch_work(result["work_id"], account_id)
+        return _strip_id(result)
+
+    async def _lineage(
+        self, parent_id: str | None, account_id: str,
+        parent_doc: dict | None = None, session=None,
+    ) -> dict | None:
+        """Return the materialized {ancestors, depth} for a child of parent_id,
+        or None when the parent has none. Fetches the parent only if not supplied."""
+        if parent_id is not None and parent_doc is None:
+            try:
+                parent_doc = await self.node_collection.find_one(
+                    {"node_id": parent_id, "account_id": account_id},
+                    {"_id": 0, "node_id": 1, "ancestors": 1},
+                    session=session,
+                )
+            except (ConnectionFailure, OperationFailure):
+                logger.error(f"Exception occurred fetching lineage of {parent_id}", exc_info=True)
+                raise
+            if parent_doc is None:
+                return None
+        return _child_lineage(parent_doc)
+
+    async def _relink_descendants(
+        self, node_id: str, account_id: str, lineage: dict | None
+    ) -> None:
+        """Rewrite the ancestors prefix of every descendant of a reparented node.
+
+        lineage is the node's new {ancestors, depth}; None strips the fields from
+        the subtree instead, since its new ancestry is not materialized.
+        """
+        if lineage is None:
+            update: dict | list = {"$unset": {"ancestors": "", "depth": ""}}
+        else:
+            update = [
+                {"$set": {"ancestors": {"$concatArrays": [
+                    {"$literal": lineage["ancestors"]},
+                    {"$slice": [
+                        "$ancestors",
+                        {"$indexOfArray": ["$ancestors", node_id]},
+                        {"$size": "$ancestors"},
+                    ]},
+                ]}}},
+                {"$set": {"depth": {"$size": "$ancestors"}}},
+            ]
+        try:
+            await self.node_collection.update_many(
+                {"account_id": account_id, "ancestors": node_id}, update
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred relinking descendants of {node_id}", exc_info=True)
+            raise
 
     async def delete_node_cascade(
         self, node_id: str, account_id: str
     ) -> tuple[bool, int]:
-        """Delete a node and all its descendants via BFS.
-        Returns (found, descendants_deleted). Descendants count excludes the node itself."""
+        """Delete a node and all its descendants.
+        Returns (found, descendants_deleted). Descendants count excludes the node itself.
+
+        The subtree's ids are collected by _get_subtree, then deleted
+        deepest-first in batches of BULK_BATCH_SIZE so no single delete ships an
+        unbounded $in list, and a failure part-way never orphans surviving nodes.
+        Position counters of the deleted nodes go with each batch.
+        """
         logger.debug(f"delete_node_cascade({node_id}) called")
-        node = await self.get_node(node_id, account_id)
-        if node is None:
+        root, descendants = await self._get_subtree(
+            node_id, account_id, fields=["node_id", "work_id"]
+        )
+        if root is None:
             return False, 0
 
-        # BFS to collect all descendant IDs (node_id is the frontier seed).
-        all_ids = [node_id]
-        frontier = [node_id]
-        while frontier:
-            try:
-                children = await self.node_collection.find(
-                    {"account_id": account_id, "parent_id": {"$in": frontier}},
-                    {"node_id": 1},
-                ).to_list(None)
-            except (ConnectionFailure, OperationFailure):
-                logger.error("Exception occurred collecting descendants for deletion", exc_info=True)
-                raise
-            frontier = [c["node_id"] for c in children]
-            all_ids.extend(frontier)
+        descendants.sort(key=lambda doc: doc["_depth"], reverse=True)
+        all_ids = [doc["node_id"] for doc in descendants] + [node_id]
 
+        deleted = 0
+        try:
+            for start in range(0, len(all_ids), BULK_BATCH_SIZE):
+                batch = all_ids[start:start + BULK_BATCH_SIZE]
+                try:
+                    result = await self.node_collection.delete_many(
+                        {"account_id": account_id, "node_id": {"$in": batch}}
+                    )
+                    deleted += result.deleted_count
+                    await self.counter_collection.delete_many({"_id": {"$in": [
+                        _position_counter_id(account_id, root["work_id"], parent_id)
+                        for parent_id in batch
+                    ]}})
+                except (ConnectionFailure, OperationFailure):
+                    logger.error(f"Exception occurred in cascade delete for {node_id}", exc_info=True)
+                    raise
+        finally:
+            # Bump even after a partial delete: some nodes may already be gone.
+            if deleted:
+                await self._touch_work(root["work_id"], account_id)
+        # The node itself may already have been deleted concurrently.
+        return True, max(deleted - 1, 0)
+
+    async def _get_subtree(
+        self, node_id: str, account_id: str,
+        fields: list[str] | None = None, max_depth: int | None = None,
+    ) -> tuple[dict | None, list[dict]]:
+        """Return (root, descendants) collected level by level.
+
+        Descendants are unordered; each carries a `_depth` key (0 = direct child)
+        and is restricted to the root's account and work. When fields is given,
+        root and descendants are projected to those fields plus node_id and
+        parent_id. max_depth defaults to MAX_TREE_DEPTH.
+
+        Each level is one indexed find on parent_id (in BULK_BATCH_SIZE chunks)
+        projected to structural fields, so no stage ever holds the subtree's
+        full documents (a $graphLookup would, under its 100 MB limit). Full
+        documents (fields=None) and `text` are read afterwards with
+        get_nodes_by_ids in BULK_BATCH_SIZE chunks.
+        Returns (None, []) when the root is not found / wrong account.
+        """
+        logger.debug(f"_get_subtree({node_id}) called")
+        if MATERIALIZED_ANCESTORS:
+            subtree = await self._get_subtree_materialized(node_id, account_id, fields, max_depth)
+            if subtree is not None:
+                return subtree
+        hydrate = fields is None or "text" in fields
+        keep = list(dict.fromkeys(["node_id", "parent_id", *(fields or [])]))
+        carried = ["node_id", "parent_id", "position"] if hydrate else keep
         try:
-            result = await self.node_collection.delete_many(
-                {"account_id": account_id, "node_id": {"$in": all_ids}}
+            root = await self.node_collection.find_one(
+                {"node_id": node_id, "account_id": account_id},
+                None if fields is None else {"_id": 0, "work_id": 1, **{f: 1 for f in keep}},
             )
         except (ConnectionFailure, OperationFailure):
-            logger.error(f"Exception occurred in cascade delete for {node_id}", exc_info=True)
+            logger.error(f"Exception occurred collecting subtree of {node_id}", exc_info=True)
             raise
-        return True, result.deleted_count - 1
+        if root is None:
+            return None, []
+        work_id = root["work_id"]
+        if fields is not None and "work_id" not in keep:
+            del root["work_id"]
+
+        limit = MAX_TREE_DEPTH if max_depth is None else max_depth
+        projection = {"_id": 0, **{f: 1 for f in carried}}
+        descendants: list[dict] = []
+        # Visited ids guard against a corrupt parent_id cycle.
+        seen = {node_id}
+        frontier = [node_id]
+        depth = 0
+        while frontier and depth <= limit:
+            level: list[dict] = []
+            for start in range(0, len(frontier), BULK_BATCH_SIZE):
+                try:
+                    docs = await self.node_collection.find(
+                        {"account_id": account_id, "work_id": work_id,
+                         "parent_id": {"$in": frontier[start:start + BULK_BATCH_SIZE]}},
+                        projection,
+                    ).to_list(None)
+                except (ConnectionFailure, OperationFailure):
+                    logger.error(f"Exception occurred collecting subtree of {node_id}", exc_info=True)
+                    raise
+                for doc in docs:
+                    if doc["node_id"] not in seen:
+                        seen.add(doc["node_id"])
+                        doc["_depth"] = depth
+                        level.append(doc)
+            descendants.extend(level)
+            frontier = [doc["node_id"] for doc in level]
+            depth += 1
+        if hydrate:
+            depths = {doc["node_id"]: doc["_depth"] for doc in descendants}
+            ids = list(depths)
+            descendants = []
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                batch = await self.get_nodes_by_ids(
+                    ids[start:start + BULK_BATCH_SIZE], account_id, fields=fields
+                )
+                for doc in batch:
+                    doc["_depth"] = depths[doc["node_id"]]
+                    descendants.append(doc)
+        return _strip_id(root), descendants
+
+    async def get_nested_subtree(
+        self, node_id: str, account_id: str,
+        depth: int | None = None, fields: list[str] | None = None,
+    ) -> tuple[dict | None, list[dict]]:
+        """Return (tree, nodes): node_id with its descendants nested under
+        position-ordered `children` lists, plus the same docs flat.
+
+        depth limits the levels below the node (0 = the node alone); None means
+        the whole subtree, raising TreeDepthLimitExceeded when it is deeper than
+        MAX_TREE_DEPTH. Descendants come from _get_subtree (structure one
+        level per round trip, full documents in batches) and fields projects them as in
+        list_nodes. Returns (None, []) when the node
+        is not found / wrong account."""
+        logger.debug(f"get_nested_subtree({node_id}, depth={depth}) called")
+        projection = list(dict.fromkeys([*NODE_OUTLINE_FIELDS, *fields])) if fields is not None else None
+        if depth == 0:
+            root = await self.get_node(node_id, account_id)
+            if root is not None and projection is not None:
+                root = {f: root[f] for f in projection if f in root}
+            descendants: list[dict] = []
+        else:
+            # One level beyond MAX_TREE_DEPTH is fetched to detect overflow.
+            max_depth = MAX_TREE_DEPTH if depth is None else depth - 1
+            root, descendants = await self._get_subtree(
+                node_id, account_id, fields=projection, max_depth=max_depth
+            )
+        if root is None:
+            return None, []
+        if depth is None and any(d["_depth"] >= MAX_TREE_DEPTH for d in descendants):
+            raise TreeDepthLimitExceeded(MAX_TREE_DEPTH + 1, MAX_TREE_DEPTH)
+        return _nest_subtree(root, descendants), [root, *descendants]
+
+    async def _get_subtree_materialized(
+        self, node_id: str, account_id: str,
+        fields: list[str] | None, max_depth: int | None,
+    ) -> tuple[dict | None, list[dict]] | None:
+        """_get_subtree served by one indexed find on the `ancestors` array.
+
+        Returns None (caller falls back to the level walk) unless the root's Work
+        is flagged ancestors_backfilled: in an unflagged Work a node can carry
+        ancestors while its descendants do not, and they would be missed.
+        """
+        limit = MAX_TREE_DEPTH if max_depth is None else max_depth
+        projection = {"_id": 0}
+        if fields is not None:
+            keep = ["node_id", "parent_id", "work_id", "ancestors", *fields]
+            projection.update({f: 1 for f in keep})
+        try:
+            docs = await self.node_collection.find(
+                {"account_id": account_id,
+                 "$or": [{"node_id": node_id}, {"ancestors": node_id}]},
+                projection,
+            ).to_list(None)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred collecting subtree of {node_id}", exc_info=True)
+            raise
+        root = next((d for d in docs if d["node_id"] == node_id), None)
+        if root is None:
+            return None, []
+        if "ancestors" not in root or not await self._ancestors_complete(
+            root.get("work_id"), account_id
+        ):
+            return None
+        base = len(root["ancestors"])
+        descendants: list[dict] = []
+        for doc in docs:
+            if doc is root or doc.get("work_id") != root.get("work_id"):
+                continue
+            depth = len(doc["ancestors"]) - base - 1
+            if depth > limit:
+                continue
+            if fields is not None:
+                doc = {f: doc[f] for f in ["node_id", "parent_id", *fields] if f in doc}
+            doc["_depth"] = depth
+            descendants.append(doc)
+        if fields is not None:
+            root = {f: root[f] for f in ["node_id", "parent_id", *fields] if f in root}
+        return root, descendants
+
+    async def _ancestors_complete(self, work_id: str | None, account_id: str) -> bool:
+        """True when the Work is flagged ancestors_backfilled."""
+        if _backfilled_works.get(work_id):
+            return True
+        try:
+            work = await self.work_collection.find_one(
+                {"work_id": work_id, "account_id": account_id},
+                {"_id": 0, "ancestors_backfilled": 1},
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred checking ancestors of work {work_id}", exc_info=True)
+            raise
+        if not (work and work.get("ancestors_backfilled")):
+            return False
+        _backfilled_works.set(work_id, True)
+        return True
 
     # ----------------------------------------------------------
     # Navigation  (T-07)
@@ -792,48 +1941,57 @@ class NodeStorage:
     async def get_parent(self, node_id: str, account_id: str) -> dict | None:
         """Return the parent node, or None for Part (root) nodes."""
         logger.debug(f"get_parent({node_id}) called")
-        node = await self.get_node(node_id, account_id)
-        if node is None or node.get("parent_id") is None:
-            return None
-        try:
-            doc = await self.node_collection.find_one(
-                {"node_id": node["parent_id"], "account_id": account_id}
-            )
-        except (ConnectionFailure, OperationFailure):
-            logger.error(f"Exception occurred getting parent of {node_id}", exc_info=True)
-            raise
-        return _strip_id(doc) if doc else None
+        _, ancestors = await self.get_node_with_ancestors(node_id, account_id, max_depth=0)
+        return ancestors[-1] if ancestors else None
 
     async def get_ancestors(self, node_id: str, account_id: str) -> list[dict]:
         """Return ancestors ordered from root to immediate parent (inclusive).
         Returns empty list for Part (root) nodes."""
         logger.debug(f"get_ancestors({node_id}) called")
-        node = await self.get_node(node_id, account_id)
-        if node is None or node.get("parent_id") is None:
-            return []
-        ancestors: list[dict] = []
-        current_id: str | None = node["parent_id"]
-        visited: set[str] = set()
-        while current_id is not None:
-            if current_id in visited:
-                break
-            visited.add(current_id)
-            try:
-                doc = await self.node_collection.find_one(
-                    {"node_id": current_id, "account_id": account_id}
-                )
-            except (ConnectionFailure, OperationFailure):
-                logger.error(
-                    f"Exception occurred traversing ancestors of {node_id}", exc_info=True
-                )
-                raise
-            if doc is None:
-                break
-            ancestors.append(_strip_id(doc))
-            current_id = doc.get("parent_id")
-        ancestors.reverse()
+        _, ancestors = await self.get_node_with_ancestors(node_id, account_id)
         return ancestors
 
+    async def get_node_with_ancestors(
+        self, node_id: str, account_id: str, max_depth: int | None = None
+    ) -> tuple[dict | None, list[dict]]:
+        """Return (node, ancestors) resolved server-side in a single $graphLookup.
+
+        Ancestors are ordered root-first, ending with the immediate parent.
+        max_depth bounds the number of levels walked above the parent
+        (0 = parent only); defaults to MAX_TREE_DEPTH. $graphLookup tracks
+        visited documents, so a corrupt parent_id cycle cannot loop.
+        Returns (None, []) when the node is not found / wrong account.
+        """
+        logger.debug(f"get_node_with_ancestors({node_id}) called")
+        pipeline = [
+            {"$match": {"node_id": node_id, "account_id": account_id}},
+            {"$graphLookup": {
+                "from":                    "node_collection",
+                "startWith":               "$parent_id",
+                "connectFromField":        "parent_id",
+                "connectToField":          "node_id",
+                "as":                      "_ancestors",
+                "maxDepth":                MAX_TREE_DEPTH if max_depth is None else max_depth,
+                "depthField":              "_depth",
+                "restrictSearchWithMatch": {"account_id": account_id},
+            }},
+        ]
+        try:
+            docs = await self.node_collection.aggregate(pipeline).to_list(None)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred resolving ancestors of {node_id}", exc_info=True)
+            raise
+        if not docs:
+            return None, []
+        node = docs[0]
+        ancestors: list[dict] = node.pop("_ancestors", [])
+        # _depth counts upward from the parent (0), so root-first is descending.
+        ancestors.sort(key=lambda doc: doc["_depth"], reverse=True)
+        for doc in ancestors:
+            doc.pop("_depth", None)
+            _strip_id(doc)
+        return _strip_id(node), ancestors
+
     async def get_siblings(self, node_id: str, account_id: str) -> list[dict]:
         """Return sibling nodes (same parent_id), excluding self, ordered by position."""
         logger.debug(f"get_siblings({node_id}) called")
@@ -858,9 +2016,10 @@ class NodeStorage:
 
     async def get_roots(
         self, work_id: str, account_id: str,
-        limit: int = 50, cursor: str | None = None,
+        limit: int = 50, cursor: str | None = None, fields: list[str] | None = None,
     ) -> tuple[list[dict], str | None]:
         """Return Part (root) nodes for a Work with cursor pagination, ordered by position.
+        fields projects each doc as in list_nodes.
 
         Returns (stripped_docs, next_cursor). next_cursor is None when no more pages.
         """
@@ -875,7 +2034,7 @@ class NodeStorage:
         next_cursor: str | None = None
         try:
             async for doc in self.node_collection.find(
-                query, sort=[("position", 1), ("_id", 1)]
+                query, _node_projection(fields), sort=[("position", 1), ("_id", 1)]
             ).limit(limit + 1):
                 roots.append(doc)
         except (ConnectionFailure, OperationFailure):
@@ -890,9 +2049,10 @@ class NodeStorage:
 
     async def get_leaves(
         self, work_id: str, account_id: str,
-        limit: int = 50, cursor: str | None = None,
+        limit: int = 50, cursor: str | None = None, fields: list[str] | None = None,
     ) -> tuple[list[dict], str | None]:
         """Return Scene (leaf) nodes for a Work with cursor pagination, ordered by position.
+        fields projects each doc as in list_nodes.
 
         Returns (stripped_docs, next_cursor). next_cursor is None when no more pages.
         """
@@ -907,7 +2067,7 @@ class NodeStorage:
         next_cursor: str | None = None
         try:
             async for doc in self.node_collection.find(
-                query, sort=[("position", 1), ("_id", 1)]
+                query, _node_projection(fields), sort=[("position", 1), ("_id", 1)]
             ).limit(limit + 1):
                 leaves.append(doc)
         except (ConnectionFailure, OperationFailure):
@@ -920,6 +2080,184 @@ class NodeStorage:
             doc.pop("_id", None)
         return leaves, next_cursor
 
+    # ----------------------------------------------------------
+    # Cached structure  (WorkTreeCache)
+    # ----------------------------------------------------------
+
+    async def _load_skeleton(
+        self, work_id: str, account_id: str, version: int | None = None
+    ) -> WorkSkeleton:
+        """Return the Work's structural skeleton, from cache when its version
+        matches. version=None reads the current version first. An unknown Work
+        yields an empty (uncached) skeleton. A write invalidating the Work
+        while this reads keeps the result out of the cache."""
+        skeleton = _work_tree_cache.get(account_id, work_id, version)
+        if skeleton is not None:
+            return skeleton
+        load = _work_tree_cache.begin_load(account_id, work_id)
+        try:
+            if version is None:
+                try:
+                    work = await self.work_collection.find_one(
+                        {"work_id": work_id, "account_id": account_id},
+                        {"_id": 0, "version": 1},
+                    )
+                except (ConnectionFailure, OperationFailure):
+                    logger.error(f"Exception occurred reading version of work {work_id}", exc_info=True)
+                    raise
+                if work is None:
+                    return WorkSkeleton(work_id, 0, [])
+                version = work.get("version", 0)
+            try:
+                docs = await self.node_collection.find(
+                    {"account_id": account_id, "work_id": work_id},
+                    {"_id": 0, "node_id": 1, "parent_id": 1, "position": 1, "node_type": 1},
+                ).to_list(None)
+            except (ConnectionFailure, OperationFailure):
+                logger.error(f"Exception occurred loading skeleton of work {work_id}", exc_info=True)
+                raise
+            return _work_tree_cache.put(account_id, work_id, version, docs, load)
+        finally:
+            _work_tree_cache.end_load(load)
+
+    async def _skeleton_for_node(
+        self, node_id: str, account_id: str
+    ) -> WorkSkeleton | None:
+        """Return the cached skeleton containing node_id, loading its Work on a
+        miss. Works too large to cache get an uncached partial skeleton (see
+        _partial_skeleton). None when the node does not exist / wrong account."""
+        skeleton = _work_tree_cache.find_by_node(account_id, node_id)
+        if skeleton is not None:
+            return skeleton
+        try:
+            doc = await self.node_collection.find_one(
+                {"node_id": node_id, "account_id": account_id}, {"_id": 0, "work_id": 1}
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred locating work of node {node_id}", exc_info=True)
+            raise
+        if doc is None:
+            return None
+        work_id = doc["work_id"]
+        if _work_tree_cache.oversized(account_id, work_id):
+            return await self._partial_skeleton(node_id, account_id, work_id)
+        skeleton = await self._load_skeleton(work_id, account_id)
+        if node_id not in skeleton.nodes:
+            # Cached before another worker created the node, and its
+            # invalidation has not arrived (or Redis is down): reload at the
+            # version now in MongoDB.
+            _work_tree_cache.invalidate(account_id, work_id)
+            skeleton = await self._load_skeleton(work_id, account_id)
+        return skeleton if node_id in skeleton.nodes else None
+
+    async def _partial_skeleton(
+        self, node_id: str, account_id: str, work_id: str
+    ) -> WorkSkeleton | None:
+        """Uncached skeleton of node_id's ancestors, siblings and children, read
+        with one $graphLookup and one indexed find. Used for Works too large for
+        the tree cache, which would otherwise be reloaded whole on every read."""
+        node, ancestors = await self.get_node_with_ancestors(node_id, account_id)
+        if node is None:
+            return None
+        parent_id = node.get("parent_id")
+        siblings = (
+            {"parent_id": parent_id} if parent_id is not None
+            else {"parent_id": None, "work_id": work_id}
+        )
+        try:
+            docs = await self.node_collection.find(
+                {"account_id": account_id, "$or": [{"parent_id": node_id}, siblings]},
+                {"_id": 0, "node_id": 1, "parent_id": 1, "position": 1, "node_type": 1},
+            ).to_list(None)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred reading neighbours of {node_id}", exc_info=True)
+            raise
+        keep = ("node_id", "parent_id", "position", "node_type")
+        docs += [{f: doc.get(f) for f in keep} for doc in [node, *ancestors]]
+        unique = list({doc["node_id"]: doc for doc in docs}.values())
+        # Never cached, so the version is never compared.
+        return WorkSkeleton(work_id, -1, unique)
+
+    async def _with_node(
+        self, node_id: str, account_id: str, ids: list[str], fields: list[str] | None = None
+    ) -> tuple[dict | None, list[dict]]:
+        """Hydrate node_id and ids with one $in query; returns (node, docs for ids)."""
+        docs = await self.get_nodes_by_ids([node_id, *ids], account_id, fields=fields)
+        if not docs or docs[0]["node_id"] != node_id:
+            return None, []
+        return docs[0], docs[1:]
+
+    async def get_node_with_children(
+        self, node_id: str, account_id: str, fields: list[str] | None = None
+    ) -> tuple[dict | None, list[dict]]:
+        """Return (node, children ordered by position) via the tree cache.
+        Returns (None, []) when the node is not found / wrong account."""
+        logger.debug(f"get_node_with_children({node_id}) called")
+        skeleton = await self._skeleton_for_node(node_id, account_id)
+        if skeleton is None:
+            return None, []
+        return await self._with_node(node_id, account_id, skeleton.children_of(node_id), fields)
+
+    async def get_node_with_siblings(
+        self, node_id: str, account_id: str, fields: list[str] | None = None
+    ) -> tuple[dict | None, list[dict]]:
+        """Return (node, siblings excluding self ordered by position) via the tree cache.
+        Returns (None, []) when the node is not found / wrong account."""
+        logger.debug(f"get_node_with_siblings({node_id}) called")
+        skeleton = await self._skeleton_for_node(node_id, account_id)
+        if skeleton is None:
+            return None, []
+        return await self._with_node(node_id, account_id, skeleton.siblings_of(node_id), fields)
+
+    async def get_node_lineage(
+        self, node_id: str, account_id: str, max_depth: int | None = None
+    ) -> tuple[dict | None, list[dict]]:
+        """Cached counterpart of get_node_with_ancestors for read endpoints:
+        (node, ancestors root-first). max_depth=0 returns the parent only.
+        Writes that must see the latest data use get_node_with_ancestors."""
+        logger.debug(f"get_node_lineage({node_id}) called")
+        skeleton = await self._skeleton_for_node(node_id, account_id)
+        if skeleton is None:
+            return None, []
+        ancestor_ids = skeleton.ancestors_of(node_id)
+        if max_depth is not None:
+            ancestor_ids = ancestor_ids[-(max_depth + 1):]
+        return await self._with_node(node_id, account_id, ancestor_ids)
+
+    async def get_node_neighbourhood(
+        self, node_id: str, account_id: str,
+        include: tuple[str, ...] = NODE_NEIGHBOURS, fields: list[str] | None = None,
+    ) -> dict | None:
+        """Return {"node": node} plus one entry per name in include (a subset of
+        NODE_NEIGHBOURS): "parent" (None for a root), and "children",
+        "siblings" and "ancestors" (root-first) as lists. Structure comes from
+        the tree cache and every document from a single $in hydration, so a
+        warm call is one round trip. Returns None when the node is not found."""
+        logger.debug(f"get_node_neighbourhood({node_id}, {include}) called")
+        skeleton = await self._skeleton_for_node(node_id, account_id)
+        if skeleton is None:
+            return None
+        wanted: dict[str, list[str]] = {}
+        if "parent" in include:
+            parent_id = skeleton.parent_of(node_id)
+            wanted["parent"] = [parent_id] if parent_id is not None else []
+        if "children" in include:
+            wanted["children"] = skeleton.children_of(node_id)
+        if "siblings" in include:
+            wanted["siblings"] = skeleton.siblings_of(node_id)
+        if "ancestors" in include:
+            wanted["ancestors"] = skeleton.ancestors_of(node_id)
+        ids = list(dict.fromkeys(i for group in wanted.values() for i in group))
+        node, docs = await self._with_node(node_id, account_id, ids, fields)
+        if node is None:
+            return None
+        by_id = {doc["node_id"]: doc for doc in docs}
+        result: dict = {"node": node}
+        for name, group in wanted.items():
+            found = [by_id[i] for i in group if i in by_id]
+            result[name] = (found[0] if found else None) if name == "parent" else found
+        return result
+
     # ----------------------------------------------------------
     # Reading order  (E-89)
     # ----------------------------------------------------------
@@ -942,121 +2280,116 @@ class NodeStorage:
             logger.error(f"Exception in get_reading_order({work_id})", exc_info=True)
             raise
 
-        if not all_nodes:
-            return []
-
-        node_map: dict[str, dict] = {}
-        parent_to_children: dict[str | None, list[str]] = {}
-        for doc in all_nodes:
-            nid = doc["node_id"]
-            node_map[nid] = doc
-            pid: str | None = doc.get("parent_id")
-            parent_to_children.setdefault(pid, []).append(nid)
-
-        for pid in parent_to_children:
-            parent_to_children[pid].sort(key=lambda nid: node_map[nid]["position"])
-
-        ordered: list[dict] = []
-        visited: set[str] = set()
-        stack: list[str] = list(parent_to_children.get(None, []))
-
-        while stack:
-            node_id = stack.pop()
-            if node_id in visited:
-                logger.error(f"Cycle detected: node {node_id} already visited")
-                continue
-            visited.add(node_id)
-            ordered.append(node_map[node_id])
-            children = parent_to_children.get(node_id, [])
-            for child in reversed(children):
-                stack.append(child)
-
+        ordered = _preorder(all_nodes)
         for doc in ordered:
             doc.pop("_id", None)
-
         return ordered
 
-    # ----------------------------------------------------------
-    # Stats and operation helpers  (T-08)
-    # ----------------------------------------------------------
+    async def get_reading_order_ids(
+        self, work_id: str, account_id: str, version: int
+    ) -> tuple[list[str], dict[str, int]]:
+        """Return (node_ids in reading order, node_id → index) for a Work.
 
-    async def get_stats(self, work_id: str, account_id: str) -> dict:
-        """Return WorkStatsResponse-shaped dict with node counts by type and max depth."""
-        logger.debug(f"get_stats({work_id}) called")
-        by_type: dict[str, int] = {"part": 0, "chapter": 0, "scene": 0}
-        pipeline = [
-            {"$match": {"work_id": work_id, "account_id": account_id}},
-            {"$group": {"_id": "$node_type", "count": {"$sum": 1}}},
-        ]
+        Computed from the Work's cached skeleton (see _load_skeleton) and
+        memoized on it, so repeat page requests on an unchanged Work cost no
+        node reads at all.
+        """
+        logger.debug(f"get_reading_order_ids({work_id}, v{version}) called")
+        skeleton = await self._load_skeleton(work_id, account_id, version)
+
+        def compute() -> tuple[list[str], dict[str, int]]:
+            order = [doc["node_id"] for doc in _preorder(skeleton.docs())]
+            return order, {node_id: i for i, node_id in enumerate(order)}
+
+        return skeleton.memo("reading_order", compute)
+
+    async def get_nodes_by_ids(
+        self, node_ids: list[str], account_id: str, fields: list[str] | None = None
+    ) -> list[dict]:
+        """Return the nodes for node_ids in the given order with one $in query,
+        projected as in list_nodes. Ids that no longer exist are skipped."""
+        logger.debug(f"get_nodes_by_ids({len(node_ids)} ids) called")
+        if not node_ids:
+            return []
         try:
-            async for doc in self.node_collection.aggregate(pipeline):
-                if doc["_id"] in by_type:
-                    by_type[doc["_id"]] = doc["count"]
+            docs = await self.node_collection.find(
+                {"account_id": account_id, "node_id": {"$in": node_ids}},
+                {**(_node_projection(fields) or {}), "_id": 0},
+            ).to_list(None)
         except (ConnectionFailure, OperationFailure):
-            logger.error(f"Exception occurred aggregating stats for work {work_id}", exc_info=True)
+            logger.error("Exception occurred hydrating nodes by id", exc_info=True)
             raise
-        max_depth = await self._calculate_max_depth(work_id, account_id)
-        return {
-            "work_id":     work_id,
-            "total_nodes": sum(by_type.values()),
-            "by_type":     by_type,
-            "max_depth":   max_depth,
-        }
+        by_id = {doc["node_id"]: doc for doc in docs}
+        return [by_id[node_id] for node_id in node_ids if node_id in by_id]
 
-    async def _calculate_max_depth(self, work_id: str, account_id: str) -> int:
-        """BFS from all root nodes to compute maximum depth (0-indexed at roots)."""
-        roots, _ = await self.get_roots(work_id, account_id)
-        if not roots:
-            return 0
-        max_depth = 0
-        queue: list[tuple[str, int]] = [(r["node_id"], 0) for r in roots]
-        while queue:
-            current_id, depth = queue.pop(0)
-            max_depth = max(max_depth, depth)
-            try:
-                children = await self.node_collection.find(
-                    {"account_id": account_id, "parent_id": current_id},
-                    {"node_id": 1},
-                ).to_list(None)
-            except (ConnectionFailure, OperationFailure):
-                logger.error("Exception occurred during max-depth BFS traversal", exc_info=True)
-                raise
-            for child in children:
-                queue.append((child["node_id"], depth + 1))
-        return max_depth
+    # ----------------------------------------------------------
+    # Stats and operation helpers  (T-08)
+    # ----------------------------------------------------------
+
+    async def get_stats(
+        self, work_id: str, account_id: str, version: int | None = None
+    ) -> dict:
+        """Return WorkStatsResponse-shaped dict with node counts by type and max depth.
+
+        Computed in O(n) from the Work's cached skeleton and memoized on it.
+        Pass the Work's version when already known to save a lookup.
+        """
+        logger.debug(f"get_stats({work_id}) called")
+        skeleton = await self._load_skeleton(work_id, account_id, version)
+        return dict(skeleton.memo(
+            "stats", lambda: _summarise_structure(work_id, skeleton.docs())
+        ))
 
     async def would_create_cycle(
-        self, node_id: str, new_parent_id: str, account_id: str
+        self, node_id: str, new_parent_id: str, account_id: str,
+        parent_doc: dict | None = None,
     ) -> bool:
-        """Return True if setting new_parent_id as the parent of node_id would create a cycle.
-        Walks up the tree from new_parent_id; True if node_id is encountered."""
-        current_id: str | None = new_parent_id
-        visited: set[str] = set()
-        while current_id is not None:
-            if current_id == node_id:
-                return True
-            if current_id in visited:
+        """Return True if setting new_parent_id as the parent of node_id would create a cycle,
+        i.e. if new_parent_id is node_id or one of its descendants.
+
+        Answered from parent_doc's materialized ancestors with no query when
+        available, otherwise with a single $graphLookup up from the parent's
+        parent (from new_parent_id itself when parent_doc is not supplied).
+        A pre-existing cycle above new_parent_id is also reported as True.
+        """
+        if new_parent_id == node_id:
+            return True
+        chain = {new_parent_id}
+        start_id = new_parent_id
+        if parent_doc is not None:
+            if "ancestors" in parent_doc:
+                return node_id in parent_doc["ancestors"]
+            # The parent is already read; walk up from its parent instead.
+            start_id = parent_doc.get("parent_id")
+            if start_id is None:
+                return False
+            if start_id in chain or start_id == node_id:
                 return True
-            visited.add(current_id)
-            try:
-                doc = await self.node_collection.find_one(
-                    {"node_id": current_id, "account_id": account_id},
-                    {"parent_id": 1},
-                )
-            except (ConnectionFailure, OperationFailure):
-                logger.error("Exception occurred during cycle detection", exc_info=True)
-                raise
-            if doc is None:
-                break
-            current_id = doc.get("parent_id")
-        return False
+            chain.add(start_id)
+        try:
+            start, ancestors = await self.get_node_with_ancestors(start_id, account_id)
+        except (ConnectionFailure, OperationFailure):
+            logger.error("Exception occurred during cycle detection", exc_info=True)
+            raise
+        if start is None:
+            return False
+        chain.update(a["node_id"] for a in ancestors)
+        if node_id in chain:
+            return True
+        # The topmost ancestor should be a root; pointing back into the chain
+        # means the existing data already loops.
+        top = ancestors[0] if ancestors else start
+        return top.get("parent_id") in chain
 
     async def reorder_siblings(
-        self, node_id: str, account_id: str, new_position: int
+        self, node_id: str, account_id: str, new_position: int, session=None
     ) -> dict | None:
         """Move node to new_position among its siblings (clamped to valid range).
-        Renumbers all siblings to maintain a contiguous zero-based sequence.
-        Returns the updated node or None if not found."""
+        Renumbers siblings to maintain a contiguous zero-based sequence with a
+        single ordered bulk_write that only touches siblings whose position
+        actually changes. With ORDER_KEYS only the moved node is written, with
+        a key between its new neighbours. Returns the updated node (position
+        is the new zero-based rank) or None if not found."""
         logger.debug(f"reorder_siblings({node_id}, {new_position}) called")
         node = await self.get_node(node_id, account_id)
         if node is None:
@@ -1068,7 +2401,9 @@ class NodeStorage:
                     "parent_id":  node["parent_id"],
                     "work_id":    node["work_id"],
                 },
+                {"node_id": 1, "position": 1},
                 sort=[("position", 1)],
+                session=session,
             ).to_list(None)
         except (ConnectionFailure, OperationFailure):
             logger.error(f"Exception occurred fetching siblings for reorder of {node_id}", exc_info=True)
@@ -1078,151 +2413,379 @@ class NodeStorage:
         ordered = [s for s in siblings if s["node_id"] != node_id]
         ordered.insert(clamped, node)
 
-        for i, sibling in enumerate(ordered):
+        if ORDER_KEYS:
+            current = next((i for i, s in enumerate(siblings) if s["node_id"] == node_id), None)
+            if current != clamped:
+                before = ordered[clamped - 1] if clamped > 0 else None
+                after = ordered[clamped + 1] if clamped + 1 < len(ordered) else None
+                key = await self._order_key_between(node, before, after, account_id, session=session)
+                try:
+                    await self.node_collection.update_one(
+                        {"node_id": node_id, "account_id": account_id},
+                        {"$set": {"position": key}},
+                        session=session,
+                    )
+                except (ConnectionFailure, OperationFailure):
+                    logger.error(f"Exception occurred moving {node_id}", exc_info=True)
+                    raise
+                await self._touch_work(node["work_id"], account_id, session=session)
+            node["position"] = clamped
+            return node
+
+        requests = [
+            UpdateOne({"node_id": sibling["node_id"]}, {"$set": {"position": i}})
+            for i, sibling in enumerate(ordered)
+            if sibling["position"] != i
+        ]
+        if requests:
             try:
-                await self.node_collection.update_one(
-                    {"node_id": sibling["node_id"]},
-                    {"$set": {"position": i}},
+                await self.node_collection.bulk_write(
+                    requests, ordered=True, session=session
                 )
             except (ConnectionFailure, OperationFailure):
-                logger.error(
-                    f"Exception occurred renumbering sibling {sibling['node_id']}", exc_info=True
+                logger.error(f"Exception occurred renumbering siblings of {node_id}", exc_info=True)
+                raise
+            await self._touch_work(node["work_id"], account_id, session=session)
+        node["position"] = clamped
+        return node
+
+    async def _make_room_after(self, node: dict, account_id: str) -> float:
+        """Return the position for a copy placed right after node. Shifts the
+        following siblings up by one, or with ORDER_KEYS picks a key between
+        node and its next sibling so no other document is written."""
+        sibling_filter = {
+            "account_id": account_id,
+            "parent_id":  node["parent_id"],
+            "work_id":    node["work_id"],
+            "position":   {"$gt": node["position"]},
+        }
+        if ORDER_KEYS:
+            try:
+                after = await self.node_collection.find_one(
+                    sibling_filter, {"_id": 0, "node_id": 1, "position": 1},
+                    sort=[("position", 1)],
                 )
+            except (ConnectionFailure, OperationFailure):
+                logger.error(f"Exception occurred finding the sibling after {node['node_id']}", exc_info=True)
                 raise
-        return await self.get_node(node_id, account_id)
+            return await self._order_key_between(node, node, after, account_id)
+        try:
+            await self.node_collection.update_many(sibling_filter, {"$inc": {"position": 1}})
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred shifting siblings after {node['node_id']}", exc_info=True)
+            raise
+        await self._shift_position_counter(account_id, node["work_id"], node["parent_id"])
+        return node["position"] + 1
+
+    # ----------------------------------------------------------
+    # Sparse order keys  (ORDER_KEYS)
+    # ----------------------------------------------------------
+
+    async def _order_key_between(
+        self, node: dict, before: dict | None, after: dict | None,
+        account_id: str, session=None,
+    ) -> float:
+        """Return an order key between sibling docs before and after (None for
+        either end) under node's parent. The end slot comes from the position
+        counter; a slot with no representable key respaces the siblings first,
+        and one that is merely getting tight schedules a background respace."""
+        if after is None:
+            return await self._allocate_positions(
+                account_id, node["work_id"], node["parent_id"], session=session
+            )
+        low = before["position"] if before is not None else None
+        key = _key_between(low, after["position"])
+        if key is None:
+            keys = await self.rebalance_siblings(
+                account_id, node["work_id"], node["parent_id"], session=session
+            )
+            low = keys[before["node_id"]] if before is not None else None
+            return _key_between(low, keys[after["node_id"]])
+        if after["position"] - (low or 0) < ORDER_KEY_MIN_GAP:
+            self._schedule_rebalance(account_id, node["work_id"], node["parent_id"])
+        return key
+
+    async def rebalance_siblings(
+        self, account_id: str, work_id: str, parent_id: str | None, session=None
+    ) -> dict[str, int]:
+        """Respace parent_id's children (the Work's roots when None) to
+        multiples of ORDER_KEY_GAP in their current order, writing only the
+        documents whose key changes. Returns {node_id: new key}.
+
+        Each write only applies while the sibling still has the parent and key
+        that were read, so a move committed meanwhile is never overwritten;
+        if any write misses, a fresh respace is scheduled in the background."""
+        keys, complete = await self._respace_siblings(account_id, work_id, parent_id, session=session)
+        if not complete:
+            self._schedule_rebalance(account_id, work_id, parent_id)
+        return keys
+
+    async def _respace_siblings(
+        self, account_id: str, work_id: str, parent_id: str | None, session=None
+    ) -> tuple[dict[str, int], bool]:
+        """One respace pass for rebalance_siblings. Returns (keys, complete),
+        complete being False when a concurrent change made a write miss."""
+        logger.debug(f"rebalance_siblings({work_id}, {parent_id}) called")
+        try:
+            siblings = await self.node_collection.find(
+                {"account_id": account_id, "work_id": work_id, "parent_id": parent_id},
+                {"_id": 0, "node_id": 1, "position": 1},
+                sort=[("position", 1), ("_id", 1)],
+                session=session,
+            ).to_list(None)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred fetching siblings to rebalance under {parent_id}", exc_info=True)
+            raise
+        keys = {s["node_id"]: (i + 1) * ORDER_KEY_GAP for i, s in enumerate(siblings)}
+        requests = [
+            UpdateOne(
+                {"node_id": s["node_id"], "account_id": account_id,
+                 "parent_id": parent_id, "position": s["position"]},
+                {"$set": {"position": keys[s["node_id"]]}},
+            )
+            for s in siblings
+            if s["position"] != keys[s["node_id"]]
+        ]
+        modified = 0
+        try:
+            if requests:
+                result = await self.node_collection.bulk_write(requests, ordered=False, session=session)
+                modified = result.modified_count
+            # Appends must land after the respaced keys.
+            await self.counter_collection.update_one(
+                {"_id": _position_counter_id(account_id, work_id, parent_id)},
+                {"$max": {"next": (len(siblings) + 1) * ORDER_KEY_GAP},
+                 "$setOnInsert": {"work_id": work_id}},
+                upsert=True,
+                session=session,
+            )
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred rebalancing siblings under {parent_id}", exc_info=True)
+            raise
+        if modified:
+            await self._touch_work(work_id, account_id, session=session)
+        return keys, modified == len(requests)
+
+    def _schedule_rebalance(self, account_id: str, work_id: str, parent_id: str | None) -> None:
+        """Respace a parent's children in the background, once at a time."""
+        counter_id = _position_counter_id(account_id, work_id, parent_id)
+        if counter_id in _pending_rebalances:
+            return
+        _pending_rebalances.add(counter_id)
+
+        async def run():
+            try:
+                for _ in range(_REBALANCE_ATTEMPTS):
+                    _, complete = await self._respace_siblings(account_id, work_id, parent_id)
+                    if complete:
+                        break
+                else:
+                    logger.warning(f"Background rebalance of {counter_id} kept losing to concurrent moves")
+            except Exception:
+                logger.error(f"Background rebalance of {counter_id} failed", exc_info=True)
+            finally:
+                _pending_rebalances.discard(counter_id)
+
+        task = asyncio.get_running_loop().create_task(run())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def rank_positions(
+        self, docs: list[dict], account_id: str, skeleton: WorkSkeleton | None = None,
+    ) -> list[dict]:
+        """With ORDER_KEYS, replace the stored sort keys of docs (in place) with
+        zero-based sibling ranks, so API responses keep contiguous positions
+        and never expose a raw key. A no-op otherwise.
+
+        skeleton, when given, ranks every doc it knows (an export ranks all
+        its batches from one). Otherwise ranks come from the Works' skeletons:
+        loaded for up to _RANK_SKELETON_WORKS Works, used only when already
+        cached beyond that, and for a single doc, since the write that just
+        produced it has invalidated its Work. A lone unknown doc is ranked by
+        counting the siblings before it; several are ranked from one read of
+        their siblings' keys."""
+        if not ORDER_KEYS or not docs:
+            return docs
+        by_work: dict[str, list[dict]] = {}
+        for doc in docs:
+            by_work.setdefault(doc["work_id"], []).append(doc)
+        load = len(docs) > 1 and len(by_work) <= _RANK_SKELETON_WORKS
+        unranked: list[dict] = []
+        for work_id, work_docs in by_work.items():
+            if skeleton is None or skeleton.work_id != work_id:
+                work_skeleton = (
+                    await self._load_skeleton(work_id, account_id) if load
+                    else _work_tree_cache.get(account_id, work_id)
+                )
+            else:
+                work_skeleton = skeleton
+            for doc in work_docs:
+                rank = work_skeleton.rank_of(doc["node_id"]) if work_skeleton is not None else None
+                if rank is None:
+                    unranked.append(doc)
+                else:
+                    doc["position"] = rank
+        if len(unranked) == 1:
+            unranked[0]["position"] = await self._count_rank(unranked[0], account_id)
+        elif unranked:
+            await self._rank_from_siblings(unranked, account_id)
+        return docs
+
+    async def rank_skeleton(self, work_id: str, account_id: str) -> WorkSkeleton | None:
+        """With ORDER_KEYS, the Work's skeleton (cached or freshly loaded) for
+        ranking many of its nodes via rank_positions; None otherwise."""
+        if not ORDER_KEYS:
+            return None
+        return await self._load_skeleton(work_id, account_id)
+
+    async def _rank_from_siblings(self, docs: list[dict], account_id: str) -> None:
+        """Rank docs in place from one indexed read of every sibling key in
+        their sibling groups."""
+        groups = {(doc["work_id"], doc["parent_id"]) for doc in docs}
+        try:
+            siblings = await self.node_collection.find(
+                {"account_id": account_id,
+                 "$or": [{"work_id": w, "parent_id": p} for w, p in groups]},
+                {"_id": 0, "work_id": 1, "parent_id": 1, "position": 1},
+            ).to_list(None)
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred ranking {len(docs)} nodes", exc_info=True)
+            raise
+        keys: dict[tuple[str, str | None], list[float]] = {}
+        for sibling in siblings:
+            keys.setdefault((sibling["work_id"], sibling.get("parent_id")), []).append(sibling["position"])
+        for group in keys.values():
+            group.sort()
+        for doc in docs:
+            doc["position"] = bisect_left(keys.get((doc["work_id"], doc["parent_id"]), []), doc["position"])
+
+    async def _count_rank(self, doc: dict, account_id: str) -> int:
+        """Zero-based rank of doc among its siblings from its stored key."""
+        try:
+            return await self.node_collection.count_documents({
+                "account_id": account_id,
+                "work_id":    doc["work_id"],
+                "parent_id":  doc["parent_id"],
+                "position":   {"$lt": doc["position"]},
+            })
+        except (ConnectionFailure, OperationFailure):
+            logger.error(f"Exception occurred ranking node {doc['node_id']}", exc_info=True)
+            raise
 
     async def duplicate_shallow(self, node_id: str, account_id: str) -> dict | None:
         """Shallow-copy a node (no children). New tag gets ' (copy)' suffix.
-        Placed immediately after original; subsequent siblings shift up by one.
+        Placed immediately after original (see _make_room_after).
         Returns the new document or None if source not found."""
         logger.debug(f"duplicate_shallow({node_id}) called")
         node = await self.get_node(node_id, account_id)
         if node is None:
             return None
 
-        try:
-            await self.node_collection.update_many(
-                {
-                    "account_id": account_id,
-                    "parent_id":  node["parent_id"],
-                    "work_id":    node["work_id"],
-                    "position":   {"$gt": node["position"]},
-                },
-                {"$inc": {"position": 1}},
-            )
-        except (ConnectionFailure, OperationFailure):
-            logger.error(f"Exception occurred shifting siblings for duplicate of {node_id}", exc_info=True)
-            raise
-
-        now = datetime.now(timezone.utc)
-        new_doc = {
-            "node_id":     str(uuid.uuid4()),
-            "work_id":     node["work_id"],
-            "account_id":  node["account_id"],
-            "author":      node.get("author"),
-            "node_type":   node["node_type"],
-            "parent_id":   node["parent_id"],
-            "position":    node["position"] + 1,
-            "tag":         f"{node['tag']} (copy)",
-            "description": node.get("description"),
-            "text":        node.get("text"),
-            "previous":    node.get("previous"),
-            "next":        node.get("next"),
-            "tags":        list(node.get("tags") or []),
-            "created_at":  now,
-            "updated_at":  now,
-        }
+        position = await self._make_room_after(node, account_id)
+        new_doc = _copy_node_doc(
+            node,
+            parent_id=node["parent_id"],
+            position=position,
+            tag=f"{node['tag']} (copy)",
+            now=datetime.now(timezone.utc),
+            lineage=_own_lineage(node),
+        )
         try:
             await self.node_collection.insert_one(new_doc)
         except (DuplicateKeyError, ConnectionFailure, OperationFailure):
             logger.error(f"Exception occurred inserting shallow duplicate of {node_id}", exc_info=True)
             raise
+        finally:
+            await self._touch_work(node["work_id"], account_id)
         return _strip_id(new_doc)
 
-    async def duplicate_deep(
-        self,
-        node_id: str,
-        account_id: str,
-        _new_parent_id: str | None = None,
-        _position: int = 0,
-        _is_root_call: bool = True,
-    ) -> dict | None:
-        """Recursively copy a node and all descendants with fresh node_ids.
+    async def duplicate_deep(self, node_id: str, account_id: str) -> dict | None:
+        """Copy a node and all descendants with fresh node_ids.
         Root copy tag gets ' (copy)' suffix and is placed after the original.
-        Child copies preserve their original tags.
+        Child copies preserve their original tags and are renumbered 0..n-1
+        in their original sibling order.
+
+        Only the subtree's structure comes back from _get_subtree; ids are
+        remapped in memory via a parent→children map, and the full documents
+        are read in BULK_BATCH_SIZE chunks and written with insert_many as
+        they arrive (parents before children), so node text never has to fit
+        in one aggregation result or in memory at once.
         Returns the root new node or None if source not found."""
         logger.debug(f"duplicate_deep({node_id}) called")
         node = await self.get_node(node_id, account_id)
         if node is None:
             return None
+        _, descendants = await self._get_subtree(node_id, account_id, fields=["position"])
 
-        if _is_root_call:
-            try:
-                await self.node_collection.update_many(
-                    {
-                        "account_id": account_id,
-                        "parent_id":  node["parent_id"],
-                        "work_id":    node["work_id"],
-                        "position":   {"$gt": node["position"]},
-                    },
-                    {"$inc": {"position": 1}},
-                )
-            except (ConnectionFailure, OperationFailure):
-                logger.error("Exception occurred shifting siblings for deep duplicate", exc_info=True)
-                raise
-            new_parent_id = node["parent_id"]
-            new_position = node["position"] + 1
-            new_tag = f"{node['tag']} (copy)"
-        else:
-            new_parent_id = _new_parent_id
-            new_position = _position
-            new_tag = node["tag"]
-
+        # Breadth-first so every parent copy precedes its children in insert order.
+        plan: list[tuple[str, str, int]] = []
+        parent_to_children = _group_by_parent(descendants)
+        visited: set[str] = {node_id}
+        queue: deque[str] = deque([node_id])
+        while queue:
+            source_id = queue.popleft()
+            for i, child in enumerate(parent_to_children.get(source_id, [])):
+                if child["node_id"] in visited:
+                    logger.error(f"Cycle detected: node {child['node_id']} already visited")
+                    continue
+                visited.add(child["node_id"])
+                plan.append((child["node_id"], source_id, i))
+                queue.append(child["node_id"])
+
+        position = await self._make_room_after(node, account_id)
         now = datetime.now(timezone.utc)
-        new_node_id = str(uuid.uuid4())
-        new_doc = {
-            "node_id":     new_node_id,
-            "work_id":     node["work_id"],
-            "account_id":  node["account_id"],
-            "author":      node.get("author"),
-            "node_type":   node["node_type"],
-            "parent_id":   new_parent_id,
-            "position":    new_position,
-            "tag":         new_tag,
-            "description": node.get("description"),
-            "text":        node.get("text"),
-            "previous":    node.get("previous"),
-            "next":        node.get("next"),
-            "tags":        list(node.get("tags") or []),
-            "created_at":  now,
-            "updated_at":  now,
-        }
+        root_copy = _copy_node_doc(
+            node,
+            parent_id=node["parent_id"],
+            position=position,
+            tag=f"{node['tag']} (copy)",
+            now=now,
+            lineage=_own_lineage(node),
+        )
+        # Source node_id → {node_id, ancestors} of its copy, for the children.
+        copied: dict[str, dict] = {node_id: root_copy}
+        pending: list[dict] = [root_copy]
         try:
-            await self.node_collection.insert_one(new_doc)
-        except (DuplicateKeyError, ConnectionFailure, OperationFailure):
-            logger.error("Exception occurred inserting deep duplicate node", exc_info=True)
-            raise
-
+            for start in range(0, len(plan), BULK_BATCH_SIZE):
+                batch = plan[start:start + BULK_BATCH_SIZE]
+                sources = {
+                    doc["node_id"]: doc
+                    for doc in await self.get_nodes_by_ids([sid for sid, _, _ in batch], account_id)
+                }
+                for source_id, parent_id, i in batch:
+                    child, parent_copy = sources.get(source_id), copied.get(parent_id)
+                    if child is None or parent_copy is None:
+                        continue   # deleted since the lookup
+                    child_copy = _copy_node_doc(
+                        child,
+                        parent_id=parent_copy["node_id"],
+                        position=i,
+                        tag=child["tag"],
+                        now=now,
+                        lineage=_child_lineage(parent_copy),
+                    )
+                    copied[source_id] = {
+                        k: child_copy[k] for k in ("node_id", "ancestors") if k in child_copy
+                    }
+                    pending.append(child_copy)
+                while len(pending) >= BULK_BATCH_SIZE:
+                    await self._insert_copies(pending[:BULK_BATCH_SIZE])
+                    pending = pending[BULK_BATCH_SIZE:]
+            if pending:
+                await self._insert_copies(pending)
+        finally:
+            # Siblings were already shifted, so bump even if an insert failed.
+            await self._touch_work(node["work_id"], account_id)
+
+        return _strip_id(root_copy)
+
+    async def _insert_copies(self, docs: list[dict]) -> None:
         try:
-            children = await self.node_collection.find(
-                {"account_id": account_id, "parent_id": node_id},
-                sort=[("position", 1)],
-            ).to_list(None)
-        except (ConnectionFailure, OperationFailure):
-            logger.error(f"Exception occurred fetching children for deep duplicate of {node_id}", exc_info=True)
+            await self.node_collection.insert_many(docs, ordered=True)
+        except (DuplicateKeyError, ConnectionFailure, OperationFailure):
+            logger.error("Exception occurred inserting deep duplicate nodes", exc_info=True)
             raise
 
-        for i, child in enumerate(children):
-            await self.duplicate_deep(
-                node_id=child["node_id"],
-                account_id=account_id,
-                _new_parent_id=new_node_id,
-                _position=i,
-                _is_root_call=False,
-            )
-
-        return _strip_id(new_doc)
-
 
 # ================================================================
 #  SearchStorage  (Tier 3 — search-query/feature.md)
@@ -1241,10 +2804,12 @@ class SearchStorage:
         work_id: str | None = None,
         node_type: str | None = None,
         limit: int = 50,
+        fields: list[str] | None = None,
     ) -> list[dict]:
         """Full-text search over description and text fields.
 
-        Returns a list of node dicts (with _id stripped) ordered by descending textScore.
+        Returns a list of node dicts (with _id stripped) ordered by descending
+        textScore, projected as in NodeStorage.list_nodes.
         """
         logger.debug(f"search_nodes(account_id={account_id}, query={query!r}) called")
         filter_doc: dict = {"account_id": account_id, "$text": {"$search": query}}
@@ -1257,7 +2822,7 @@ class SearchStorage:
         try:
             async for doc in self.node_collection.find(
                 filter_doc,
-                {"score": {"$meta": "textScore"}},
+                {**(_node_projection(fields) or {}), "score": {"$meta": "textScore"}},
             ).sort([("score", {"$meta": "textScore"})]).limit(limit):
                 _strip_id(doc)
                 results.append(doc)
@@ -1277,11 +2842,13 @@ class SearchStorage:
         work_id: str | None = None,
         node_type: str | None = None,
         limit: int = 50,
+        fields: list[str] | None = None,
     ) -> list[dict]:
         """Query nodes by tag(s).
 
         *match* == 'any' → $in; *match* == 'all' → $all.
-        Returns a list of node dicts (with _id stripped) ordered by created_at descending.
+        Returns a list of node dicts (with _id stripped) ordered by created_at
+        descending, projected as in NodeStorage.list_nodes.
         """
         logger.debug(f"find_nodes_by_tags(account_id={account_id}, tags={tags!r}) called")
         filter_doc: dict = {"account_id": account_id}
@@ -1296,7 +2863,7 @@ class SearchStorage:
 
         results: list[dict] = []
         try:
-            async for doc in self.node_collection.find(filter_doc).sort(
+            async for doc in self.node_collection.find(filter_doc, _node_projection(fields)).sort(
                 [("created_at", -1)]
             ).limit(limit):
                 _strip_id(doc)
@@ -1339,37 +2906,7 @@ class DemoStorage:
         Returns count of works deleted.
         """
         logger.debug(f"delete_demo_works({account_id}) called")
-        try:
-            # Find all demo works via list_works + Python tag filter
-            demo_works: list[dict] = []
-            cursor: str | None = None
-            while True:
-                works, next_cursor = await self._work_storage.list_works(
-                    account_id, limit=200, cursor=cursor
-                )
-                for w in works:
-                    if "demo" in w.get("tags", []):
-                        demo_works.append(w)
-                if next_cursor is None:
-                    break
-                cursor = next_cursor
-
-            if not demo_works:
-                return 0
-
-            deleted = 0
-            for w in demo_works:
-                found, _ = await self._work_storage.delete_work(
-                    w["work_id"], account_id, session=session
-                )
-                if found:
-                    deleted += 1
-
-            return deleted
-
-        except (ConnectionFailure, OperationFailure):
-            logger.error(f"Exception occurred deleting demo works for account {account_id}", exc_info=True)
-            raise
+        return await self._work_storage.delete_works_by_tag(account_id, "demo", session=session)
 
     async def seed_demo(
         self, 
@@ -1430,37 +2967,24 @@ class DemoStorage:
         """Seed using a multi-document transaction for atomicity."""
         client = self.client
         async with await client.start_session() as session:
-            async with session.start_transaction():
-                if reset:
-                    await self.delete_demo_works(account_id, session=session)
-
-                work_dict = work_data.model_dump()
-                work_dict["tags"] = list(work_dict.get("tags") or []) + ["demo"]
-                work_doc = await self.work_storage.create_work(
-                    account_id, work_dict, session=session
-                )
-
-                created_nodes = []
-                for node_data in node_list:
-                    # Overwrite placeholder work_id with the real one from create_work
-                    node_doc = await self.node_storage.create_node(
-                        account_id,
-                        work_doc,
-                        {**node_data.model_dump(), "account_id": account_id, "work_id": work_doc["work_id"]},
-                        session=session,
+            try:
+                async with session.start_transaction():
+                    if reset:
+                        await self.delete_demo_works(account_id, session=session)
+
+                    work_dict = work_data.model_dump()
+                    work_dict["tags"] = list(work_dict.get("tags") or []) + ["demo"]
+                    work_doc = await self.work_storage.create_work(
+                        account_id, work_dict, session=session
                     )
-                    created_nodes.append(node_doc)
-
-                by_type = {"part": 0, "chapter": 0, "scene": 0}
-                for node in created_nodes:
-                    by_type[node["node_type"]] += 1
 
-                return {
-                    "work_id": work_doc["work_id"],
-                    "title": work_data.title,
-                    "total_nodes": len(created_nodes),
-                    "by_type": by_type,
-                }
+                    result = await self._seed_nodes(
+                        account_id, work_doc, work_data, node_list, session=session
+                    )
+            finally:
+                # Committed or aborted: other workers may reload from here on.
+                _flush_invalidations(session)
+        return result
 
     async def _seed_with_compensating_cleanup(
         self,
@@ -1484,25 +3008,36 @@ class DemoStorage:
         work_doc = await self.work_storage.create_work(account_id, work_dict)
 
         try:
-            created_nodes = []
-            for node_data in node_list:
-                node_doc = await self.node_storage.create_node(
-                    account_id,
-                    work_doc,
-                    {**node_data.model_dump(), "account_id": account_id, "work_id": work_doc["work_id"]},
-                )
-                created_nodes.append(node_doc)
-
-            by_type = {"part": 0, "chapter": 0, "scene": 0}
-            for node in created_nodes:
-                by_type[node["node_type"]] += 1
-
-            return {
-                "work_id": work_doc["work_id"],
-                "title": work_data.title,
-                "total_nodes": len(created_nodes),
-                "by_type": by_type,
-            }
+            return await self._seed_nodes(account_id, work_doc, work_data, node_list)
         except Exception:
             await self._work_storage.delete_work(work_doc["work_id"], account_id)
             raise
+
+    async def _seed_nodes(
+        self, account_id: str, work_doc: dict, work_data, node_list, session=None
+    ) -> dict:
+        """Write build_demo_tree's nodes into the freshly created work_doc with
+        one batched insert. Nodes keep their generated node_ids; parents are
+        wired by ref and positions follow the flattened sibling order."""
+        items = [
+            {
+                **node.model_dump(mode="json", exclude={"work_id", "parent_id"}),
+                "ref": node.node_id,
+                "parent_ref": node.parent_id,
+            }
+            for node in node_list
+        ]
+        created_nodes, _ = await self.node_storage.create_nodes_bulk(
+            account_id, work_doc, items, session=session, new_work=True
+        )
+
+        by_type = {"part": 0, "chapter": 0, "scene": 0}
+        for node in created_nodes:
+            by_type[node["node_type"]] += 1
+
+        return {
+            "work_id": work_doc["work_id"],
+            "title": work_data.title,
+            "total_nodes": len(created_nodes),
+            "by_type": by_type,
+        }
@@ -3,7 +3,7 @@ from typing import Tuple
 
 from .models import CreateNodeRequest, CreateWorkRequest, NodeType
 
-# Placeholder work_id used by build_demo_tree; overwritten in _seed_with_transaction()
+# Placeholder work_id used by build_demo_tree; DemoStorage seeds into the real Work instead
 _PLACEHOLDER_WORK_ID = str(uuid.UUID("00000000-0000-0000-0000-000000000000"))
 
 
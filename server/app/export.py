@@ -0,0 +1,122 @@
+"""Streaming NDJSON export and restore of whole Works.
+
+An export is one JSON object per line: a header record
+{"type": "work", "format": 1, "work": {...}} followed by one
+{"type": "node", "node": {...}} record per node, in no particular order
+(parent_id carries the structure). It may be gzip-compressed.
+
+Both directions work on bounded chunks so neither the API process nor the
+client ever holds a whole Work: export_ndjson() encodes straight from a node
+cursor and read_ndjson() parses an upload line by line for
+WorkStorage.restore_work().
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator
+
+from app.database import InvalidWorkImport
+
+EXPORT_FORMAT = 1
+# Encoded lines are flushed to the client in chunks of about this size.
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Longest accepted line in an upload; a node at every field limit is far smaller.
+IMPORT_MAX_LINE_BYTES = 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _encode(record: dict) -> bytes:
+    return json.dumps(record, default=_json_default, separators=(",", ":")).encode() + b"\n"
+
+
+async def export_ndjson(
+    work: dict, nodes: AsyncIterator[dict], compress: bool = False
+) -> AsyncIterator[bytes]:
+    """Yield the NDJSON export of work and its nodes, gzip-compressed when
+    compress is set, in chunks of roughly EXPORT_CHUNK_BYTES."""
+    header = {
+        k: v for k, v in work.items()
+        if k not in ("account_id", "version", "ancestors_backfilled")
+    }
+    gzip = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray(_encode({"type": "work", "format": EXPORT_FORMAT, "work": header}))
+    async for node in nodes:
+        buffer += _encode({"type": "node", "node": node})
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            chunk = gzip.compress(bytes(buffer)) if gzip else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+    tail = gzip.compress(bytes(buffer)) + gzip.flush() if gzip else bytes(buffer)
+    if tail:
+        yield tail
+
+
+def _inflate(inflater, data: bytes):
+    """Decompress data in bounded pieces so a small upload cannot expand
+    into an unbounded buffer."""
+    while data:
+        piece = inflater.decompress(data, EXPORT_CHUNK_BYTES)
+        yield piece
+        data = inflater.unconsumed_tail
+
+
+async def read_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """Parse an uploaded export (plain or gzip, detected from its first bytes)
+    incrementally, yielding (line number, record). Blank lines are skipped.
+    Raises InvalidWorkImport on malformed input or an unsupported format."""
+    inflater = None
+    head: bytes | None = b""   # bytes held back until the encoding is known
+    buffer = b""
+    line_no = 0
+
+    def parse(raw: bytes) -> dict | None:
+        if not raw.strip():
+            return None
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            raise InvalidWorkImport(line_no, "invalid JSON")
+        if not isinstance(record, dict):
+            raise InvalidWorkImport(line_no, "expected a JSON object")
+        version = record.get("format", EXPORT_FORMAT)
+        if line_no == 1 and (not isinstance(version, int) or version > EXPORT_FORMAT):
+            raise InvalidWorkImport(line_no, f"unsupported export format {version!r}")
+        return record
+
+    async for chunk in chunks:
+        if head is not None:
+            head += chunk
+            if len(head) < len(_GZIP_MAGIC):
+                continue
+            if head.startswith(_GZIP_MAGIC):
+                inflater = zlib.decompressobj(wbits=31)
+            chunk, head = head, None
+        pieces = _inflate(inflater, chunk) if inflater is not None else (chunk,)
+        for piece in pieces:
+            buffer += piece
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                line_no += 1
+                record = parse(raw)
+                if record is not None:
+                    yield line_no, record
+            if len(buffer) > IMPORT_MAX_LINE_BYTES:
+                raise InvalidWorkImport(line_no + 1, f"line exceeds {IMPORT_MAX_LINE_BYTES} bytes")
+    if head:
+        buffer = head
+    if inflater is not None and not inflater.eof:
+        raise InvalidWorkImport(None, "truncated gzip stream")
+    line_no += 1
+    record = parse(buffer)
+    if record is not None:
+        yield line_no, record
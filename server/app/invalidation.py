@@ -0,0 +1,179 @@
+"""Cross-worker cache invalidation over Redis pub/sub.
+
+Every worker keeps process-local caches (work skeletons, verified tokens).
+Write paths call invalidation_bus.publish(kind, **payload) once their writes
+have landed (after commit, for transactions): handlers in this process run
+immediately, and the message is queued for publication on
+INVALIDATION_CHANNEL so every other worker runs its handlers too. A worker
+that was mid-way through reloading when a message arrives discards that
+load rather than caching it (WorkTreeCache.begin_load).
+
+Message kinds and their handlers:
+    "work"     {account_id, work_id}   drop the Work's cached skeleton
+    "account"  {account_id}            drop the account's cached tokens
+    "token"    {token_key}             drop a logged-out token (by SHA-256)
+
+When Redis is unreachable the local handlers still run, so this worker
+stays coherent; other workers cannot hear about the write, so each worker
+runs its reset handlers (clearing its caches) whenever its subscription
+drops or is re-established. Cache max-age/TTL bounds anything in between.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+from typing import Callable
+
+from app import metrics as prom
+from app.helpers import get_logger
+
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "fabulator:invalidate")
+# Pending outbound messages; when full (Redis stalled) further messages are
+# dropped and peers fall back to cache max-age.
+INVALIDATION_QUEUE_SIZE = int(os.getenv("INVALIDATION_QUEUE_SIZE", "10000"))
+
+logger = get_logger(__name__)
+
+
+class InvalidationBus:
+    def __init__(self, channel: str = INVALIDATION_CHANNEL, queue_size: int = INVALIDATION_QUEUE_SIZE):
+        self.channel = channel
+        self.queue_size = queue_size
+        # Messages carrying our own origin were already applied locally.
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[Callable[[dict], None]]] = {}
+        self._reset_handlers: list[Callable[[], None]] = []
+        self._redis = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.connected = False
+
+    def subscribe(self, kind: str, handler: Callable[[dict], None]) -> None:
+        """Run handler(payload) for every `kind` message, local or remote."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_reset(self, handler: Callable[[], None]) -> None:
+        """Run handler() whenever messages may have been missed (the
+        subscription dropped or was re-established); it should clear caches."""
+        self._reset_handlers.append(handler)
+
+    def publish(self, kind: str, **payload) -> None:
+        """Apply locally, then queue for the other workers. Never raises and
+        never waits on Redis, so it is safe on any write path."""
+        self._dispatch(kind, payload, source="local")
+        if self._queue is None:
+            return
+        message = json.dumps({"origin": self.origin, "kind": kind, "payload": payload})
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._enqueue(message)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, message)
+
+    def _enqueue(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Invalidation queue full; dropping message")
+
+    def _dispatch(self, kind: str, payload: dict, source: str) -> None:
+        prom.CACHE_INVALIDATIONS.inc(kind=kind, source=source)
+        for handler in self._handlers.get(kind, []):
+            try:
+                handler(payload)
+            except Exception:
+                logger.error(f"Invalidation handler failed for {kind} {payload}", exc_info=True)
+
+    def _reset(self) -> None:
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception:
+                logger.error("Invalidation reset handler failed", exc_info=True)
+
+    def receive(self, data: str | bytes) -> None:
+        """Apply a message read from the channel, ignoring our own."""
+        try:
+            message = json.loads(data)
+            if message["origin"] == self.origin:
+                return
+            kind, payload = message["kind"], message["payload"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed invalidation message: {data!r}")
+            return
+        self._dispatch(kind, payload, source="remote")
+
+    async def start(self, client) -> None:
+        """Start publishing and listening with client; called from the FastAPI
+        lifespan. The tasks are bound to the running event loop."""
+        self._redis = client
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._listen(), name="invalidation-listen"),
+            asyncio.create_task(self._publish_queued(), name="invalidation-publish"),
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the bus tasks; called from the FastAPI lifespan on shutdown."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+        self._redis = None
+        self.connected = False
+
+    async def _publish_queued(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._redis.publish(self.channel, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Could not publish invalidation message", exc_info=True)
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._set_connected(True)
+                delay = 1.0
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    f"Invalidation subscription lost; retrying in {delay:.0f}s", exc_info=True
+                )
+            finally:
+                self._set_connected(False)
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _set_connected(self, connected: bool) -> None:
+        # Either transition means messages may have been missed.
+        if connected != self.connected:
+            self._reset()
+        self.connected = connected
+        prom.INVALIDATION_BUS_CONNECTED.set(1 if connected else 0)
+
+
+invalidation_bus = InvalidationBus()
@@ -1,6 +1,9 @@
 from datetime import datetime, timezone
-from typing import Optional, Annotated, Any
-from pydantic import BaseModel, EmailStr, ConfigDict, field_validator, StringConstraints
+from typing import Optional, Annotated, Any, Union
+from pydantic import (
+    BaseModel, EmailStr, ConfigDict, Field, StrictFloat, StrictInt, field_validator,
+    StringConstraints,
+)
 from bson.objectid import ObjectId
 from enum import Enum
 # ------------------------------------------
@@ -341,6 +344,7 @@ class WorkResponse(BaseModel):
     description: Optional[str] = None
     author: Optional[str] = None
     tags: list[str] = []
+    version: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -352,6 +356,7 @@ class WorkResponse(BaseModel):
                 "description": "A story about remarkable things",
                 "author": "Philip Suggars",
                 "tags": ["fiction"],
+                "version": 3,
                 "created_at": "2026-06-07T09:00:00Z",
                 "updated_at": "2026-06-07T09:00:00Z"
             }
@@ -359,6 +364,19 @@ class WorkResponse(BaseModel):
     )
 
 
+class WorkImportResponse(WorkResponse):
+    total_nodes: int
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                **WorkResponse.model_config["json_schema_extra"]["example"],
+                "total_nodes": 300000,
+            }
+        }
+    )
+
+
 # -----------------------------------------------
 #   Normalised model — Node schemas
 # -----------------------------------------------
@@ -398,6 +416,103 @@ class CreateNodeRequest(BaseModel):
     )
 
 
+class ImportedNode(BaseModel):
+    """A node record of a Work export being restored. Content fields carry
+    the CreateNodeRequest limits; ids need only be strings since the
+    restore replaces them. Timestamps are parsed by the restore itself."""
+    node_id: Annotated[str, StringConstraints(min_length=1)]
+    node_type: NodeType
+    parent_id: Optional[str] = None
+    position: Union[Annotated[StrictInt, Field(ge=0)], Annotated[StrictFloat, Field(ge=0)]]
+    tag: TagFieldStr
+    author: Optional[AuthorStr] = None
+    description: Optional[DescriptionStr] = None
+    text: Optional[TextStr] = None
+    previous: Optional[LinkStr] = None
+    next: Optional[LinkStr] = None
+    tags: Optional[list[str]] = []
+    ancestors: Optional[list[str]] = None
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v):
+        return _validate_tags_list(v)
+
+
+REF_MAX_LEN = 100
+RefStr = Annotated[str, StringConstraints(min_length=1, max_length=REF_MAX_LEN)]
+
+
+class BulkNodeItem(BaseModel):
+    """One node of a bulk create. Attach it under another item of the batch by
+    nesting it in that item's `children` or via `parent_ref`, under an existing
+    node of the work via `parent_id`, or at the root by omitting both."""
+    ref: Optional[RefStr] = None
+    node_id: Optional[UuidStr] = None
+    node_type: NodeType
+    parent_id: Optional[UuidStr] = None
+    parent_ref: Optional[RefStr] = None
+    tag: TagFieldStr
+    description: Optional[DescriptionStr] = None
+    text: Optional[TextStr] = None
+    previous: Optional[LinkStr] = None
+    next: Optional[LinkStr] = None
+    tags: Optional[list[str]] = []
+    children: list["BulkNodeItem"] = []
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v):
+        return _validate_tags_list(v)
+
+
+class BulkCreateNodesRequest(BaseModel):
+    nodes: list[BulkNodeItem]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "nodes": [
+                    {
+                        "ref": "p1",
+                        "node_type": "part",
+                        "tag": "Part One",
+                        "children": [
+                            {"ref": "c1", "node_type": "chapter", "tag": "Chapter 1"},
+                        ],
+                    },
+                    {"parent_ref": "c1", "node_type": "scene", "tag": "Opening"},
+                ]
+            }
+        }
+    )
+
+
+class BulkCreateNodesResponse(BaseModel):
+    work_id: str
+    count: int
+    node_ids: list[str]
+    refs: dict[str, str]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "work_id": "9b1deb4d-3b7d-4bad-9bdd-2b0d7b3dcb6d",
+                "count": 3,
+                "node_ids": [
+                    "d22e5e28-ca11-11eb-b437-f01898e87167",
+                    "a11b2c3d-0000-0000-0000-f01898e87167",
+                    "b22c3d4e-0000-0000-0000-f01898e87167",
+                ],
+                "refs": {
+                    "p1": "d22e5e28-ca11-11eb-b437-f01898e87167",
+                    "c1": "a11b2c3d-0000-0000-0000-f01898e87167",
+                },
+            }
+        }
+    )
+
+
 class UpdateNodeRequest(BaseModel):
     tag: Optional[TagFieldStr] = None
     parent_id: Optional[UuidStr] = None
@@ -475,6 +590,39 @@ class NodeResponse(BaseModel):
     )
 
 
+class NodeOutline(BaseModel):
+    """A node as returned when `fields` is given: the outline fields below
+    plus only the requested ones (absent fields are omitted, not null)."""
+    node_id: str
+    work_id: str
+    node_type: NodeType
+    parent_id: Optional[str] = None
+    position: int
+    tag: str
+    author: Optional[str] = None
+    description: Optional[str] = None
+    text: Optional[str] = None
+    previous: Optional[str] = None
+    next: Optional[str] = None
+    tags: Optional[list[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "node_id": "b33f4e56-ca11-11eb-b437-f01898e87167",
+                "work_id": "d22e5e28-ca11-11eb-b437-f01898e87167",
+                "node_type": "chapter",
+                "parent_id": "a11b2c3d-0000-0000-0000-f01898e87167",
+                "position": 0,
+                "tag": "Chapter 1",
+                "description": "The hero arrives"
+            }
+        }
+    )
+
+
 # -----------------------------------------------
 #   Normalised model — composite response schemas
 # -----------------------------------------------
@@ -491,6 +639,45 @@ class AncestorsResponse(BaseModel):
     )
 
 
+class NodeTreeResponse(NodeResponse):
+    """A node with its descendants nested under position-ordered `children`."""
+    children: list["NodeTreeResponse"] = []
+
+
+class NodeOutlineTree(NodeOutline):
+    """NodeTreeResponse counterpart for projected (`fields`) reads."""
+    children: list["NodeOutlineTree"] = []
+
+
+# What node reads return: full documents, or outlines when `fields` is given.
+# Full documents are tried first so they never validate as the slimmer outline.
+NodeResult = Annotated[Union[NodeResponse, NodeOutline], Field(union_mode="left_to_right")]
+NodeTreeResult = Annotated[
+    Union[NodeTreeResponse, NodeOutlineTree], Field(union_mode="left_to_right")
+]
+
+
+class NodeNeighbourhoodResponse(BaseModel):
+    """A node and the neighbours selected with `include`; neighbours that
+    were not requested are omitted."""
+    node: NodeResult
+    parent: Optional[NodeResult] = None
+    children: Optional[list[NodeResult]] = None
+    siblings: Optional[list[NodeResult]] = None
+    ancestors: Optional[list[NodeResult]] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "node": NodeResponse.model_config["json_schema_extra"]["example"],
+                "children": [],
+                "siblings": [],
+                "ancestors": []
+            }
+        }
+    )
+
+
 class WorkStatsResponse(BaseModel):
     work_id: str
     total_nodes: int
@@ -547,7 +734,7 @@ class MatchType(str, Enum):
 
 
 class NodeSearchResponse(BaseModel):
-    results: list[NodeResponse]
+    results: list[NodeResult]
     count: int
 
     model_config = ConfigDict(
@@ -565,7 +752,7 @@ class NodeSearchResponse(BaseModel):
 # -----------------------------------------------
 
 class PaginatedNodeResponse(BaseModel):
-    results: list[NodeResponse]
+    results: list[NodeResult]
     count: int
     next_cursor: Optional[str] = None
 
@@ -616,10 +803,33 @@ class HealthResponse(BaseModel):
     )
 
 
+class LivenessResponse(BaseModel):
+    status: str
+
+    model_config = ConfigDict(
+        json_schema_extra={"example": {"status": "ok"}}
+    )
+
+
+class RedisPoolStats(BaseModel):
+    max_connections: int
+    created_connections: int
+    in_use_connections: int
+    available_connections: int
+
+
+class PasswordHashStats(BaseModel):
+    workers: int
+    in_flight: int
+    queued: int
+
+
 class MetricsResponse(BaseModel):
     uptime_seconds: float
     max_pool_size: int
     total_requests: int
+    redis_pool: Optional[RedisPoolStats] = None
+    password_hash: Optional[PasswordHashStats] = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -627,6 +837,13 @@ class MetricsResponse(BaseModel):
                 "uptime_seconds": 3600.0,
                 "max_pool_size": 100,
                 "total_requests": 42,
+                "redis_pool": {
+                    "max_connections": 50,
+                    "created_connections": 3,
+                    "in_use_connections": 1,
+                    "available_connections": 2,
+                },
+                "password_hash": {"workers": 4, "in_flight": 6, "queued": 2},
             }
         }
     )
@@ -660,7 +877,7 @@ class DemoSeedResponse(BaseModel):
 
 class OrderedNodesResponse(BaseModel):
     work_id: str
-    nodes: list[NodeResponse]
+    nodes: list[NodeResult]
     count: int
     next_cursor: Optional[str] = None
 
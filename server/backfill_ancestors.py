@@ -0,0 +1,28 @@
+"""One-off migration: materialize `ancestors`/`depth` on existing nodes.
+
+Works are served from the materialized path (MATERIALIZED_ANCESTORS=True)
+only once this has flagged them; rerun it until every Work is flagged:
+
+    python backfill_ancestors.py
+"""
+import asyncio
+
+import motor.motor_asyncio
+
+import app.config   # loads the load_env lib to access .env file
+from app.database import MONGO_DETAILS, backfill_ancestors, setup_collections
+
+
+async def main() -> None:
+    client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_DETAILS)
+    try:
+        db = client.fabulator
+        await setup_collections(db)
+        written = await backfill_ancestors(db)
+        print(f"Backfilled ancestors on {written} nodes")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Benchmark: cost of serializing one page of nodes.
+
+Compares FastAPI's response_model path (validate the returned dicts through
+PaginatedNodeResponse, dump to JSON-compatible Python, json.dumps) with the
+fast path used by the node list endpoints (_node_docs + pydantic-core
+to_json). Needs no database:
+
+    python bench_serialization.py [page_size] [text_bytes]
+"""
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+
+import app.config   # loads the load_env lib to access .env file
+from app.api import _fast_json, _node_docs
+from app.models import PaginatedNodeResponse
+
+
+def make_page(size: int, text_bytes: int) -> list[dict]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)   # as Motor returns it
+    work_id = str(uuid.uuid4())
+    return [
+        {
+            "node_id": str(uuid.uuid4()), "work_id": work_id, "account_id": "bench",
+            "author": "Author", "node_type": "scene", "parent_id": str(uuid.uuid4()),
+            "position": i, "tag": f"Scene {i}", "description": "A scene",
+            "text": "x" * text_bytes, "previous": None, "next": None,
+            "tags": ["draft"], "created_at": now, "updated_at": now,
+            "ancestors": [str(uuid.uuid4())], "depth": 2,
+        }
+        for i in range(size)
+    ]
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    text_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    docs = make_page(size, text_bytes)
+    adapter = TypeAdapter(PaginatedNodeResponse)
+
+    def response_model_path() -> bytes:
+        content = {"results": docs, "count": len(docs), "next_cursor": None}
+        value = adapter.validate_python(content)
+        dumped = adapter.dump_python(value, mode="json")
+        return json.dumps(dumped, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def fast_path() -> bytes:
+        content = {"results": _node_docs(docs), "count": len(docs), "next_cursor": None}
+        return _fast_json(content).body
+
+    assert json.loads(response_model_path()) == json.loads(fast_path()), "paths disagree"
+
+    for name, fn in (("response_model", response_model_path), ("fast path", fast_path)):
+        runs = 200
+        per_page = min(timeit.repeat(fn, number=runs, repeat=5)) / runs
+        print(f"{name:>15}: {per_page * 1e6:9.1f} µs per {size}-node page")
+
+
+if __name__ == "__main__":
+    main()
@@ -511,6 +511,95 @@ class TestWorkCRUD:
             r = await ac.delete(f"/works/{work_id}", headers=headers)
         assert r.status_code == 403
 
+    # --- Export / import ---
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("gzip", [False, True])
+    async def test_t_work_26_export_import_round_trip(self, main_user, gzip):
+        """T-WORK-26: An exported work restores as a new work with the same tree."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            work_id, ids = await _create_work_and_hierarchy(ac, headers)
+            r = await ac.get(f"/works/{work_id}/export?gzip={str(gzip).lower()}", headers=headers)
+            assert r.status_code == 200
+            assert r.content.startswith(b"\x1f\x8b") == gzip
+            restored = await ac.post("/works/import", content=r.content, headers=headers)
+            assert restored.status_code == 201
+            body = restored.json()
+            assert body["title"] == "Test Novel" and body["total_nodes"] == 3
+            assert body["work_id"] != work_id
+            tree = await ac.get(f"/works/{body['work_id']}/nodes/ordered", headers=headers)
+        nodes = tree.json()["nodes"]
+        assert [n["node_type"] for n in nodes] == ["part", "chapter", "scene"]
+        assert not {n["node_id"] for n in nodes} & set(ids)
+
+    @pytest.mark.asyncio
+    async def test_t_work_27_import_invalid(self, main_user, motor_client):
+        """T-WORK-27: A malformed export returns 422 and leaves no work behind."""
+        headers, _ = main_user
+        body = (
+            b'{"type":"work","format":1,"work":{"title":"Broken import"}}\n'
+            b'{"type":"node","node":{"node_id":"x","parent_id":"missing",'
+            b'"node_type":"chapter","position":0,"tag":"C"}}\n'
+        )
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.post("/works/import", content=body, headers=headers)
+        assert r.status_code == 422
+        assert await motor_client.fabulator.work_collection.count_documents(
+            {"title": "Broken import"}
+        ) == 0
+
+    @pytest.mark.asyncio
+    async def test_t_work_28_export_isolation(self, work_id, iso_user):
+        """T-WORK-28: GET /works/{other's id}/export returns 404."""
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/works/{work_id}/export", headers=iso_user)
+        assert r.status_code == 404
+
+    # --- Conditional GET ---
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", ["", "/stats", "/nodes", "/nodes/root", "/nodes/ordered"])
+    async def test_t_work_29_etag_not_modified(self, main_user, path):
+        """T-WORK-29: Repeating a read with its ETag in If-None-Match returns 304."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            work_id, _ = await _create_work_and_hierarchy(ac, headers)
+            r = await ac.get(f"/works/{work_id}{path}", headers=headers)
+            assert r.status_code == 200
+            etag = r.headers["etag"]
+            r = await ac.get(f"/works/{work_id}{path}", headers={**headers, "If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.headers["etag"] == etag
+        assert r.content == b""
+
+    @pytest.mark.asyncio
+    async def test_t_work_30_etag_changes_on_write(self, main_user):
+        """T-WORK-30: A node write or work update changes the ETag, so the old one gets 200."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            work_id, _ = await _create_work_and_hierarchy(ac, headers)
+            first = (await ac.get(f"/works/{work_id}/nodes", headers=headers)).headers["etag"]
+            await _create_node(ac, headers, work_id, "part", "Another part")
+            r = await ac.get(f"/works/{work_id}/nodes", headers={**headers, "If-None-Match": first})
+            assert r.status_code == 200
+            second = r.headers["etag"]
+            assert second != first
+            await ac.put(f"/works/{work_id}", json={"author": "Someone Else"}, headers=headers)
+            r = await ac.get(f"/works/{work_id}/nodes", headers={**headers, "If-None-Match": second})
+        assert r.status_code == 200
+        assert r.headers["etag"] not in (first, second)
+        assert {n["author"] for n in r.json()["results"]} == {"Someone Else"}
+
+    @pytest.mark.asyncio
+    async def test_t_work_31_etag_isolation(self, work_id, main_user, iso_user):
+        """T-WORK-31: Another account's If-None-Match still gets 404, not 304."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            etag = (await ac.get(f"/works/{work_id}", headers=headers)).headers["etag"]
+            r = await ac.get(f"/works/{work_id}", headers={**iso_user, "If-None-Match": etag})
+        assert r.status_code == 404
+
 
 # ===========================================================================
 # T-47: Node CRUD — Create + List + Read (25 tests)
@@ -776,6 +865,97 @@ class TestNodeCreate:
             r = await _create_node(ac, headers, work_id, "scene", "sub-scene", parent_id=scene_id)
         assert r.status_code == 422
 
+    # --- Bulk create ---
+
+    @pytest.mark.asyncio
+    async def test_t_create_26_bulk_nested_and_refs(self, work_id, main_user):
+        """T-CREATE-26: POST /works/{id}/nodes/bulk creates nested and parent_ref items."""
+        headers, _ = main_user
+        body = {"nodes": [
+            {"ref": "p1", "node_type": "part", "tag": "Part One", "children": [
+                {"ref": "c1", "node_type": "chapter", "tag": "Ch1"},
+            ]},
+            {"parent_ref": "c1", "node_type": "scene", "tag": "S1"},
+            {"parent_ref": "c1", "node_type": "scene", "tag": "S2"},
+        ]}
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.post(f"/works/{work_id}/nodes/bulk", json=body, headers=headers)
+            assert r.status_code == 201
+            created = r.json()
+            r = await ac.get(f"/nodes/{created['refs']['c1']}/children", headers=headers)
+        assert created["count"] == 4
+        assert created["refs"]["p1"] == created["node_ids"][0]
+        assert [(n["tag"], n["position"]) for n in r.json()] == [("S1", 0), ("S2", 1)]
+
+    @pytest.mark.asyncio
+    async def test_t_create_27_bulk_appends_to_existing_parent(self, main_user):
+        """T-CREATE-27: Bulk items under an existing parent follow its current children."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            work_id, ids = await _create_work_and_hierarchy(ac, headers)
+            chapter_id = ids[1]
+            body = {"nodes": [
+                {"parent_id": chapter_id, "node_type": "scene", "tag": f"New {i}"} for i in range(3)
+            ]}
+            r = await ac.post(f"/works/{work_id}/nodes/bulk", json=body, headers=headers)
+            assert r.status_code == 201
+            r = await ac.get(f"/nodes/{chapter_id}/children", headers=headers)
+        assert [n["position"] for n in r.json()] == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_t_create_28_bulk_invalid_hierarchy_writes_nothing(self, work_id, main_user, motor_client):
+        """T-CREATE-28: An invalid item rejects the whole batch with 422."""
+        headers, _ = main_user
+        body = {"nodes": [
+            {"ref": "p1", "node_type": "part", "tag": "P1"},
+            {"ref": "s1", "parent_ref": "p1", "node_type": "scene", "tag": "S1"},
+            {"parent_ref": "s1", "node_type": "chapter", "tag": "Bad"},
+        ]}
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.post(f"/works/{work_id}/nodes/bulk", json=body, headers=headers)
+        assert r.status_code == 422
+        assert r.json()["detail"].startswith("nodes[2]")
+        assert await _count_nodes(motor_client, work_id=work_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_t_create_29_bulk_parent_in_other_work(self, main_user):
+        """T-CREATE-29: parent_id must belong to the target work."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            _, ids = await _create_work_and_hierarchy(ac, headers)
+            r = await _create_work(ac, headers, title="Other")
+            other_work = r.json()["work_id"]
+            body = {"nodes": [{"parent_id": ids[0], "node_type": "chapter", "tag": "Ch"}]}
+            r = await ac.post(f"/works/{other_work}/nodes/bulk", json=body, headers=headers)
+        assert r.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_t_create_30_concurrent_positions_unique(self, work_id, main_user):
+        """T-CREATE-30: Concurrent creates under one parent get distinct positions."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await _create_node(ac, headers, work_id, "part", "P1")
+            part_id = r.json()["node_id"]
+            responses = await asyncio.gather(*(
+                _create_node(ac, headers, work_id, "chapter", f"Ch{i}", parent_id=part_id)
+                for i in range(10)
+            ))
+        assert all(r.status_code == 201 for r in responses)
+        assert sorted(r.json()["position"] for r in responses) == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_t_create_31_list_response_shape(self, work_id, main_user):
+        """T-CREATE-31: List results carry exactly the NodeResponse fields."""
+        headers, _ = main_user
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            await _create_node(ac, headers, work_id, "part", "P1")
+            r = await ac.get(f"/works/{work_id}/nodes", headers=headers)
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/json"
+        node = r.json()["results"][0]
+        assert set(node) == set(api.NodeResponse.model_fields)
+        assert node["created_at"] and node["tags"] == []
+
 
 # ===========================================================================
 # T-48: Node Navigation (23 tests)
@@ -1074,6 +1254,113 @@ class TestNodeNavigation:
             r = await ac.get("/works/not-a-uuid/nodes/root", headers=headers)
         assert r.status_code == 422
 
+    # --- Field projection ---
+
+    @pytest.mark.asyncio
+    async def test_t_nav_28_children_outline(self, work_and_nodes):
+        """T-NAV-28: ?fields=outline returns only the outline fields."""
+        headers, _, ids = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{ids[0]}/children?fields=outline", headers=headers)
+        assert r.status_code == 200
+        assert set(r.json()[0]) == {"node_id", "work_id", "node_type", "parent_id", "position", "tag"}
+
+    @pytest.mark.asyncio
+    async def test_t_nav_29_list_extra_fields(self, work_and_nodes):
+        """T-NAV-29: ?fields=description,tags adds just those fields to each result."""
+        headers, work_id, _ = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/works/{work_id}/nodes?fields=description,tags", headers=headers)
+        assert r.status_code == 200
+        for node in r.json()["results"]:
+            assert "tags" in node and "description" in node
+            assert "text" not in node and "created_at" not in node
+
+    @pytest.mark.asyncio
+    async def test_t_nav_30_unknown_field(self, work_and_nodes):
+        """T-NAV-30: An unknown field name returns 422."""
+        headers, work_id, _ = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/works/{work_id}/nodes/root?fields=account_id", headers=headers)
+        assert r.status_code == 422
+
+    # --- Neighbourhood ---
+
+    @pytest.mark.asyncio
+    async def test_t_nav_31_neighbourhood_all(self, work_and_nodes):
+        """T-NAV-31: GET /nodes/{id}/neighbourhood returns node, parent, children, siblings, ancestors."""
+        headers, _, ids = work_and_nodes
+        part_id, chapter_id, scene_id = ids[0], ids[1], ids[2]
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{chapter_id}/neighbourhood", headers=headers)
+        assert r.status_code == 200
+        body = r.json()
+        assert body["node"]["node_id"] == chapter_id
+        assert body["parent"]["node_id"] == part_id
+        assert [c["node_id"] for c in body["children"]] == [scene_id]
+        assert body["siblings"] == []
+        assert [a["node_id"] for a in body["ancestors"]] == [part_id]
+
+    @pytest.mark.asyncio
+    async def test_t_nav_32_neighbourhood_include(self, work_and_nodes):
+        """T-NAV-32: include= limits the neighbours returned; a root's parent is null."""
+        headers, _, ids = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{ids[0]}/neighbourhood?include=parent", headers=headers)
+            bad = await ac.get(f"/nodes/{ids[0]}/neighbourhood?include=cousins", headers=headers)
+        assert r.status_code == 200
+        assert set(r.json()) == {"node", "parent"}
+        assert r.json()["parent"] is None
+        assert bad.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_t_nav_33_neighbourhood_not_found(self, work_and_nodes, iso_user):
+        """T-NAV-33: Unknown or other account's node returns 404."""
+        headers, _, ids = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{str(uuid.uuid4())}/neighbourhood", headers=headers)
+            other = await ac.get(f"/nodes/{ids[0]}/neighbourhood", headers=iso_user)
+        assert r.status_code == 404
+        assert other.status_code == 404
+
+    # --- Subtree ---
+
+    @pytest.mark.asyncio
+    async def test_t_nav_34_subtree_nested(self, work_and_nodes):
+        """T-NAV-34: GET /nodes/{id}/subtree nests all descendants."""
+        headers, _, ids = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{ids[0]}/subtree", headers=headers)
+        assert r.status_code == 200
+        tree = r.json()
+        assert tree["node_id"] == ids[0]
+        assert tree["children"][0]["node_id"] == ids[1]
+        assert tree["children"][0]["children"][0]["node_id"] == ids[2]
+        assert tree["children"][0]["children"][0]["children"] == []
+
+    @pytest.mark.asyncio
+    async def test_t_nav_35_subtree_depth_and_fields(self, work_and_nodes):
+        """T-NAV-35: depth truncates the tree and fields=outline slims every level."""
+        headers, _, ids = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{ids[0]}/subtree?depth=1&fields=outline", headers=headers)
+            too_deep = await ac.get(f"/nodes/{ids[0]}/subtree?depth=100000", headers=headers)
+        assert r.status_code == 200
+        chapter = r.json()["children"][0]
+        assert chapter["children"] == []
+        assert "text" not in chapter
+        assert too_deep.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_t_nav_36_subtree_not_found(self, work_and_nodes, iso_user):
+        """T-NAV-36: Unknown or other account's node returns 404."""
+        headers, _, ids = work_and_nodes
+        async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
+            r = await ac.get(f"/nodes/{str(uuid.uuid4())}/subtree", headers=headers)
+            other = await ac.get(f"/nodes/{ids[0]}/subtree", headers=iso_user)
+        assert r.status_code == 404
+        assert other.status_code == 404
+
 
 # ===========================================================================
 # T-49: Node Update + Delete (21 tests)
@@ -1850,17 +2137,14 @@ class TestDemoSeed:
     async def test_t_demo_14_transaction_rollback_no_orphans(self, main_user, motor_client):
         """T-DEMO-14: mid-seed OperationFailure → 503; no Work or nodes remain."""
         headers, _ = main_user
-        original_create_node = database.NodeStorage.create_node
-        call_count = 0
+        original_bulk = database.NodeStorage.create_nodes_bulk
 
-        async def failing_create_node(self, account_id, work_doc, data, session=None):
-            nonlocal call_count
-            call_count += 1
-            if call_count >= 3:
-                raise OperationFailure("Simulated node failure", code=100)
-            return await original_create_node(self, account_id, work_doc, data, session=session)
+        async def failing_bulk(self, account_id, work_doc, items, session=None, new_work=False):
+            # Nodes are written, then the seed fails before it can commit.
+            await original_bulk(self, account_id, work_doc, items, session=session, new_work=new_work)
+            raise OperationFailure("Simulated node failure", code=100)
 
-        with patch.object(database.NodeStorage, "create_node", failing_create_node):
+        with patch.object(database.NodeStorage, "create_nodes_bulk", failing_bulk):
             async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
                 r = await ac.post("/demo/seed", headers=headers)
 
@@ -2418,11 +2702,11 @@ class TestWorkReadingOrder:
     # -----------------------------------------------------------------------
 
     async def test_t_reading_order_12_db_error_503(self, work_id, main_user):
-        """AC-12: ConnectionFailure from get_reading_order → 503."""
+        """AC-12: ConnectionFailure from get_reading_order_ids → 503."""
         headers, _ = main_user
         with patch.object(
             database.NodeStorage,
-            "get_reading_order",
+            "get_reading_order_ids",
             new=AsyncMock(side_effect=ConnectionFailure("simulated")),
         ):
             async with httpx.AsyncClient(transport=ASGITransport(app=api.app), base_url="http://test") as ac:
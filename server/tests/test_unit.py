@@ -7,12 +7,14 @@ Covers:
   - Authentication helpers: verify_password, get_password_hash, create_access_token
 """
 
+import asyncio
+import math
 import os
 import uuid
 import pytest
 from datetime import timedelta
 from bson.objectid import ObjectId
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 import motor.motor_asyncio
 
 # Ensure .env is loaded before importing app modules
@@ -35,9 +37,56 @@ from app.models import (
     TAG_MAX_LEN,
     DemoSeedResponse,
     CreateWorkRequest,
+    NodeOutline,
+    NodeTreeResult,
+    NodeTreeResponse,
+    NodeOutlineTree,
 )
+from app import database, export
 from app.database import NodeStorage, is_valid_parent_child
 from app.authentication import Authentication
+from app.cache import LRUCache, WorkTreeCache
+
+
+@pytest.fixture(autouse=True)
+def _empty_work_tree_cache():
+    """Skeletons are cached per process; keep tests independent."""
+    database._work_tree_cache.clear()
+    database._backfilled_works.clear()
+    yield
+    database._work_tree_cache.clear()
+    database._backfilled_works.clear()
+
+
+def _mock_tree(storage, root, descendants):
+    """Serve _get_subtree's reads from memory: the root via find_one, each
+    level via find on parent_id $in, and hydration via find on node_id $in."""
+    docs = ([] if root is None else [root]) + list(descendants)
+    by_id = {d["node_id"]: d for d in docs}
+
+    def project(doc, projection):
+        if not projection:
+            return dict(doc)
+        keep = [k for k, v in projection.items() if v and k != "_id"]
+        return {k: doc[k] for k in keep if k in doc} if keep else dict(doc)
+
+    async def find_one(query, projection=None):
+        doc = by_id.get(query["node_id"])
+        return None if doc is None else project(doc, projection)
+
+    def find(query, projection=None):
+        if "parent_id" in query:
+            parents = set(query["parent_id"]["$in"])
+            found = [d for d in docs if d.get("parent_id") in parents]
+        else:
+            found = [by_id[i] for i in query["node_id"]["$in"] if i in by_id]
+        cursor = AsyncMock()
+        cursor.to_list.return_value = [project(d, projection) for d in found]
+        return cursor
+
+    storage.node_collection.find_one = AsyncMock(side_effect=find_one)
+    storage.node_collection.find = MagicMock(side_effect=find)
+    return storage
 
 
 # ---------------------------------------------------------------------------
@@ -243,6 +292,167 @@ class TestAuthHelpers:
         assert "exp" in payload
 
 
+class TestAuthPasswordExecutor:
+    """bcrypt runs on the executor and is counted while in flight."""
+
+    async def test_async_hash_and_verify_roundtrip(self):
+        auth = Authentication(client=None)
+        hashed = await auth.get_password_hash_async("secret")
+        assert await auth.verify_password_async("secret", hashed)
+        assert not await auth.verify_password_async("wrong", hashed)
+
+    async def test_in_flight_jobs_counted(self, monkeypatch):
+        import threading
+        release = threading.Event()
+        auth = Authentication(client=None)
+        monkeypatch.setattr(auth, "get_password_hash", lambda pw: release.wait(5) and "h")
+        job = asyncio.ensure_future(auth.get_password_hash_async("pw"))
+        await asyncio.sleep(0.05)
+        assert auth.password_executor_stats()["in_flight"] == 1
+        release.set()
+        assert await job == "h"
+        assert auth.password_executor_stats()["in_flight"] == 0
+
+
+class TestAuthRedisPool:
+    """Blacklist calls reuse the lifespan's pooled Redis client."""
+
+    def _pooled_client(self):
+        client = MagicMock()
+        client.get = AsyncMock(return_value="1")
+        client.aclose = AsyncMock()
+        client.connection_pool.max_connections = 50
+        client.connection_pool._in_use_connections = {object()}
+        client.connection_pool._available_connections = [object(), object()]
+        return client
+
+    async def test_pooled_client_reused_and_left_open(self):
+        auth = Authentication(client=None)
+        client = self._pooled_client()
+        auth.set_redis(client)
+        assert await auth.is_token_blacklisted("tok") is True
+        assert await auth.is_token_blacklisted("tok") is True
+        assert client.get.await_count == 2
+        client.aclose.assert_not_called()
+
+    async def test_fresh_client_closed_without_pool(self, monkeypatch):
+        fresh = self._pooled_client()
+        fresh.get = AsyncMock(return_value=None)
+        monkeypatch.setattr("app.authentication.redis.from_url", lambda *a, **kw: fresh)
+        auth = Authentication(client=None)
+        assert await auth.is_token_blacklisted("tok") is False
+        fresh.aclose.assert_awaited_once()
+
+    async def test_ping_uses_pool_and_reports_failure(self):
+        auth = Authentication(client=None)
+        client = self._pooled_client()
+        client.ping = AsyncMock(return_value=True)
+        auth.set_redis(client)
+        assert await auth.ping_redis(timeout=1) is True
+        client.ping = AsyncMock(side_effect=ConnectionError("down"))
+        assert await auth.ping_redis(timeout=1) is False
+        client.aclose.assert_not_called()
+
+    async def test_pool_stats(self):
+        auth = Authentication(client=None)
+        assert auth.redis_pool_stats() is None
+        auth.set_redis(self._pooled_client())
+        assert auth.redis_pool_stats() == {
+            "max_connections": 50,
+            "created_connections": 3,
+            "in_use_connections": 1,
+            "available_connections": 2,
+        }
+
+
+class TestAuthTokenCache:
+    """Verified token -> user cache and its invalidation."""
+
+    def _user(self, account_id="acc-1"):
+        return MagicMock(account_id=account_id)
+
+    def _expires(self, minutes=30):
+        return datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+    def test_cached_user_returned(self):
+        auth = Authentication(client=None)
+        user = self._user()
+        auth.cache_user("tok", user, self._expires())
+        assert auth.get_cached_user("tok") is user
+        assert auth.get_cached_user("other") is None
+
+    def test_expired_token_not_cached(self):
+        auth = Authentication(client=None)
+        auth.cache_user("tok", self._user(), self._expires(minutes=-1))
+        assert auth.get_cached_user("tok") is None
+
+    def test_user_change_invalidates_all_tokens_of_account(self, monkeypatch):
+        auth = Authentication(client=None)
+        monkeypatch.setattr(database, "_user_change_listeners", [auth.invalidate_account])
+        auth.cache_user("t1", self._user("acc-1"), self._expires())
+        auth.cache_user("t2", self._user("acc-1"), self._expires())
+        auth.cache_user("t3", self._user("acc-2"), self._expires())
+        database._notify_user_changed("acc-1")
+        assert auth.get_cached_user("t1") is None
+        assert auth.get_cached_user("t2") is None
+        assert auth.get_cached_user("t3") is not None
+
+    async def test_user_storage_update_notifies(self, monkeypatch):
+        changed = []
+        monkeypatch.setattr(database, "_user_change_listeners", [changed.append])
+        storage = database.UserStorage("user_collection", MagicMock())
+        storage.user_collection.update_one = AsyncMock()
+        storage.user_collection.find_one = AsyncMock(return_value={
+            "_id": ObjectId(),
+            "name": {"firstname": "Test", "surname": "User"},
+            "username": "testuser",
+            "account_id": "acc-9",
+            "email": "test@example.com",
+            "disabled": False,
+            "user_role": "user:reader",
+            "user_type": "premium",
+        })
+        await storage.update_user_type("acc-9", MagicMock(user_type="premium"))
+        assert changed == ["acc-9"]
+
+    def _worker(self):
+        """An Authentication wired to its own bus, as in one API worker."""
+        from app.invalidation import InvalidationBus
+        auth = Authentication(client=None)
+        auth.bus = InvalidationBus()
+        auth.bus.subscribe("token", auth.invalidate_token)
+        return auth
+
+    async def test_blacklisting_drops_cached_token(self):
+        auth = self._worker()
+        client = MagicMock()
+        client.setex = AsyncMock(return_value=True)
+        auth.set_redis(client)
+        token = auth.create_access_token(
+            data={"sub": "acc-1", "scopes": []}, expires_delta=timedelta(minutes=5)
+        )
+        auth.cache_user(token, self._user(), self._expires())
+        assert await auth.add_blacklist_token(token) is True
+        assert auth.get_cached_user(token) is None
+
+    async def test_logout_drops_token_in_other_workers(self):
+        worker_a, worker_b = self._worker(), self._worker()
+        worker_a.bus._loop = asyncio.get_running_loop()
+        worker_a.bus._queue = asyncio.Queue()
+        client = MagicMock()
+        client.setex = AsyncMock(return_value=True)
+        worker_a.set_redis(client)
+        token = worker_a.create_access_token(
+            data={"sub": "acc-1", "scopes": []}, expires_delta=timedelta(minutes=5)
+        )
+        worker_b.cache_user(token, self._user(), self._expires())
+        await worker_a.add_blacklist_token(token)
+        message = worker_a.bus._queue.get_nowait()
+        assert token not in message
+        worker_b.bus.receive(message)
+        assert worker_b.get_cached_user(token) is None
+
+
 # ---------------------------------------------------------------------------
 # Demo seeding tests
 # ---------------------------------------------------------------------------
@@ -546,6 +756,19 @@ class TestNodeStorageGetReadingOrder:
         ids = [n["node_id"] for n in result]
         assert ids == ["part-1", "ch-0", "sc-0", "sc-1", "ch-1"]
 
+    async def test_multiple_roots_read_in_position_order(self):
+        nodes = [
+            self._make_node("part-2", None, 2),
+            self._make_node("part-0", None, 0),
+            self._make_node("ch-2", "part-2", 0, node_type="chapter"),
+            self._make_node("part-1", None, 1),
+            self._make_node("ch-0", "part-0", 0, node_type="chapter"),
+        ]
+        storage = self._storage_with_nodes(nodes)
+        result = await storage.get_reading_order("w-1", "a-1")
+        ids = [n["node_id"] for n in result]
+        assert ids == ["part-0", "ch-0", "part-1", "part-2", "ch-2"]
+
     async def test_children_sorted_by_position(self):
         n_root  = self._make_node("root", None, 0)
         n_child_a = self._make_node("c-a", "root", 2, node_type="chapter")
@@ -579,6 +802,75 @@ class TestNodeStorageGetReadingOrder:
             assert "_id" not in node
 
 
+class TestNodeStorageReadingOrderIds:
+    """Tests for the id-only, version-cached reading order engine."""
+
+    def _storage_with_skeleton(self, nodes: list[dict]) -> NodeStorage:
+        storage = NodeStorage(MagicMock())
+        cursor = AsyncMock()
+        cursor.to_list.return_value = nodes
+        storage.node_collection.find = MagicMock(return_value=cursor)
+        return storage
+
+    _SKELETON = [
+        {"node_id": "ch-1", "parent_id": "part-1", "position": 1},
+        {"node_id": "part-1", "parent_id": None, "position": 0},
+        {"node_id": "ch-0", "parent_id": "part-1", "position": 0},
+    ]
+
+    async def test_order_and_index_from_projection(self):
+        storage = self._storage_with_skeleton(self._SKELETON)
+        order, index = await storage.get_reading_order_ids("w-1", "a-1", version=0)
+        assert order == ["part-1", "ch-0", "ch-1"]
+        assert index == {"part-1": 0, "ch-0": 1, "ch-1": 2}
+        projection = storage.node_collection.find.call_args.args[1]
+        assert "text" not in projection and projection["node_id"] == 1
+
+    async def test_same_version_served_from_cache(self):
+        storage = self._storage_with_skeleton(self._SKELETON)
+        await storage.get_reading_order_ids("w-1", "a-1", version=3)
+        await storage.get_reading_order_ids("w-1", "a-1", version=3)
+        storage.node_collection.find.assert_called_once()
+
+    async def test_new_version_recomputes(self):
+        storage = self._storage_with_skeleton(self._SKELETON)
+        await storage.get_reading_order_ids("w-1", "a-1", version=3)
+        await storage.get_reading_order_ids("w-1", "a-1", version=4)
+        assert storage.node_collection.find.call_count == 2
+
+    async def test_hydration_preserves_requested_order(self):
+        storage = self._storage_with_skeleton([
+            {"node_id": "b", "tag": "B"}, {"node_id": "a", "tag": "A"},
+        ])
+        docs = await storage.get_nodes_by_ids(["a", "gone", "b"], "a-1")
+        assert [d["node_id"] for d in docs] == ["a", "b"]
+        query = storage.node_collection.find.call_args.args[0]
+        assert query["node_id"] == {"$in": ["a", "gone", "b"]}
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        now[0] = 109.0
+        assert cache.get("a") == 1
+        now[0] = 111.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
 # ---------------------------------------------------------------------------
 # E-112: DB-level `beat` rejection test (CP 30)
 # ---------------------------------------------------------------------------
@@ -686,28 +978,29 @@ class TestHierarchyValidator:
 # ---------------------------------------------------------------------------
 
 class TestNodeStorageWouldCreateCycle:
-    """Tests for NodeStorage.would_create_cycle() using mocked DB."""
-
-    def _mock_motor_client(self):
-        mongo_client = MagicMock()
-        db = MagicMock()
-        collection = MagicMock()
-        mongo_client.__getitem__ = lambda self, name: db
-        db.__getitem__ = lambda self, name: collection
-        return mongo_client, collection
-
-    def _make_storage(self):
-        mongo_client, collection = self._mock_motor_client()
-        storage = NodeStorage(client=mongo_client)
-        storage.node_collection = collection
+    """Tests for NodeStorage.would_create_cycle() using a mocked $graphLookup."""
+
+    def _make_storage(self, new_parent_id=None, chain=None):
+        """Mock aggregate() so new_parent_id resolves to the ancestor ids in
+        chain (nearest first); the last one is a root. None = parent missing."""
+        storage = NodeStorage(MagicMock())
+        docs = []
+        if new_parent_id is not None:
+            ids = [new_parent_id, *(chain or [])]
+            parents = [*ids[1:], None]
+            ancestors = [
+                {"node_id": nid, "parent_id": pid, "_depth": depth}
+                for depth, (nid, pid) in enumerate(zip(ids[1:], parents[1:]))
+            ]
+            docs = [{"node_id": ids[0], "parent_id": parents[0], "_ancestors": ancestors}]
+        cursor = AsyncMock()
+        cursor.to_list.return_value = docs
+        storage.node_collection.aggregate = MagicMock(return_value=cursor)
         return storage
 
     async def test_direct_cycle_returns_true(self):
         """Reparent A under B when B is child of A -> cycle detected."""
-        storage = self._make_storage()
-        storage.node_collection.find_one = AsyncMock(
-            return_value={"parent_id": "node-A"}
-        )
+        storage = self._make_storage("node-B", ["node-A"])
         result = await storage.would_create_cycle(
             node_id="node-A", new_parent_id="node-B", account_id="acc1",
         )
@@ -715,30 +1008,16 @@ class TestNodeStorageWouldCreateCycle:
 
     async def test_indirect_cycle_returns_true(self):
         """Chain A->B->C->D: reparenting A under D creates indirect cycle."""
-        storage = self._make_storage()
-        storage.node_collection.find_one = AsyncMock(
-            side_effect=[
-                {"parent_id": "node-B"},
-                {"parent_id": "node-C"},
-                {"parent_id": "node-D"},
-                {"parent_id": "node-A"},
-            ]
-        )
+        storage = self._make_storage("node-E", ["node-B", "node-C", "node-D", "node-A"])
         result = await storage.would_create_cycle(
             node_id="node-A", new_parent_id="node-E", account_id="acc1",
         )
         assert result is True
+        storage.node_collection.aggregate.assert_called_once()
 
     async def test_no_cycle_returns_false(self):
         """Unrelated subtree -> no cycle."""
-        storage = self._make_storage()
-        storage.node_collection.find_one = AsyncMock(
-            side_effect=[
-                {"parent_id": "node-B"},
-                {"parent_id": "node-C"},
-                {"parent_id": None},
-            ]
-        )
+        storage = self._make_storage("node-X", ["node-B", "node-C"])
         result = await storage.would_create_cycle(
             node_id="node-A", new_parent_id="node-X", account_id="acc1",
         )
@@ -746,10 +1025,7 @@ class TestNodeStorageWouldCreateCycle:
 
     async def test_no_cycle_unrelated_subtree_returns_false(self):
         """Node with entirely separate ancestry -> no cycle."""
-        storage = self._make_storage()
-        storage.node_collection.find_one = AsyncMock(
-            return_value={"parent_id": None}
-        )
+        storage = self._make_storage("node-Z", [])
         result = await storage.would_create_cycle(
             node_id="node-A", new_parent_id="node-Z", account_id="acc1",
         )
@@ -758,12 +1034,62 @@ class TestNodeStorageWouldCreateCycle:
     async def test_node_not_in_collection_breaks_search(self):
         """If node not found, walk ends and returns False (no cycle)."""
         storage = self._make_storage()
-        storage.node_collection.find_one = AsyncMock(return_value=None)
         result = await storage.would_create_cycle(
             node_id="node-A", new_parent_id="node-Q", account_id="acc1",
         )
         assert result is False
 
+    async def test_self_parent_returns_true_without_query(self):
+        storage = self._make_storage()
+        result = await storage.would_create_cycle(
+            node_id="node-A", new_parent_id="node-A", account_id="acc1",
+        )
+        assert result is True
+        storage.node_collection.aggregate.assert_not_called()
+
+    async def test_existing_loop_above_parent_returns_true(self):
+        """Corrupt data B->C->B: report a cycle rather than accept the reparent."""
+        storage = self._make_storage("node-B", ["node-C"])
+        storage.node_collection.aggregate.return_value.to_list.return_value[0][
+            "_ancestors"][0]["parent_id"] = "node-B"
+        result = await storage.would_create_cycle(
+            node_id="node-A", new_parent_id="node-B", account_id="acc1",
+        )
+        assert result is True
+
+    async def test_materialized_parent_needs_no_query(self):
+        storage = self._make_storage()
+        parent = {"node_id": "node-D", "ancestors": ["node-R", "node-A"]}
+        assert await storage.would_create_cycle(
+            node_id="node-A", new_parent_id="node-D", account_id="acc1", parent_doc=parent,
+        ) is True
+        assert await storage.would_create_cycle(
+            node_id="node-X", new_parent_id="node-D", account_id="acc1", parent_doc=parent,
+        ) is False
+        storage.node_collection.aggregate.assert_not_called()
+
+    async def test_unmaterialized_parent_walks_up_from_its_parent(self):
+        """Chain A->C->D: the supplied parent D is not re-read; the lookup starts at C."""
+        storage = self._make_storage("node-C", ["node-A"])
+        parent = {"node_id": "node-D", "parent_id": "node-C"}
+        assert await storage.would_create_cycle(
+            node_id="node-A", new_parent_id="node-D", account_id="acc1", parent_doc=parent,
+        ) is True
+        pipeline = storage.node_collection.aggregate.call_args.args[0]
+        assert pipeline[0]["$match"]["node_id"] == "node-C"
+
+    async def test_unmaterialized_parent_near_root_needs_no_query(self):
+        storage = self._make_storage()
+        assert await storage.would_create_cycle(
+            node_id="node-A", new_parent_id="node-R", account_id="acc1",
+            parent_doc={"node_id": "node-R", "parent_id": None},
+        ) is False
+        assert await storage.would_create_cycle(
+            node_id="node-A", new_parent_id="node-B", account_id="acc1",
+            parent_doc={"node_id": "node-B", "parent_id": "node-A"},
+        ) is True
+        storage.node_collection.aggregate.assert_not_called()
+
 
 # ---------------------------------------------------------------------------
 # Sibling renumbering — NodeStorage.reorder_siblings  (migrated from Phase 10)
@@ -792,9 +1118,17 @@ class TestNodeStorageReorderSiblings:
     def _make_storage(self):
         client = MagicMock()
         storage = NodeStorage(client)
-        storage.node_collection.update_one = AsyncMock()
+        storage.node_collection.bulk_write = AsyncMock()
+        storage.work_collection.update_one = AsyncMock()
         return storage
 
+    def _written_positions(self, storage):
+        """Return {node_id: position} for every UpdateOne sent via bulk_write."""
+        if not storage.node_collection.bulk_write.called:
+            return {}
+        requests = storage.node_collection.bulk_write.call_args.args[0]
+        return {r._filter["node_id"]: r._doc["$set"]["position"] for r in requests}
+
     async def test_insert_at_end_clamped(self):
         """Position > max index clamps to end of list."""
         storage = self._make_storage()
@@ -861,6 +1195,37 @@ class TestNodeStorageReorderSiblings:
         )
         assert result is not None
         assert result["node_id"] == "A"
+        storage.node_collection.bulk_write.assert_not_called()
+
+    async def test_only_changed_range_written(self):
+        """Moving D from 3 to 1 rewrites B, C and D only, in one ordered bulk_write."""
+        storage = self._make_storage()
+        storage.get_node = AsyncMock(return_value=self._node("D", 3))
+        cursor = AsyncMock()
+        cursor.to_list.return_value = [
+            self._node("A", 0), self._node("B", 1), self._node("C", 2),
+            self._node("D", 3), self._node("E", 4),
+        ]
+        storage.node_collection.find = MagicMock(return_value=cursor)
+        result = await storage.reorder_siblings(
+            node_id="D", account_id="a-1", new_position=1,
+        )
+        assert result["position"] == 1
+        assert self._written_positions(storage) == {"D": 1, "B": 2, "C": 3}
+        storage.node_collection.bulk_write.assert_awaited_once()
+        assert storage.node_collection.bulk_write.call_args.kwargs["ordered"] is True
+
+    async def test_gaps_are_closed(self):
+        """Non-contiguous positions left by deletes are renumbered."""
+        storage = self._make_storage()
+        storage.get_node = AsyncMock(return_value=self._node("A", 0))
+        cursor = AsyncMock()
+        cursor.to_list.return_value = [
+            self._node("A", 0), self._node("B", 4), self._node("C", 9),
+        ]
+        storage.node_collection.find = MagicMock(return_value=cursor)
+        await storage.reorder_siblings(node_id="A", account_id="a-1", new_position=0)
+        assert self._written_positions(storage) == {"B": 1, "C": 2}
 
 
 # ---------------------------------------------------------------------------
@@ -878,6 +1243,7 @@ class TestNodeStorageDuplicate:
         db.__getitem__ = lambda self, name: collection
         storage = NodeStorage(client=mongo_client)
         storage.node_collection = collection
+        storage.work_collection.update_one = AsyncMock()
         return storage
 
     def _make_node(self, node_id, node_type, position, tag,
@@ -931,13 +1297,7 @@ class TestNodeStorageDuplicate:
         """duplicate_deep root copy is at original.position + 1 with ' (copy)' suffix."""
         storage = self._make_storage()
         source = self._make_node("node-A", "chapter", 0, "Chapter One")
-        storage.get_node = AsyncMock(return_value=source)
-        storage.node_collection.find = MagicMock()
-        cursor = AsyncMock()
-        cursor.to_list.return_value = []
-        storage.node_collection.find.return_value = cursor
-        storage.node_collection.update_many = AsyncMock()
-        storage.node_collection.insert_one = AsyncMock()
+        self._mock_subtree(storage, source, [])
         result = await storage.duplicate_deep(
             node_id="node-A", account_id="acc1",
         )
@@ -946,6 +1306,65 @@ class TestNodeStorageDuplicate:
         assert result["tag"] == "Chapter One (copy)"
         assert result["node_id"] != "node-A"
 
+    async def test_deep_duplicate_remaps_subtree_in_batches(self, monkeypatch):
+        """Descendant copies point at copied parents, keep tags, and are chunked."""
+        import app.database as database
+        monkeypatch.setattr(database, "BULK_BATCH_SIZE", 2)
+        storage = self._make_storage()
+        source = self._make_node("node-A", "part", 0, "Part One")
+        descendants = [
+            self._make_node("sc-2", "scene", 5, "Scene Two", parent_id="ch-1"),
+            self._make_node("ch-1", "chapter", 0, "Chapter One", parent_id="node-A"),
+            self._make_node("sc-1", "scene", 2, "Scene One", parent_id="ch-1"),
+        ]
+        self._mock_subtree(storage, source, descendants)
+        root = await storage.duplicate_deep(node_id="node-A", account_id="acc1")
+
+        batches = [c.args[0] for c in storage.node_collection.insert_many.call_args_list]
+        assert [len(b) for b in batches] == [2, 2]
+        copies = [doc for batch in batches for doc in batch]
+        by_tag = {doc["tag"]: doc for doc in copies}
+        assert by_tag["Part One (copy)"]["node_id"] == root["node_id"]
+        assert by_tag["Chapter One"]["parent_id"] == root["node_id"]
+        assert by_tag["Scene One"]["parent_id"] == by_tag["Chapter One"]["node_id"]
+        assert by_tag["Scene One"]["position"] == 0
+        assert by_tag["Scene Two"]["position"] == 1
+        source_ids = {"node-A", "ch-1", "sc-1", "sc-2"}
+        assert not source_ids & {doc["node_id"] for doc in copies}
+        # Levels are walked with projected finds; text only comes from hydration.
+        finds = [c.args for c in storage.node_collection.find.call_args_list]
+        levels = [p for q, p in finds if "parent_id" in q]
+        assert len(levels) == 3
+        assert all("text" not in p for p in levels)
+        assert len(finds) - len(levels) == 2
+
+    async def test_deep_duplicate_skips_nodes_deleted_meanwhile(self):
+        """A descendant gone by hydration time is skipped along with its subtree."""
+        storage = self._make_storage()
+        source = self._make_node("node-A", "part", 0, "Part One")
+        self._mock_subtree(storage, source, [
+            self._make_node("ch-1", "chapter", 0, "Chapter One", parent_id="node-A"),
+            self._make_node("sc-1", "scene", 0, "Scene One", parent_id="ch-1"),
+        ])
+        levels = storage.node_collection.find.side_effect
+
+        def find(query, projection=None):
+            if "parent_id" in query:
+                return levels(query, projection)
+            return AsyncMock(to_list=AsyncMock(return_value=[]))
+
+        storage.node_collection.find = MagicMock(side_effect=find)
+        await storage.duplicate_deep(node_id="node-A", account_id="acc1")
+        copies = storage.node_collection.insert_many.call_args.args[0]
+        assert [doc["tag"] for doc in copies] == ["Part One (copy)"]
+
+    def _mock_subtree(self, storage, root, descendants):
+        """Structure from level finds; full documents from batched finds."""
+        storage.get_node = AsyncMock(return_value=root)
+        _mock_tree(storage, root, descendants)
+        storage.node_collection.update_many = AsyncMock()
+        storage.node_collection.insert_many = AsyncMock()
+
     async def test_scene_shallow_duplicate_permitted(self):
         """Scene nodes can be shallow-duplicated (returns copy)."""
         storage = self._make_storage()
@@ -972,6 +1391,9 @@ class TestNodeStorageAuthorPropagation:
         storage = NodeStorage(client)
         storage.node_collection.find_one = AsyncMock(return_value=None)
         storage.node_collection.insert_one = AsyncMock()
+        storage.work_collection.update_one = AsyncMock()
+        storage.counter_collection = MagicMock()
+        storage.counter_collection.find_one_and_update = AsyncMock(return_value={"next": 1})
         return storage
 
     async def test_non_null_author_propagates_to_node(self):
@@ -995,3 +1417,1439 @@ class TestNodeStorageAuthorPropagation:
         assert result["author"] is None
 
 
+
+# ---------------------------------------------------------------------------
+# Ancestor chain — NodeStorage.get_node_with_ancestors ($graphLookup)
+# ---------------------------------------------------------------------------
+
+class TestNodeStorageAncestors:
+    """Tests for the single-round-trip ancestor engine using a mocked aggregate()."""
+
+    def _doc(self, node_id, parent_id, depth=None):
+        doc = {"_id": ObjectId(), "node_id": node_id, "parent_id": parent_id,
+               "account_id": "a-1", "work_id": "w-1"}
+        if depth is not None:
+            doc["_depth"] = depth
+        return doc
+
+    def _storage_with_result(self, docs: list[dict]) -> NodeStorage:
+        storage = NodeStorage(MagicMock())
+        cursor = AsyncMock()
+        cursor.to_list.return_value = docs
+        storage.node_collection.aggregate = MagicMock(return_value=cursor)
+        return storage
+
+    async def test_ancestors_ordered_root_first(self):
+        node = self._doc("scene", "chapter")
+        node["_ancestors"] = [
+            self._doc("chapter", "part", depth=0),
+            self._doc("root", None, depth=2),
+            self._doc("part", "root", depth=1),
+        ]
+        storage = self._storage_with_result([node])
+        found, ancestors = await storage.get_node_with_ancestors("scene", "a-1")
+        assert found["node_id"] == "scene"
+        assert [a["node_id"] for a in ancestors] == ["root", "part", "chapter"]
+
+    async def test_internal_fields_stripped(self):
+        node = self._doc("scene", "chapter")
+        node["_ancestors"] = [self._doc("chapter", None, depth=0)]
+        storage = self._storage_with_result([node])
+        found, ancestors = await storage.get_node_with_ancestors("scene", "a-1")
+        assert "_id" not in found and "_ancestors" not in found
+        assert "_id" not in ancestors[0] and "_depth" not in ancestors[0]
+
+    async def test_not_found_returns_none(self):
+        storage = self._storage_with_result([])
+        found, ancestors = await storage.get_node_with_ancestors("missing", "a-1")
+        assert found is None
+        assert ancestors == []
+
+    async def test_get_parent_limits_lookup_to_one_level(self):
+        node = self._doc("scene", "chapter")
+        node["_ancestors"] = [self._doc("chapter", "part", depth=0)]
+        storage = self._storage_with_result([node])
+        parent = await storage.get_parent("scene", "a-1")
+        assert parent["node_id"] == "chapter"
+        pipeline = storage.node_collection.aggregate.call_args.args[0]
+        assert pipeline[1]["$graphLookup"]["maxDepth"] == 0
+
+    async def test_get_parent_of_root_is_none(self):
+        node = self._doc("root", None)
+        node["_ancestors"] = []
+        storage = self._storage_with_result([node])
+        assert await storage.get_parent("root", "a-1") is None
+
+
+# ---------------------------------------------------------------------------
+# Nested subtree — NodeStorage.get_nested_subtree
+# ---------------------------------------------------------------------------
+
+class TestNodeStorageNestedSubtree:
+    """Nesting of the level-by-level subtree read and the depth limits."""
+
+    def _doc(self, node_id, parent_id, position, depth=None):
+        doc = {"node_id": node_id, "parent_id": parent_id, "position": position,
+               "work_id": "w-1", "account_id": "a-1"}
+        if depth is not None:
+            doc["_depth"] = depth
+        return doc
+
+    def _storage(self, root, descendants):
+        storage = NodeStorage(MagicMock())
+        return _mock_tree(storage, root, descendants)
+
+    async def test_nests_children_by_position(self):
+        storage = self._storage(self._doc("p", None, 0), [
+            self._doc("s1", "c1", 0, depth=1),
+            self._doc("c2", "p", 1, depth=0),
+            self._doc("c1", "p", 0, depth=0),
+        ])
+        tree, nodes = await storage.get_nested_subtree("p", "a-1")
+        assert [c["node_id"] for c in tree["children"]] == ["c1", "c2"]
+        assert [s["node_id"] for s in tree["children"][0]["children"]] == ["s1"]
+        assert tree["children"][1]["children"] == []
+        assert len(nodes) == 4 and all("_depth" not in n for n in nodes)
+
+    async def test_depth_maps_to_levels(self):
+        storage = self._storage(self._doc("p", None, 0), [
+            self._doc("c1", "p", 0), self._doc("s1", "c1", 0), self._doc("x1", "s1", 0),
+        ])
+        _, nodes = await storage.get_nested_subtree("p", "a-1", depth=2, fields=["text"])
+        assert {n["node_id"] for n in nodes} == {"p", "c1", "s1"}
+        root_projection = storage.node_collection.find_one.call_args.args[1]
+        assert "text" in root_projection and "position" in root_projection
+        # Descendant text is read through batched finds, not the level walk.
+        finds = [c.args for c in storage.node_collection.find.call_args_list]
+        levels = [p for q, p in finds if "parent_id" in q]
+        assert len(levels) == 2
+        assert all("text" not in p for p in levels)
+
+    async def test_full_documents_hydrated_in_batches(self, monkeypatch):
+        monkeypatch.setattr(database, "BULK_BATCH_SIZE", 2)
+        storage = self._storage(self._doc("p", None, 0), [
+            self._doc("c1", "p", 0),
+            self._doc("c2", "p", 1),
+            self._doc("s1", "c1", 0),
+        ])
+        tree, nodes = await storage.get_nested_subtree("p", "a-1")
+        finds = [c.args for c in storage.node_collection.find.call_args_list]
+        levels = [p for q, p in finds if "parent_id" in q]
+        assert all(set(p) == {"_id", "node_id", "parent_id", "position"} for p in levels)
+        assert len(finds) - len(levels) == 2
+        assert [s["node_id"] for s in tree["children"][0]["children"]] == ["s1"]
+        assert len(nodes) == 4
+
+    async def test_depth_zero_reads_node_only(self):
+        storage = self._storage(self._doc("p", None, 0), [])
+        storage.node_collection.find_one = AsyncMock(return_value=self._doc("p", None, 0))
+        tree, _ = await storage.get_nested_subtree("p", "a-1", depth=0)
+        assert tree["children"] == []
+        storage.node_collection.find.assert_not_called()
+
+    async def test_unbounded_subtree_too_deep_raises(self):
+        chain = [self._doc(f"n{i}", f"n{i - 1}" if i else "p", 0)
+                 for i in range(database.MAX_TREE_DEPTH + 1)]
+        storage = self._storage(self._doc("p", None, 0), chain)
+        with pytest.raises(database.TreeDepthLimitExceeded):
+            await storage.get_nested_subtree("p", "a-1")
+
+
+class TestNodeTreeResult:
+    """The subtree response model covers both full and `fields` reads."""
+
+    _NODE = {
+        "node_id": "n", "work_id": "w", "node_type": "part", "position": 0, "tag": "P",
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "updated_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+
+    def test_full_tree_stays_full(self):
+        tree = {**self._NODE, "text": "body", "children": [{**self._NODE, "node_id": "c"}]}
+        result = TypeAdapter(NodeTreeResult).validate_python(tree)
+        assert type(result) is NodeTreeResponse
+        assert type(result.children[0]) is NodeTreeResponse
+
+    def test_outline_schema_advertised(self):
+        schema = TypeAdapter(NodeTreeResult).json_schema()
+        refs = {option["$ref"].rsplit("/", 1)[-1] for option in schema["anyOf"]}
+        assert refs == {NodeTreeResponse.__name__, NodeOutlineTree.__name__}
+
+
+# ---------------------------------------------------------------------------
+# Cascade delete — NodeStorage.delete_node_cascade (level walk + batches)
+# ---------------------------------------------------------------------------
+
+class TestNodeStorageDeleteCascade:
+    """Tests for subtree collection and batched deletion using mocked DB."""
+
+    def _storage(self, root, descendants):
+        storage = _mock_tree(NodeStorage(MagicMock()), root, descendants)
+        storage.node_collection.delete_many = AsyncMock(
+            side_effect=lambda query: MagicMock(deleted_count=len(query["node_id"]["$in"]))
+        )
+        storage.work_collection.update_one = AsyncMock()
+        storage.counter_collection = MagicMock()
+        storage.counter_collection.delete_many = AsyncMock()
+        return storage
+
+    async def test_not_found_returns_false(self):
+        storage = self._storage(None, [])
+        assert await storage.delete_node_cascade("x", "a-1") == (False, 0)
+        storage.node_collection.delete_many.assert_not_called()
+
+    async def test_leaf_node_deletes_only_itself(self):
+        storage = self._storage({"node_id": "leaf", "parent_id": "p", "work_id": "w-1"}, [])
+        assert await storage.delete_node_cascade("leaf", "a-1") == (True, 0)
+        storage.node_collection.delete_many.assert_called_once()
+
+    async def test_concurrently_deleted_node_never_reports_negative(self):
+        storage = self._storage({"node_id": "leaf", "parent_id": "p", "work_id": "w-1"}, [])
+        storage.node_collection.delete_many = AsyncMock(return_value=MagicMock(deleted_count=0))
+        assert await storage.delete_node_cascade("leaf", "a-1") == (True, 0)
+
+    async def test_descendants_deleted_deepest_first_in_batches(self, monkeypatch):
+        monkeypatch.setattr(database, "BULK_BATCH_SIZE", 2)
+        descendants = [
+            {"node_id": "ch", "parent_id": "root"},
+            {"node_id": "sc2", "parent_id": "ch"},
+            {"node_id": "ch2", "parent_id": "root"},
+            {"node_id": "sc1", "parent_id": "ch"},
+        ]
+        storage = self._storage(
+            {"node_id": "root", "parent_id": None, "work_id": "w-1"}, descendants
+        )
+        found, deleted = await storage.delete_node_cascade("root", "a-1")
+        assert (found, deleted) == (True, 4)
+        storage.work_collection.update_one.assert_awaited_once()
+        batches = [c.args[0]["node_id"]["$in"] for c in storage.node_collection.delete_many.call_args_list]
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert set(batches[0]) == {"sc1", "sc2"}
+        assert batches[-1] == ["root"]
+        counters = [c.args[0]["_id"]["$in"] for c in storage.counter_collection.delete_many.call_args_list]
+        assert counters[-1] == ["a-1:root"]
+        assert sorted(i for ids in counters for i in ids) == sorted(
+            f"a-1:{n}" for n in ("root", "ch", "ch2", "sc1", "sc2")
+        )
+
+
+# ---------------------------------------------------------------------------
+# Work stats — NodeStorage.get_stats (single projected fetch)
+# ---------------------------------------------------------------------------
+
+class TestNodeStorageGetStats:
+
+    def _storage_with_nodes(self, nodes: list[dict]) -> NodeStorage:
+        storage = NodeStorage(MagicMock())
+        cursor = AsyncMock()
+        cursor.to_list.return_value = nodes
+        storage.node_collection.find = MagicMock(return_value=cursor)
+        storage.work_collection.find_one = AsyncMock(return_value={"version": 0})
+        return storage
+
+    def _n(self, node_id, parent_id, node_type):
+        return {"node_id": node_id, "parent_id": parent_id, "node_type": node_type, "position": 0}
+
+    async def test_empty_work(self):
+        storage = self._storage_with_nodes([])
+        stats = await storage.get_stats("w-1", "a-1")
+        assert stats == {
+            "work_id": "w-1", "total_nodes": 0,
+            "by_type": {"part": 0, "chapter": 0, "scene": 0}, "max_depth": 0,
+        }
+
+    async def test_counts_and_depth_single_query(self):
+        nodes = [
+            self._n("p1", None, "part"),
+            self._n("c1", "p1", "chapter"),
+            self._n("s1", "c1", "scene"),
+            self._n("p2", None, "part"),
+            self._n("s2", "p2", "scene"),
+        ]
+        storage = self._storage_with_nodes(nodes)
+        stats = await storage.get_stats("w-1", "a-1")
+        assert stats["by_type"] == {"part": 2, "chapter": 1, "scene": 2}
+        assert stats["total_nodes"] == 5
+        assert stats["max_depth"] == 2
+        storage.node_collection.find.assert_called_once()
+
+    async def test_depth_covers_roots_beyond_first_page(self):
+        """Every root is seeded, not just the first 50."""
+        nodes = [self._n(f"p{i}", None, "part") for i in range(60)]
+        nodes += [self._n("c", "p59", "chapter"), self._n("s", "c", "scene")]
+        storage = self._storage_with_nodes(nodes)
+        stats = await storage.get_stats("w-1", "a-1")
+        assert stats["max_depth"] == 2
+
+    async def test_cycle_does_not_loop(self):
+        nodes = [
+            self._n("p1", None, "part"),
+            self._n("c1", "p1", "chapter"),
+            self._n("p1", "c1", "part"),
+        ]
+        storage = self._storage_with_nodes(nodes)
+        stats = await storage.get_stats("w-1", "a-1")
+        assert stats["max_depth"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Materialized ancestors — create/update/duplicate, subtree find, backfill
+# ---------------------------------------------------------------------------
+
+class TestNodeStorageMaterializedAncestors:
+    """Tests for the `ancestors`/`depth` fields maintained on node documents."""
+
+    _WORK = {"work_id": "w-1", "account_id": "a-1", "author": None, "title": "Test"}
+
+    def _make_storage(self):
+        storage = NodeStorage(MagicMock())
+        storage.node_collection.find_one = AsyncMock(return_value=None)
+        storage.node_collection.insert_one = AsyncMock()
+        storage.node_collection.update_many = AsyncMock()
+        storage.work_collection.update_one = AsyncMock()
+        storage.counter_collection = MagicMock()
+        storage.counter_collection.find_one_and_update = AsyncMock(return_value={"next": 1})
+        return storage
+
+    async def test_root_created_with_empty_ancestors(self):
+        storage = self._make_storage()
+        data = {"work_id": "w-1", "node_type": "part", "parent_id": None, "tag": "Root"}
+        result = await storage.create_node("a-1", self._WORK, data)
+        assert result["ancestors"] == []
+        assert result["depth"] == 0
+
+    async def test_child_extends_supplied_parent_lineage(self):
+        storage = self._make_storage()
+        parent = {"node_id": "c1", "ancestors": ["p1"]}
+        data = {"work_id": "w-1", "node_type": "scene", "parent_id": "c1", "tag": "S"}
+        result = await storage.create_node("a-1", self._WORK, data, parent_doc=parent)
+        assert result["ancestors"] == ["p1", "c1"]
+        assert result["depth"] == 2
+        # Position comes from the counter and the supplied parent is not re-fetched.
+        storage.node_collection.find_one.assert_not_awaited()
+
+    async def test_child_of_unbackfilled_parent_has_no_lineage(self):
+        storage = self._make_storage()
+        parent = {"node_id": "c1"}
+        data = {"work_id": "w-1", "node_type": "scene", "parent_id": "c1", "tag": "S"}
+        result = await storage.create_node("a-1", self._WORK, data, parent_doc=parent)
+        assert "ancestors" not in result
+        assert "depth" not in result
+
+    async def test_reparent_sets_lineage_and_relinks_subtree(self):
+        storage = self._make_storage()
+        storage.node_collection.find_one = AsyncMock(return_value={"work_id": "w-1"})
+        storage.node_collection.find_one_and_update = AsyncMock(
+            return_value={"node_id": "c1", "node_type": "chapter", "work_id": "w-1"}
+        )
+        parent = {"node_id": "p2", "ancestors": []}
+        await storage.update_node("c1", "a-1", {"parent_id": "p2"}, parent_doc=parent)
+        update = storage.node_collection.find_one_and_update.call_args.args[1]
+        assert update["$set"]["ancestors"] == ["p2"]
+        assert update["$set"]["depth"] == 1
+        flt, pipeline = storage.node_collection.update_many.call_args.args
+        assert flt == {"account_id": "a-1", "ancestors": "c1"}
+        prefix = pipeline[0]["$set"]["ancestors"]["$concatArrays"][0]
+        assert prefix == {"$literal": ["p2"]}
+
+    async def test_reparent_under_unbackfilled_parent_strips_lineage(self):
+        storage = self._make_storage()
+        storage.node_collection.find_one = AsyncMock(return_value={"work_id": "w-1"})
+        storage.node_collection.find_one_and_update = AsyncMock(
+            return_value={"node_id": "c1", "node_type": "chapter", "work_id": "w-1"}
+        )
+        await storage.update_node("c1", "a-1", {"parent_id": "p2"}, parent_doc={"node_id": "p2"})
+        update = storage.node_collection.find_one_and_update.call_args.args[1]
+        assert update["$unset"] == {"ancestors": "", "depth": ""}
+        _, relink = storage.node_collection.update_many.call_args.args
+        assert relink == {"$unset": {"ancestors": "", "depth": ""}}
+
+    async def test_scene_reparent_skips_relink(self):
+        storage = self._make_storage()
+        storage.node_collection.find_one = AsyncMock(return_value={"work_id": "w-1"})
+        storage.node_collection.find_one_and_update = AsyncMock(
+            return_value={"node_id": "s1", "node_type": "scene", "work_id": "w-1"}
+        )
+        parent = {"node_id": "c2", "ancestors": ["p1"]}
+        await storage.update_node("s1", "a-1", {"parent_id": "c2"}, parent_doc=parent)
+        storage.node_collection.find_one_and_update.assert_awaited_once()
+        storage.node_collection.update_many.assert_not_called()
+
+    async def test_reparent_seeds_counter_with_node_work(self):
+        # A parent_doc without work_id must not leave a counter stamped None.
+        storage = self._make_storage()
+        storage.node_collection.find_one = AsyncMock(return_value={"work_id": "w-1"})
+        storage.counter_collection.find_one_and_update = AsyncMock(side_effect=[None, {"next": 3}])
+        storage._seed_position_counter = AsyncMock()
+        storage.node_collection.find_one_and_update = AsyncMock(
+            return_value={"node_id": "s1", "node_type": "scene", "work_id": "w-1"}
+        )
+        await storage.update_node("s1", "a-1", {"parent_id": "c2"}, parent_doc={"node_id": "c2"})
+        assert storage._seed_position_counter.call_args.args[:4] == ("a-1:c2", "a-1", "w-1", "c2")
+
+    async def test_reparent_uses_supplied_node_work(self):
+        storage = self._make_storage()
+        storage.node_collection.find_one_and_update = AsyncMock(
+            return_value={"node_id": "p1", "node_type": "part", "work_id": "w-1"}
+        )
+        await storage.update_node(
+            "p1", "a-1", {"parent_id": None}, node_doc={"node_id": "p1", "work_id": "w-1"},
+        )
+        storage.node_collection.find_one.assert_not_awaited()
+        counter_filter = storage.counter_collection.find_one_and_update.call_args.args[0]
+        assert counter_filter == {"_id": "a-1:root:w-1"}
+
+    async def test_materialized_subtree_single_find(self, monkeypatch):
+        monkeypatch.setattr(database, "MATERIALIZED_ANCESTORS", True)
+        storage = self._make_storage()
+        docs = [
+            {"node_id": "c1", "parent_id": "p1", "work_id": "w-1", "ancestors": ["p1"]},
+            {"node_id": "s1", "parent_id": "c1", "work_id": "w-1", "ancestors": ["p1", "c1"]},
+            {"node_id": "x1", "parent_id": "c1", "work_id": "w-2", "ancestors": ["p1", "c1"]},
+        ]
+        cursor = AsyncMock()
+        cursor.to_list.return_value = docs
+        storage.node_collection.find = MagicMock(return_value=cursor)
+        storage.work_collection = MagicMock()
+        storage.work_collection.find_one = AsyncMock(return_value={"ancestors_backfilled": True})
+        root, descendants = await storage._get_subtree("c1", "a-1", fields=["node_id"])
+        assert root["node_id"] == "c1"
+        assert [(d["node_id"], d["_depth"]) for d in descendants] == [("s1", 0)]
+        storage.node_collection.find.assert_called_once()
+        # The flag never reverts, so the next read skips the Work lookup.
+        await storage._get_subtree("c1", "a-1", fields=["node_id"])
+        storage.work_collection.find_one.assert_awaited_once()
+
+    async def test_materialized_subtree_falls_back_until_work_backfilled(self, monkeypatch):
+        # A reparented node gains ancestors that its pre-backfill children
+        # lack; only the level walk still finds them.
+        monkeypatch.setattr(database, "MATERIALIZED_ANCESTORS", True)
+        storage = self._make_storage()
+        cursor = AsyncMock()
+        cursor.to_list.return_value = [
+            {"node_id": "c1", "parent_id": "p2", "work_id": "w-1", "ancestors": ["p2"]},
+        ]
+        storage.node_collection.find = MagicMock(return_value=cursor)
+        storage.work_collection = MagicMock()
+        storage.work_collection.find_one = AsyncMock(return_value={"work_id": "w-1"})
+        assert await storage._get_subtree_materialized("c1", "a-1", None, None) is None
+        assert database._backfilled_works.get("w-1") is None
+
+    def test_backfill_lineage_computed_in_memory(self):
+        docs = [
+            {"node_id": "p1", "parent_id": None, "position": 0},
+            {"node_id": "c1", "parent_id": "p1", "position": 0},
+            {"node_id": "s1", "parent_id": "c1", "position": 0},
+            {"node_id": "orphan", "parent_id": "gone", "position": 0},
+        ]
+        assert database._materialize_ancestors(docs) == {
+            "p1": [], "c1": ["p1"], "s1": ["p1", "c1"],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Prometheus instrumentation — app.metrics
+# ---------------------------------------------------------------------------
+
+class TestPrometheusMetrics:
+
+    def test_counter_renders_labelled_samples(self):
+        from app.metrics import Counter
+        c = Counter("reqs_total", "Requests.", ("route", "status"))
+        c.inc(route="/works/{work_id}", status="200")
+        c.inc(route="/works/{work_id}", status="200")
+        lines = c.render()
+        assert lines[:2] == ["# HELP reqs_total Requests.", "# TYPE reqs_total counter"]
+        assert 'reqs_total{route="/works/{work_id}",status="200"} 2' in lines
+
+    def test_histogram_buckets_are_cumulative(self):
+        from app.metrics import Histogram
+        h = Histogram("lat_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v, route="r")
+        lines = h.render()
+        assert 'lat_seconds_bucket{route="r",le="0.1"} 2' in lines
+        assert 'lat_seconds_bucket{route="r",le="1"} 3' in lines
+        assert 'lat_seconds_bucket{route="r",le="+Inf"} 4' in lines
+        assert 'lat_seconds_count{route="r"} 4' in lines
+        assert 'lat_seconds_sum{route="r"} 3.65' in lines
+
+    def test_gauge_moves_both_ways_counter_only_up(self):
+        from app.metrics import Counter, Gauge
+        g = Gauge("jobs", "Jobs.", ("state",))
+        g.set(3, state="queued")
+        g.dec(state="queued")
+        assert g.render()[1:] == ["# TYPE jobs gauge", 'jobs{state="queued"} 2']
+        with pytest.raises(ValueError):
+            Counter("c_total", "C.").inc(-1)
+
+    def test_metric_base_is_abstract(self):
+        from app.metrics import _Metric
+        with pytest.raises(TypeError):
+            _Metric("m", "M.")
+
+    def test_pool_listener_records_checkout_wait(self):
+        from app import metrics
+        before = metrics.MONGO_CHECKOUT_WAIT.count()
+        in_use = metrics.MONGO_CONNECTIONS_IN_USE.value()
+        listener = metrics.MongoPoolMetrics()
+        listener.connection_checked_out(MagicMock(duration=0.002))
+        assert metrics.MONGO_CHECKOUT_WAIT.count() == before + 1
+        assert metrics.MONGO_CONNECTIONS_IN_USE.value() == in_use + 1
+        listener.connection_checked_in(MagicMock())
+        assert metrics.MONGO_CONNECTIONS_IN_USE.value() == in_use
+
+    def test_command_listener_labels_outcome(self):
+        from app import metrics
+        listener = metrics.MongoCommandMetrics()
+        listener.failed(MagicMock(duration_micros=1500, command_name="find"))
+        assert metrics.MONGO_COMMANDS.count(command="find", outcome="error") >= 1
+
+
+# ---------------------------------------------------------------------------
+# Work tree cache — app.cache.WorkTreeCache and cached navigation
+# ---------------------------------------------------------------------------
+
+class TestWorkTreeCache:
+
+    _DOCS = [
+        {"node_id": "p1", "parent_id": None, "position": 0, "node_type": "part"},
+        {"node_id": "c2", "parent_id": "p1", "position": 1, "node_type": "chapter"},
+        {"node_id": "c1", "parent_id": "p1", "position": 0, "node_type": "chapter"},
+        {"node_id": "s1", "parent_id": "c1", "position": 0, "node_type": "scene"},
+    ]
+
+    def test_skeleton_navigation(self):
+        cache = WorkTreeCache(max_bytes=10**6)
+        skeleton = cache.put("a-1", "w-1", 0, self._DOCS)
+        assert skeleton.children_of("p1") == ["c1", "c2"]
+        assert skeleton.siblings_of("c2") == ["c1"]
+        assert skeleton.ancestors_of("s1") == ["p1", "c1"]
+        assert skeleton.ancestors_of("p1") == []
+
+    def test_version_mismatch_is_a_miss(self):
+        cache = WorkTreeCache(max_bytes=10**6)
+        cache.put("a-1", "w-1", 3, self._DOCS)
+        assert cache.get("a-1", "w-1", 3) is not None
+        assert cache.get("a-1", "w-1", 4) is None
+        assert cache.find_by_node("a-1", "s1") is None
+
+    def test_evicts_least_recent_work_over_budget(self):
+        from app.cache import WorkSkeleton
+        cache = WorkTreeCache(max_bytes=WorkSkeleton.NODE_BYTES * 6)
+        cache.put("a-1", "w-1", 0, self._DOCS)
+        cache.put("a-1", "w-2", 0, self._DOCS[:2])
+        cache.get("a-1", "w-1")
+        cache.put("a-1", "w-3", 0, self._DOCS[:2])
+        assert cache.get("a-1", "w-2") is None
+        assert cache.get("a-1", "w-1") is not None
+        assert cache.bytes <= cache.max_bytes
+
+    def test_invalidate_clears_node_index(self):
+        cache = WorkTreeCache(max_bytes=10**6)
+        cache.put("a-1", "w-1", 0, self._DOCS)
+        assert cache.find_by_node("a-1", "c1").work_id == "w-1"
+        cache.invalidate("a-1", "w-1")
+        assert cache.find_by_node("a-1", "c1") is None
+        assert cache.bytes == 0
+
+    def test_load_invalidated_while_reading_is_not_cached(self):
+        cache = WorkTreeCache(max_bytes=10**6)
+        load = cache.begin_load("a-1", "w-1")
+        cache.invalidate("a-1", "w-1")   # a write lands mid-load
+        skeleton = cache.put("a-1", "w-1", 0, self._DOCS, load)
+        cache.end_load(load)
+        assert skeleton.children_of("p1") == ["c1", "c2"]
+        assert cache.find_by_node("a-1", "c1") is None
+        # The next load, started after the write, is cached.
+        load = cache.begin_load("a-1", "w-1")
+        cache.put("a-1", "w-1", 1, self._DOCS, load)
+        cache.end_load(load)
+        assert cache.find_by_node("a-1", "c1") is not None
+        assert not cache._loads
+
+
+class TestNodeStorageCachedNavigation:
+    """Navigation reads served from the skeleton plus one $in hydration."""
+
+    _SKELETON = TestWorkTreeCache._DOCS
+
+    def _storage(self) -> NodeStorage:
+        storage = NodeStorage(MagicMock())
+
+        def find(query, projection=None, **kw):
+            cursor = AsyncMock()
+            ids = query.get("node_id", {}).get("$in") if isinstance(query.get("node_id"), dict) else None
+            if ids is not None:
+                cursor.to_list.return_value = [
+                    {"node_id": i, "tag": i.upper()} for i in ids if i != "gone"
+                ]
+            else:
+                cursor.to_list.return_value = [dict(d) for d in self._SKELETON]
+            return cursor
+
+        storage.node_collection.find = MagicMock(side_effect=find)
+        # node_collection and work_collection are the same MagicMock here.
+        storage.node_collection.find_one = AsyncMock(return_value={"work_id": "w-1", "version": 0})
+        storage.work_collection.update_one = AsyncMock()
+        return storage
+
+    async def test_children_cold_then_warm(self):
+        storage = self._storage()
+        node, children = await storage.get_node_with_children("p1", "a-1")
+        assert node["node_id"] == "p1"
+        assert [c["node_id"] for c in children] == ["c1", "c2"]
+        storage.node_collection.find.reset_mock()
+        storage.node_collection.find_one.reset_mock()
+        await storage.get_node_with_children("p1", "a-1")
+        # Warm: no lookups, just the single $in hydration.
+        storage.node_collection.find_one.assert_not_called()
+        storage.node_collection.find.assert_called_once()
+
+    async def test_lineage_and_parent(self):
+        storage = self._storage()
+        node, ancestors = await storage.get_node_lineage("s1", "a-1")
+        assert [a["node_id"] for a in ancestors] == ["p1", "c1"]
+        _, parent = await storage.get_node_lineage("s1", "a-1", max_depth=0)
+        assert [p["node_id"] for p in parent] == ["c1"]
+
+    async def test_siblings_exclude_self(self):
+        storage = self._storage()
+        node, siblings = await storage.get_node_with_siblings("c2", "a-1")
+        assert [s["node_id"] for s in siblings] == ["c1"]
+
+    async def test_unknown_node(self):
+        storage = self._storage()
+        storage.node_collection.find_one = AsyncMock(return_value=None)
+        assert await storage.get_node_with_children("nope", "a-1") == (None, [])
+
+    async def test_write_invalidates_skeleton(self):
+        storage = self._storage()
+        await storage.get_node_with_children("p1", "a-1")
+        assert database._work_tree_cache.find_by_node("a-1", "p1") is not None
+        await storage._touch_work("w-1", "a-1")
+        assert database._work_tree_cache.find_by_node("a-1", "p1") is None
+
+    async def test_node_missing_from_fresh_skeleton_reloads(self):
+        # Another worker created s1 and its invalidation has not arrived.
+        database._work_tree_cache.put("a-1", "w-1", 0, self._SKELETON[:3])
+        storage = self._storage()
+        node, children = await storage.get_node_with_children("s1", "a-1")
+        assert node["node_id"] == "s1" and children == []
+        assert "s1" in database._work_tree_cache.get("a-1", "w-1").nodes
+
+    async def test_oversized_work_reads_neighbourhood_only(self, monkeypatch):
+        monkeypatch.setattr(database, "_work_tree_cache", WorkTreeCache(max_bytes=1))
+        storage = self._storage()
+        await storage.get_node_with_children("c1", "a-1")
+        assert database._work_tree_cache.oversized("a-1", "w-1")
+        cursor = AsyncMock()
+        cursor.to_list.return_value = [{
+            "node_id": "c1", "parent_id": "p1", "work_id": "w-1", "position": 0,
+            "node_type": "chapter", "text": "body",
+            "_ancestors": [{"node_id": "p1", "parent_id": None, "position": 0,
+                            "node_type": "part", "_depth": 0}],
+        }]
+        storage.node_collection.aggregate = MagicMock(return_value=cursor)
+        storage.node_collection.find.reset_mock()
+        result = await storage.get_node_neighbourhood("c1", "a-1")
+        queries = [c.args[0] for c in storage.node_collection.find.call_args_list]
+        assert queries[0] == {"account_id": "a-1", "$or": [{"parent_id": "c1"}, {"parent_id": "p1"}]}
+        assert all("work_id" not in q for q in queries)  # never the whole Work
+        assert result["parent"]["node_id"] == "p1"
+        assert [d["node_id"] for d in result["ancestors"]] == ["p1"]
+
+    async def test_invalidation_follows_version_bump(self):
+        storage = self._storage()
+        await storage.get_node_with_children("p1", "a-1")
+        cached_during_bump = []
+        storage.work_collection.update_one = AsyncMock(side_effect=lambda *a, **k: cached_during_bump.append(
+            database._work_tree_cache.find_by_node("a-1", "p1") is not None
+        ))
+        await storage._touch_work("w-1", "a-1")
+        assert cached_during_bump == [True]
+        assert database._work_tree_cache.find_by_node("a-1", "p1") is None
+
+    async def test_neighbourhood_single_hydration(self):
+        storage = self._storage()
+        await storage.get_node_with_children("p1", "a-1")  # warm the skeleton
+        storage.node_collection.find.reset_mock()
+        result = await storage.get_node_neighbourhood("c1", "a-1")
+        storage.node_collection.find.assert_called_once()
+        assert result["node"]["node_id"] == "c1"
+        assert result["parent"]["node_id"] == "p1"
+        assert [d["node_id"] for d in result["siblings"]] == ["c2"]
+        assert [d["node_id"] for d in result["ancestors"]] == ["p1"]
+        assert [d["node_id"] for d in result["children"]] == ["s1"]
+
+    async def test_neighbourhood_include_subset(self):
+        storage = self._storage()
+        result = await storage.get_node_neighbourhood("p1", "a-1", include=("parent",))
+        assert result == {"node": {"node_id": "p1", "tag": "P1"}, "parent": None}
+
+    async def test_projected_children_push_down_projection(self):
+        storage = self._storage()
+        await storage.get_node_with_children("p1", "a-1", fields=["description"])
+        projection = storage.node_collection.find.call_args.args[1]
+        assert projection["description"] == 1 and projection["tag"] == 1
+        assert "text" not in projection and projection["_id"] == 0
+
+    def test_outline_model_omits_unfetched_fields(self):
+        doc = {"node_id": "n", "work_id": "w", "node_type": "scene",
+               "parent_id": "c", "position": 0, "tag": "S", "tags": []}
+        dumped = NodeOutline.model_validate(doc).model_dump(mode="json", exclude_unset=True)
+        assert dumped == doc
+
+
+# ---------------------------------------------------------------------------
+# Invalidation bus — app.invalidation.InvalidationBus
+# ---------------------------------------------------------------------------
+
+class _FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def get_message(self, timeout=0.0):
+        if self.messages:
+            return {"type": "message", "data": self.messages.pop(0)}
+        await asyncio.sleep(timeout)
+        return None
+
+    async def aclose(self):
+        pass
+
+
+class TestInvalidationBus:
+
+    def _bus(self):
+        from app.invalidation import InvalidationBus
+        return InvalidationBus(channel="test:invalidate")
+
+    def _message(self, kind, origin="peer", **payload):
+        import json
+        return json.dumps({"origin": origin, "kind": kind, "payload": payload})
+
+    def test_publish_applies_locally_without_redis(self):
+        bus = self._bus()
+        seen = []
+        bus.subscribe("work", seen.append)
+        bus.publish("work", account_id="a-1", work_id="w-1")
+        assert seen == [{"account_id": "a-1", "work_id": "w-1"}]
+
+    def test_receive_ignores_own_messages(self):
+        bus = self._bus()
+        seen = []
+        bus.subscribe("work", seen.append)
+        bus.receive(self._message("work", origin=bus.origin, work_id="w-1"))
+        bus.receive(self._message("work", work_id="w-2"))
+        bus.receive("not json")
+        assert seen == [{"work_id": "w-2"}]
+
+    def test_failing_handler_does_not_block_others(self):
+        bus = self._bus()
+        seen = []
+        bus.subscribe("account", lambda payload: 1 / 0)
+        bus.subscribe("account", seen.append)
+        bus.publish("account", account_id="a-1")
+        assert seen == [{"account_id": "a-1"}]
+
+    async def test_started_bus_publishes_listens_and_resets(self):
+        bus = self._bus()
+        seen, resets = [], []
+        bus.subscribe("work", seen.append)
+        bus.on_reset(lambda: resets.append(True))
+        client = MagicMock()
+        client.pubsub.return_value = _FakePubSub([self._message("work", work_id="remote")])
+        client.publish = AsyncMock()
+        await bus.start(client)
+        bus.publish("work", work_id="local")
+        for _ in range(20):
+            await asyncio.sleep(0)
+        await bus.stop()
+        assert {"work_id": "remote"} in seen and {"work_id": "local"} in seen
+        channel, sent = client.publish.await_args.args
+        assert channel == "test:invalidate" and '"local"' in sent
+        # Subscribing and unsubscribing both reset the local caches.
+        assert len(resets) == 2
+
+    def test_remote_work_message_drops_cached_skeleton(self):
+        from app.invalidation import invalidation_bus
+        database._work_tree_cache.put("a-1", "w-1", 0, TestWorkTreeCache._DOCS)
+        invalidation_bus.receive(self._message("work", account_id="a-1", work_id="w-1"))
+        assert database._work_tree_cache.get("a-1", "w-1") is None
+
+    def test_remote_work_message_spoils_load_in_flight(self):
+        from app.invalidation import invalidation_bus
+        load = database._work_tree_cache.begin_load("a-1", "w-1")
+        invalidation_bus.receive(self._message("work", account_id="a-1", work_id="w-1"))
+        database._work_tree_cache.put("a-1", "w-1", 0, TestWorkTreeCache._DOCS, load)
+        database._work_tree_cache.end_load(load)
+        assert database._work_tree_cache.get("a-1", "w-1") is None
+
+    def test_transaction_defers_invalidation_until_flushed(self):
+        database._work_tree_cache.put("a-1", "w-1", 0, TestWorkTreeCache._DOCS)
+        session = MagicMock(in_transaction=True)
+        database._invalidate_work("a-1", "w-1", session)
+        assert database._work_tree_cache.get("a-1", "w-1") is not None
+        database._flush_invalidations(session)
+        assert database._work_tree_cache.get("a-1", "w-1") is None
+
+    def test_remote_account_message_runs_user_listeners(self, monkeypatch):
+        from app.invalidation import invalidation_bus
+        changed = []
+        monkeypatch.setattr(database, "_user_change_listeners", [changed.append])
+        invalidation_bus.receive(self._message("account", account_id="acc-7"))
+        assert changed == ["acc-7"]
+
+
+# ---------------------------------------------------------------------------
+# Bulk node creation — app.database._plan_bulk_nodes / create_nodes_bulk
+# ---------------------------------------------------------------------------
+
+class TestPlanBulkNodes:
+
+    _WORK = {"work_id": "w-1", "author": "Ann"}
+
+    def _plan(self, items, existing=None):
+        flat = database._flatten_bulk_items(items)
+        return database._plan_bulk_nodes(
+            flat, self._WORK, "a-1", existing or {}, datetime.now(timezone.utc),
+        )
+
+    def test_nested_and_ref_items_get_lineage_and_positions(self):
+        docs = self._plan([
+            {"ref": "p", "node_type": "part", "tag": "P", "children": [
+                {"ref": "c", "node_type": "chapter", "tag": "C"},
+            ]},
+            {"parent_ref": "c", "node_type": "scene", "tag": "S1"},
+            {"parent_ref": "c", "node_type": "scene", "tag": "S2"},
+        ])
+        part, chapter, s1, s2 = docs
+        assert (part["parent_id"], part["position"], part["depth"]) == (None, 0, 0)
+        assert chapter["parent_id"] == part["node_id"]
+        assert s2["ancestors"] == [part["node_id"], chapter["node_id"]]
+        assert [s1["position"], s2["position"]] == [0, 1]
+        assert all(d["author"] == "Ann" and d["work_id"] == "w-1" for d in docs)
+
+    def test_existing_parent_lineage(self):
+        existing = {"ch": {"node_id": "ch", "node_type": "chapter", "ancestors": ["pt"]}}
+        docs = self._plan(
+            [{"parent_id": "ch", "node_type": "scene", "tag": "S"}], existing=existing,
+        )
+        assert docs[0]["parent_id"] == "ch"
+        assert docs[0]["ancestors"] == ["pt", "ch"]
+
+    @pytest.mark.parametrize("items, message", [
+        ([{"node_type": "chapter", "tag": "C"}], "only 'part'"),
+        ([{"ref": "s", "node_type": "part", "tag": "P", "children": [
+            {"node_type": "scene", "tag": "S", "children": [{"node_type": "scene", "tag": "X"}]},
+        ]}], "cannot be a child of a scene"),
+        ([{"ref": "a", "node_type": "part", "tag": "A"}, {"ref": "a", "node_type": "part", "tag": "B"}],
+         "duplicate ref"),
+        ([{"parent_ref": "nope", "node_type": "part", "tag": "A"}], "unknown parent_ref"),
+        ([{"parent_id": "missing", "node_type": "part", "tag": "A"}], "not found"),
+        ([{"ref": "a", "parent_ref": "b", "node_type": "part", "tag": "A"},
+          {"ref": "b", "parent_ref": "a", "node_type": "part", "tag": "B"}], "cycle"),
+    ])
+    def test_invalid_batches(self, items, message):
+        with pytest.raises(database.InvalidBulkNodes, match=message):
+            self._plan(items)
+
+    def test_duplicate_client_node_id(self):
+        node_id = str(uuid.uuid4())
+        with pytest.raises(database.InvalidBulkNodes, match="duplicate node_id"):
+            self._plan([
+                {"node_id": node_id, "node_type": "part", "tag": "A"},
+                {"node_id": node_id, "node_type": "part", "tag": "B"},
+            ])
+
+
+class TestNodeStorageCreateNodesBulk:
+
+    def _storage(self, parents=(), counter_next=0):
+        storage = NodeStorage(MagicMock())
+        find_cursor = AsyncMock()
+        find_cursor.to_list.return_value = list(parents)
+        storage.node_collection.find = MagicMock(return_value=find_cursor)
+        storage.node_collection.insert_many = AsyncMock()
+        storage.node_collection.delete_many = AsyncMock()
+        storage.work_collection.update_one = AsyncMock()
+        storage.counter_collection = MagicMock()
+
+        async def bump(query, update, **kw):
+            return {"_id": query["_id"], "next": counter_next + update["$inc"]["next"]}
+
+        storage.counter_collection.find_one_and_update = AsyncMock(side_effect=bump)
+        return storage
+
+    async def test_inserts_in_batches(self, monkeypatch):
+        monkeypatch.setattr(database, "BULK_BATCH_SIZE", 2)
+        storage = self._storage(counter_next=2)
+        items = [{"ref": f"p{i}", "node_type": "part", "tag": f"P{i}"} for i in range(5)]
+        docs, refs = await storage.create_nodes_bulk("a-1", {"work_id": "w-1"}, items)
+        assert storage.node_collection.insert_many.await_count == 3
+        assert [d["position"] for d in docs] == [2, 3, 4, 5, 6]
+        assert refs["p4"] == docs[4]["node_id"]
+        # One allocation for the whole run of roots; no parent lookup.
+        storage.counter_collection.find_one_and_update.assert_awaited_once()
+        storage.node_collection.find.assert_not_called()
+        storage.work_collection.update_one.assert_awaited_once()
+
+    async def test_existing_parent_positions_from_counter(self):
+        parent = {"node_id": "ch", "node_type": "chapter", "ancestors": ["pt"]}
+        storage = self._storage(parents=[parent], counter_next=7)
+        items = [
+            {"ref": "s1", "parent_id": "ch", "node_type": "scene", "tag": "S1"},
+            {"parent_id": "ch", "node_type": "scene", "tag": "S2"},
+        ]
+        docs, _ = await storage.create_nodes_bulk("a-1", {"work_id": "w-1"}, items)
+        assert [d["position"] for d in docs] == [7, 8]
+        counter_query = storage.counter_collection.find_one_and_update.await_args.args[0]
+        assert counter_query == {"_id": "a-1:ch"}
+
+    async def test_invalid_batch_writes_nothing(self):
+        storage = self._storage()
+        with pytest.raises(database.InvalidBulkNodes):
+            await storage.create_nodes_bulk(
+                "a-1", {"work_id": "w-1"}, [{"node_type": "scene", "tag": "S"}]
+            )
+        storage.node_collection.insert_many.assert_not_awaited()
+
+    async def test_failed_insert_removes_partial_batch(self):
+        from pymongo.errors import ConnectionFailure
+        storage = self._storage()
+        storage.node_collection.insert_many = AsyncMock(side_effect=ConnectionFailure("down"))
+        with pytest.raises(ConnectionFailure):
+            await storage.create_nodes_bulk(
+                "a-1", {"work_id": "w-1"}, [{"node_type": "part", "tag": "P"}]
+            )
+        storage.node_collection.delete_many.assert_awaited_once()
+
+    async def test_duplicate_node_id_raises_duplicate_key(self):
+        from pymongo.errors import BulkWriteError, DuplicateKeyError
+        storage = self._storage()
+        storage.node_collection.insert_many = AsyncMock(side_effect=BulkWriteError({
+            "writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}],
+            "nInserted": 0,
+        }))
+        with pytest.raises(DuplicateKeyError):
+            await storage.create_nodes_bulk(
+                "a-1", {"work_id": "w-1"},
+                [{"node_id": str(uuid.uuid4()), "node_type": "part", "tag": "P"}],
+            )
+        storage.node_collection.delete_many.assert_awaited_once()
+
+    async def test_other_bulk_write_errors_propagate(self):
+        from pymongo.errors import BulkWriteError, DuplicateKeyError
+        storage = self._storage()
+        error = BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "invalid"}]})
+        storage.node_collection.insert_many = AsyncMock(side_effect=error)
+        with pytest.raises(BulkWriteError) as raised:
+            await storage.create_nodes_bulk("a-1", {"work_id": "w-1"}, [{"node_type": "part", "tag": "P"}])
+        assert not isinstance(raised.value, DuplicateKeyError)
+
+
+# ---------------------------------------------------------------------------
+# Demo seeding — app.database.DemoStorage batched path
+# ---------------------------------------------------------------------------
+
+class TestDemoStorageBatched:
+
+    def _demo_storage(self):
+        node_storage = NodeStorage(MagicMock())
+        node_storage.node_collection.find = MagicMock()
+        node_storage.node_collection.aggregate = MagicMock()
+        node_storage.node_collection.insert_many = AsyncMock()
+        node_storage.work_collection.update_one = AsyncMock()
+        work_storage = database.WorkStorage(MagicMock())
+        return database.DemoStorage(MagicMock(), work_storage, node_storage)
+
+    async def test_seed_nodes_is_one_insert(self):
+        from app.demo import build_demo_tree
+        demo = self._demo_storage()
+        work_data, node_list = build_demo_tree("a-1", "Ann")
+        summary = await demo._seed_nodes("a-1", {"work_id": "w-1", "author": "Ann"}, work_data, node_list)
+
+        collection = demo.node_storage.node_collection
+        collection.insert_many.assert_awaited_once()
+        collection.find.assert_not_called()
+        collection.aggregate.assert_not_called()
+        docs = collection.insert_many.await_args.args[0]
+        assert summary["total_nodes"] == len(node_list) == len(docs)
+        # node_ids, parents and sibling order come straight from build_demo_tree.
+        assert [d["node_id"] for d in docs] == [n.node_id for n in node_list]
+        assert [d["parent_id"] for d in docs] == [n.parent_id for n in node_list]
+        for parent_id, group in database._group_by_parent(docs).items():
+            assert [d["position"] for d in group] == list(range(len(group)))
+        assert all(d["work_id"] == "w-1" for d in docs)
+
+    async def test_delete_demo_works_uses_tag_query(self):
+        demo = self._demo_storage()
+        works = demo.work_storage
+        cursor = AsyncMock()
+        cursor.to_list.return_value = [{"work_id": "w-1"}, {"work_id": "w-2"}]
+        works.work_collection.find = MagicMock(return_value=cursor)
+        works.work_collection.delete_many = AsyncMock(return_value=MagicMock(deleted_count=2))
+        works.node_collection.delete_many = works.work_collection.delete_many
+
+        assert await demo.delete_demo_works("a-1") == 2
+        query = works.work_collection.find.call_args.args[0]
+        assert query == {"account_id": "a-1", "tags": "demo"}
+        # Works, their nodes and their position counters.
+        assert works.work_collection.delete_many.await_count == 3
+
+    async def test_delete_demo_works_none(self):
+        demo = self._demo_storage()
+        works = demo.work_storage
+        cursor = AsyncMock()
+        cursor.to_list.return_value = []
+        works.work_collection.find = MagicMock(return_value=cursor)
+        works.work_collection.delete_many = AsyncMock()
+        assert await demo.delete_demo_works("a-1") == 0
+        works.work_collection.delete_many.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Position allocation — NodeStorage._allocate_positions
+# ---------------------------------------------------------------------------
+
+class _FakeCounters:
+    """In-memory stand-in for the position_counters collection; each call
+    yields to the loop first so concurrent allocations interleave."""
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+
+    async def find_one_and_update(self, query, update, **kw):
+        await asyncio.sleep(0)
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            return None
+        doc["next"] += update["$inc"]["next"]
+        return dict(doc)
+
+    async def update_one(self, query, update, upsert=False, **kw):
+        await asyncio.sleep(0)
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            if not upsert:
+                return
+            doc = self.docs[query["_id"]] = {"next": 0, **update.get("$setOnInsert", {})}
+        if "$max" in update:
+            doc["next"] = max(doc["next"], update["$max"]["next"])
+        if "$inc" in update:
+            doc["next"] += update["$inc"]["next"]
+
+
+class TestNodeStoragePositionAllocation:
+
+    def _storage(self, latest=None):
+        storage = NodeStorage(MagicMock())
+        storage.counter_collection = _FakeCounters()
+        storage.node_collection.find_one = AsyncMock(return_value=latest)
+        return storage
+
+    async def test_missing_counter_is_seeded_from_max_sibling(self):
+        storage = self._storage(latest={"position": 4})
+        assert await storage._allocate_positions("a-1", "w-1", "ch") == 5
+        assert await storage._allocate_positions("a-1", "w-1", "ch") == 6
+        # Seeding reads the siblings once; later allocations only bump the counter.
+        storage.node_collection.find_one.assert_awaited_once()
+
+    async def test_root_counter_is_per_work(self):
+        storage = self._storage()
+        assert await storage._allocate_positions("a-1", "w-1", None) == 0
+        assert await storage._allocate_positions("a-1", "w-2", None) == 0
+        assert storage.counter_collection.docs["a-1:root:w-1"]["work_id"] == "w-1"
+
+    async def test_range_allocation(self):
+        storage = self._storage()
+        assert await storage._allocate_positions("a-1", "w-1", "ch", count=3) == 0
+        assert await storage._allocate_positions("a-1", "w-1", "ch") == 3
+
+    async def test_concurrent_allocations_are_unique(self):
+        storage = self._storage(latest={"position": 1})
+        positions = await asyncio.gather(
+            *(storage._allocate_positions("a-1", "w-1", "ch") for _ in range(20))
+        )
+        assert sorted(positions) == list(range(2, 22))
+
+    async def test_duplicate_shifts_counter(self):
+        storage = self._storage()
+        storage.counter_collection.docs["a-1:ch"] = {"next": 3, "work_id": "w-1"}
+        storage.node_collection.find_one = AsyncMock(return_value={
+            "node_id": "s1", "work_id": "w-1", "account_id": "a-1", "parent_id": "ch",
+            "position": 0, "node_type": "scene", "tag": "S",
+        })
+        storage.node_collection.update_many = AsyncMock()
+        storage.node_collection.insert_one = AsyncMock()
+        storage.work_collection.update_one = AsyncMock()
+        await storage.duplicate_shallow("s1", "a-1")
+        assert await storage._allocate_positions("a-1", "w-1", "ch") == 4
+
+
+class TestNodeStorageOrderKeys:
+    """ORDER_KEYS: sparse sibling keys, single-document moves, rank exposure."""
+
+    @pytest.fixture(autouse=True)
+    def _order_keys(self, monkeypatch):
+        monkeypatch.setattr(database, "ORDER_KEYS", True)
+
+    def _node(self, node_id, position):
+        return {
+            "node_id": node_id, "work_id": "w-1", "account_id": "a-1",
+            "parent_id": "ch", "position": position, "node_type": "scene", "tag": node_id,
+        }
+
+    def _storage(self, siblings):
+        storage = NodeStorage(MagicMock())
+        storage.counter_collection = _FakeCounters()
+
+        def find(query, projection=None, **kw):
+            cursor = AsyncMock()
+            cursor.to_list.return_value = [dict(s) for s in siblings]
+            return cursor
+
+        storage.node_collection.find = MagicMock(side_effect=find)
+        storage.node_collection.update_one = AsyncMock()
+        storage.node_collection.bulk_write = AsyncMock(
+            side_effect=lambda requests, **kw: MagicMock(modified_count=len(requests))
+        )
+        return storage
+
+    def _node_writes(self, storage):
+        return [
+            c.args for c in storage.node_collection.update_one.call_args_list
+            if "node_id" in c.args[0]
+        ]
+
+    def test_key_between(self):
+        assert database._key_between(1024, 2048) == 1536
+        assert database._key_between(None, 1024) == 512
+        assert database._key_between(None, 0) is None
+        assert database._key_between(1.0, math.nextafter(1.0, 2.0)) is None
+
+    async def test_reorder_writes_only_moved_node(self):
+        siblings = [self._node("A", 1024), self._node("B", 2048), self._node("C", 3072)]
+        storage = self._storage(siblings)
+        storage.get_node = AsyncMock(return_value=dict(siblings[2]))
+        result = await storage.reorder_siblings("C", "a-1", 1)
+        assert result["position"] == 1
+        assert self._node_writes(storage) == [
+            ({"node_id": "C", "account_id": "a-1"}, {"$set": {"position": 1536}})
+        ]
+        storage.node_collection.bulk_write.assert_not_called()
+
+    async def test_reorder_to_same_slot_writes_nothing(self):
+        siblings = [self._node("A", 1024), self._node("B", 2048)]
+        storage = self._storage(siblings)
+        storage.get_node = AsyncMock(return_value=dict(siblings[1]))
+        result = await storage.reorder_siblings("B", "a-1", 5)
+        assert result["position"] == 1
+        storage.node_collection.update_one.assert_not_called()
+
+    async def test_exhausted_gap_rebalances_then_moves(self):
+        # Contiguous integer positions leave no key in front of A.
+        siblings = [self._node("A", 0), self._node("B", 1), self._node("C", 2)]
+        storage = self._storage(siblings)
+        storage.get_node = AsyncMock(return_value=dict(siblings[2]))
+        await storage.reorder_siblings("C", "a-1", 0)
+        requests = storage.node_collection.bulk_write.call_args.args[0]
+        assert {r._filter["node_id"]: r._doc["$set"]["position"] for r in requests} == {
+            "A": 1024, "B": 2048, "C": 3072,
+        }
+        assert self._node_writes(storage)[-1][1] == {"$set": {"position": 512}}
+        # Appends continue after the respaced keys.
+        assert storage.counter_collection.docs["a-1:ch"]["next"] == 4096
+
+    async def test_duplicate_takes_key_after_source(self):
+        storage = self._storage([])
+        source = self._node("A", 1024)
+        storage.get_node = AsyncMock(return_value=dict(source))
+        storage.node_collection.find_one = AsyncMock(return_value={"node_id": "B", "position": 2048})
+        storage.node_collection.update_many = AsyncMock()
+        storage.node_collection.insert_one = AsyncMock()
+        copy = await storage.duplicate_shallow("A", "a-1")
+        assert copy["position"] == 1536
+        storage.node_collection.update_many.assert_not_called()
+
+    async def test_rank_positions_from_skeleton(self):
+        siblings = [self._node("A", 512.5), self._node("B", 1024), self._node("C", 40.0)]
+        storage = self._storage(siblings)
+        storage.node_collection.find_one = AsyncMock(return_value={"version": 3})
+        docs = [dict(s) for s in siblings]
+        await storage.rank_positions(docs, "a-1")
+        assert {d["node_id"]: d["position"] for d in docs} == {"C": 0, "A": 1, "B": 2}
+
+    async def test_rebalance_writes_are_conditional(self, monkeypatch):
+        siblings = [self._node("A", 0), self._node("B", 1)]
+        storage = self._storage(siblings)
+        # B moved away between the read and the write.
+        storage.node_collection.bulk_write = AsyncMock(return_value=MagicMock(modified_count=1))
+        scheduled = []
+        monkeypatch.setattr(storage, "_schedule_rebalance", lambda *args: scheduled.append(args))
+        keys = await storage.rebalance_siblings("a-1", "w-1", "ch")
+        requests = storage.node_collection.bulk_write.call_args.args[0]
+        assert requests[1]._filter == {
+            "node_id": "B", "account_id": "a-1", "parent_id": "ch", "position": 1,
+        }
+        assert keys == {"A": 1024, "B": 2048}
+        assert scheduled == [("a-1", "w-1", "ch")]
+
+    async def test_rank_positions_counts_nodes_missing_from_skeleton(self):
+        siblings = [self._node("A", 1024), self._node("B", 2048)]
+        storage = self._storage(siblings)
+        storage.node_collection.find_one = AsyncMock(return_value={"version": 3})
+        storage.node_collection.count_documents = AsyncMock(return_value=2)
+        docs = [dict(siblings[1]), self._node("new", 1536.0)]
+        await storage.rank_positions(docs, "a-1")
+        assert [d["position"] for d in docs] == [1, 2]
+        query = storage.node_collection.count_documents.call_args.args[0]
+        assert query["parent_id"] == "ch" and query["position"] == {"$lt": 1536.0}
+
+    async def test_rank_positions_many_works_use_only_cached_skeletons(self, monkeypatch):
+        monkeypatch.setattr(database, "_RANK_SKELETON_WORKS", 1)
+        docs = [{**self._node("A", 1024), "work_id": "w-1"}, {**self._node("B", 2048), "work_id": "w-2"}]
+        storage = self._storage([*docs, {**self._node("C", 10), "work_id": "w-2"}])
+        storage.node_collection.count_documents = AsyncMock()
+        await storage.rank_positions(docs, "a-1")
+        assert [d["position"] for d in docs] == [0, 1]
+        # No skeleton loads and no per-node counts: one read of sibling keys.
+        storage.node_collection.find.assert_called_once()
+        assert len(storage.node_collection.find.call_args.args[0]["$or"]) == 2
+        storage.node_collection.count_documents.assert_not_called()
+
+    async def test_rank_single_doc_never_loads_skeleton(self):
+        # A write has just invalidated the Work: rank the one node by counting.
+        storage = self._storage([self._node("A", 1024)])
+        storage.node_collection.count_documents = AsyncMock(return_value=1)
+        doc = self._node("B", 2048)
+        await storage.rank_positions([doc], "a-1")
+        assert doc["position"] == 1
+        storage.node_collection.find.assert_not_called()
+
+    async def test_rank_from_given_skeleton(self):
+        storage = self._storage([])
+        skeleton = WorkTreeCache(max_bytes=10**6).put(
+            "a-1", "w-1", 0, [self._node("A", 10), self._node("B", 20)]
+        )
+        docs = [self._node("B", 20), self._node("A", 10)]
+        await storage.rank_positions(docs, "a-1", skeleton)
+        assert [d["position"] for d in docs] == [1, 0]
+        storage.node_collection.find.assert_not_called()
+
+    async def test_rank_positions_noop_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(database, "ORDER_KEYS", False)
+        storage = self._storage([])
+        docs = [self._node("A", 1024)]
+        await storage.rank_positions(docs, "a-1")
+        assert docs[0]["position"] == 1024
+        storage.node_collection.find.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Work export / restore — app.export + WorkStorage.restore_work
+# ---------------------------------------------------------------------------
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+class TestWorkExport:
+
+    _WORK = {"work_id": "w-1", "account_id": "a-1", "title": "T", "version": 4,
+             "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+
+    def _nodes(self, n):
+        return [{"node_id": f"n{i}", "parent_id": None, "node_type": "part",
+                 "position": i, "tag": f"P{i}"} for i in range(n)]
+
+    @pytest.mark.parametrize("compress", [False, True])
+    async def test_round_trip(self, compress):
+        body = b"".join(await _collect(
+            export.export_ndjson(self._WORK, _aiter(self._nodes(3)), compress=compress)
+        ))
+        assert body.startswith(b"\x1f\x8b") == compress
+        # Re-chunk awkwardly: one byte, then the rest in 7-byte pieces.
+        chunks = [body[:1]] + [body[i:i + 7] for i in range(1, len(body), 7)]
+        records = await _collect(export.read_ndjson(_aiter(chunks)))
+        header = records[0][1]
+        assert header["type"] == "work" and header["format"] == export.EXPORT_FORMAT
+        assert "account_id" not in header["work"] and "version" not in header["work"]
+        assert header["work"]["created_at"] == "2026-01-01T00:00:00+00:00"
+        assert [r["node"]["node_id"] for _, r in records[1:]] == ["n0", "n1", "n2"]
+        assert [line for line, _ in records] == [1, 2, 3, 4]
+
+    async def test_export_chunks_are_bounded(self, monkeypatch):
+        monkeypatch.setattr(export, "EXPORT_CHUNK_BYTES", 200)
+        chunks = await _collect(export.export_ndjson(self._WORK, _aiter(self._nodes(50))))
+        assert len(chunks) > 10
+        assert max(len(c) for c in chunks) < 400
+
+    async def test_invalid_json_names_line(self):
+        with pytest.raises(database.InvalidWorkImport, match="line 2"):
+            await _collect(export.read_ndjson(_aiter([b'{"type": "work"}\n{oops\n'])))
+
+    async def test_truncated_gzip(self):
+        body = b"".join(await _collect(
+            export.export_ndjson(self._WORK, _aiter(self._nodes(3)), compress=True)
+        ))
+        with pytest.raises(database.InvalidWorkImport, match="truncated"):
+            await _collect(export.read_ndjson(_aiter([body[:-10]])))
+
+
+class TestWorkStorageRestore:
+
+    def _storage(self):
+        storage = database.WorkStorage(MagicMock())
+        storage.work_collection = MagicMock()
+        storage.work_collection.insert_one = AsyncMock()
+        storage.work_collection.update_one = AsyncMock()
+        storage.work_collection.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+        storage.node_collection = MagicMock()
+        storage.node_collection.insert_many = AsyncMock()
+        storage.node_collection.delete_many = AsyncMock(return_value=MagicMock(deleted_count=0))
+        storage.counter_collection = MagicMock()
+        storage.counter_collection.delete_many = AsyncMock()
+        return storage
+
+    def _records(self, nodes):
+        return _aiter([(1, {"type": "work", "work": {"title": "T"}})] + [
+            (i + 2, {"type": "node", "node": node}) for i, node in enumerate(nodes)
+        ])
+
+    async def test_ids_are_remapped_consistently(self, monkeypatch):
+        monkeypatch.setattr(database, "BULK_BATCH_SIZE", 2)
+        storage = self._storage()
+        # Child before its parent: remapping must not depend on order.
+        work = await storage.restore_work("a-2", self._records([
+            {"node_id": "c", "parent_id": "p", "node_type": "chapter", "position": 0, "tag": "C",
+             "ancestors": ["p"], "created_at": "2026-01-01T00:00:00+00:00"},
+            {"node_id": "p", "parent_id": None, "node_type": "part", "position": 0, "tag": "P"},
+            {"node_id": "s", "parent_id": "c", "node_type": "scene", "position": 0, "tag": "S"},
+        ]))
+        assert work["total_nodes"] == 3
+        assert storage.node_collection.insert_many.await_count == 2
+        docs = [d for c in storage.node_collection.insert_many.call_args_list for d in c.args[0]]
+        by_tag = {d["tag"]: d for d in docs}
+        assert by_tag["C"]["parent_id"] == by_tag["P"]["node_id"] != "p"
+        assert by_tag["C"]["ancestors"] == [by_tag["P"]["node_id"]]
+        assert by_tag["S"]["parent_id"] == by_tag["C"]["node_id"]
+        assert {d["work_id"] for d in docs} == {work["work_id"]}
+        assert {d["account_id"] for d in docs} == {"a-2"}
+        assert by_tag["C"]["created_at"] == datetime(2026, 1, 1, tzinfo=timezone.utc)
+        # The finished Work must not share a version with its half-restored self.
+        storage.work_collection.update_one.assert_awaited_once()
+        # P and S came without ancestors, so the Work stays on $graphLookup.
+        assert storage.work_collection.insert_one.call_args.args[0]["ancestors_backfilled"] is False
+        assert storage.work_collection.update_one.call_args.args[1] == {
+            "$inc": {"version": 1}, "$set": {"ancestors_backfilled": False},
+        }
+        assert work["version"] == 1
+
+    async def test_matching_ancestors_flag_work_backfilled(self):
+        storage = self._storage()
+        work = await storage.restore_work("a-2", self._records([
+            {"node_id": "p", "parent_id": None, "node_type": "part", "position": 0, "tag": "P",
+             "ancestors": []},
+            {"node_id": "c", "parent_id": "p", "node_type": "chapter", "position": 0, "tag": "C",
+             "ancestors": ["p"]},
+        ]))
+        assert work["ancestors_backfilled"] is True
+        assert storage.work_collection.update_one.call_args.args[1]["$set"] == {
+            "ancestors_backfilled": True,
+        }
+
+    async def test_missing_parent_rolls_back(self):
+        storage = self._storage()
+        with pytest.raises(database.InvalidWorkImport, match="missing parent gone"):
+            await storage.restore_work("a-2", self._records([
+                {"node_id": "c", "parent_id": "gone", "node_type": "chapter", "position": 0, "tag": "C"},
+            ]))
+        storage.work_collection.delete_one.assert_awaited_once()
+        storage.node_collection.delete_many.assert_awaited_once()
+
+    async def test_bad_record_names_line(self):
+        storage = self._storage()
+        with pytest.raises(database.InvalidWorkImport, match="line 3: invalid node_type"):
+            await storage.restore_work("a-2", self._records([
+                {"node_id": "p", "parent_id": None, "node_type": "part", "position": 0, "tag": "P"},
+                {"node_id": "x", "parent_id": "p", "node_type": "beat", "position": 0, "tag": "X"},
+            ]))
+
+    async def test_records_get_create_limits(self):
+        storage = self._storage()
+        with pytest.raises(database.InvalidWorkImport, match="line 2: invalid text"):
+            await storage.restore_work("a-2", self._records([
+                {"node_id": "p", "node_type": "part", "position": 0, "tag": "P",
+                 "text": "x" * (TEXT_MAX_LEN + 1)},
+            ]))
+        with pytest.raises(database.InvalidWorkImport, match="line 2: invalid tags"):
+            await storage.restore_work("a-2", self._records([
+                {"node_id": "p", "node_type": "part", "position": 0, "tag": "P", "tags": "solo"},
+            ]))
+        with pytest.raises(database.InvalidWorkImport, match="line 1: invalid tags"):
+            await storage.restore_work("a-2", _aiter([
+                (1, {"type": "work", "work": {"title": "T", "tags": ["x" * (TAG_MAX_LEN + 1)]}}),
+            ]))
+
+    async def test_depth_recomputed_from_ancestors(self):
+        storage = self._storage()
+        await storage.restore_work("a-2", self._records([
+            {"node_id": "p", "node_type": "part", "position": 0, "tag": "P",
+             "ancestors": [], "depth": 7},
+            {"node_id": "c", "parent_id": "p", "node_type": "chapter", "position": 0, "tag": "C",
+             "ancestors": ["p"], "depth": 0},
+            {"node_id": "s", "parent_id": "c", "node_type": "scene", "position": 0, "tag": "S",
+             "depth": 2},
+        ]))
+        docs = {d["tag"]: d for d in storage.node_collection.insert_many.call_args.args[0]}
+        assert (docs["P"]["depth"], docs["C"]["depth"]) == (0, 1)
+        assert "depth" not in docs["S"]
+
+    async def test_missing_work_header(self):
+        storage = self._storage()
+        with pytest.raises(database.InvalidWorkImport, match="work record"):
+            await storage.restore_work("a-2", _aiter([(1, {"type": "node", "node": {}})]))
+        storage.work_collection.insert_one.assert_not_called()
+
+
+class TestWorkVersion:
+
+    async def test_get_work_version_reads_only_version(self):
+        storage = database.WorkStorage(MagicMock())
+        storage.work_collection = MagicMock()
+        storage.work_collection.find_one = AsyncMock(return_value={"version": 7})
+        assert await storage.get_work_version("w-1", "a-1") == 7
+        assert storage.work_collection.find_one.call_args.args == (
+            {"work_id": "w-1", "account_id": "a-1"}, {"_id": 0, "version": 1},
+        )
+
+    async def test_get_work_version_unknown_work(self):
+        storage = database.WorkStorage(MagicMock())
+        storage.work_collection = MagicMock()
+        storage.work_collection.find_one = AsyncMock(return_value=None)
+        assert await storage.get_work_version("w-1", "a-1") is None
+
+    async def test_author_cascade_lands_before_version_bump(self):
+        calls = []
+        storage = database.WorkStorage(MagicMock())
+        storage.node_collection = MagicMock()
+        storage.node_collection.update_many = AsyncMock(
+            side_effect=lambda *a, **k: calls.append("nodes") or MagicMock(modified_count=2)
+        )
+        storage.work_collection = MagicMock()
+        storage.work_collection.find_one_and_update = AsyncMock(
+            side_effect=lambda *a, **k: calls.append("work") or {"work_id": "w-1", "version": 4}
+        )
+        await storage.update_work("w-1", "a-1", {"author": "New"})
+        assert calls == ["nodes", "work"]